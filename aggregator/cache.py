@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Protocol, Tuple
+
+from contracts import codec
+from contracts.metrics import METRICS
+from logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger("SearchCache")
+
+Fetch = Callable[[str, str, List[float]], Awaitable[List[Dict[str, Any]]]]
+
+
+def parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def format_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def quantize_bbox(bbox: List[float], quantum: float) -> List[float]:
+    """Snap a bbox outwards onto a `quantum`-degree grid."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return [
+        round(math.floor(min_lon / quantum) * quantum, 6),
+        round(math.floor(min_lat / quantum) * quantum, 6),
+        round(math.ceil(max_lon / quantum) * quantum, 6),
+        round(math.ceil(max_lat / quantum) * quantum, 6),
+    ]
+
+
+def quantize_window(start: str, end: str, quantum: timedelta) -> Tuple[str, str]:
+    """Widen a datetime window outwards onto `quantum` boundaries."""
+    step = quantum.total_seconds()
+    start_ts = math.floor(parse_datetime(start).timestamp() / step) * step
+    end_ts = math.ceil(parse_datetime(end).timestamp() / step) * step
+    return (
+        format_datetime(datetime.fromtimestamp(start_ts, timezone.utc)),
+        format_datetime(datetime.fromtimestamp(end_ts, timezone.utc)),
+    )
+
+
+def feature_datetime(feat: Dict[str, Any]) -> float | None:
+    value = feat.get("datetime") or feat.get("properties", {}).get("datetime")
+    try:
+        return parse_datetime(value).timestamp() if value else None
+    except ValueError:
+        return None
+
+
+def bbox_2d(bbox: List[float]) -> List[float]:
+    """Drop elevations from a 3D STAC bbox."""
+    return [bbox[0], bbox[1], bbox[3], bbox[4]] if len(bbox) == 6 else bbox
+
+
+def intersects(a: List[float], b: List[float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def within(
+    features: List[Dict[str, Any]], start: str, end: str, bbox: List[float]
+) -> List[Dict[str, Any]]:
+    """Features inside a query's window and AOI; ones lacking either are kept."""
+    start_ts = parse_datetime(start).timestamp()
+    end_ts = parse_datetime(end).timestamp()
+    kept = []
+    for feat in features:
+        ts = feature_datetime(feat)
+        if ts is not None and not start_ts <= ts <= end_ts:
+            continue
+        feat_bbox = feat.get("bbox")
+        if (
+            feat_bbox
+            and len(feat_bbox) >= 4
+            and not intersects(bbox_2d(feat_bbox), bbox)
+        ):
+            continue
+        kept.append(feat)
+    return kept
+
+
+# --- Shared backends ---
+class CacheBackend(Protocol):
+    """Cache shared between workers (e.g. Redis); values are opaque bytes."""
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+
+class FileCacheBackend:
+    """
+    Local stand-in for a shared cache: one file per key in a directory that
+    every worker process of the supervisor can see. Expired files are removed
+    when read, and every `sweep_every` writes the whole directory is swept.
+    """
+
+    def __init__(self, directory: str, sweep_every: int = 256):
+        self.directory = directory
+        self.sweep_every = sweep_every
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def _read(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at = float(f.readline())
+                value = f.read()
+        except (OSError, ValueError):
+            return None
+        if expires_at > time.time():
+            return value
+        self._remove(path)
+        return None
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def sweep(self) -> int:
+        """Delete every expired entry (and stray temp files); returns how many."""
+        now, removed = time.time(), 0
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".tmp"):
+                    # Left behind by a writer that died mid-write
+                    expired = entry.stat().st_mtime < now - 3600
+                else:
+                    with open(entry.path, "rb") as f:
+                        expired = float(f.readline()) <= now
+            except (OSError, ValueError):
+                continue
+            if expired:
+                self._remove(entry.path)
+                removed += 1
+        return removed
+
+    def _write(self, key: str, value: bytes, ttl: float):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(f"{time.time() + ttl}\n".encode())
+            f.write(value)
+        os.replace(tmp, path)
+
+        self._writes += 1
+        if self.sweep_every and self._writes % self.sweep_every == 0:
+            removed = self.sweep()
+            if removed:
+                logger.info(f"🧹 Swept {removed} expired shared cache entries")
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await asyncio.to_thread(self._write, key, value, ttl)
+
+
+# --- Search cache ---
+class SearchCache:
+    """
+    TTL + LRU cache for archive searches.
+
+    Keys are the provider plus the query snapped onto a bbox grid and time
+    buckets; the upstream is queried with the snapped values so a cached
+    entry always matches its key, and results are filtered back to the
+    caller's own window and bbox. Windows that ended more than `settle_after`
+    ago are treated as immutable and kept for `immutable_ttl`. Cached features
+    must not carry expiring credentials (e.g. SAS-signed hrefs): providers
+    return them unsigned and the worker signs them on the way out.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300.0,
+        immutable_ttl: float = 86400.0,
+        settle_after: timedelta = timedelta(days=7),
+        bbox_quantum: float = 0.01,
+        time_quantum: timedelta = timedelta(hours=1),
+        shared: CacheBackend | None = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.immutable_ttl = immutable_ttl
+        self.settle_after = settle_after
+        self.bbox_quantum = bbox_quantum
+        self.time_quantum = time_quantum
+        self.shared = shared
+
+        self._entries: OrderedDict[str, Tuple[float, list]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def normalize(
+        self, start: str, end: str, bbox: List[float]
+    ) -> Tuple[str, str, List[float]]:
+        q_start, q_end = quantize_window(start, end, self.time_quantum)
+        return q_start, q_end, quantize_bbox(bbox, self.bbox_quantum)
+
+    @staticmethod
+    def key(provider: str, start: str, end: str, bbox: List[float]) -> str:
+        return f"{provider}|{start}|{end}|{','.join(map(str, bbox))}"
+
+    def ttl_for(self, end: str) -> float:
+        settled = parse_datetime(end) < datetime.now(timezone.utc) - self.settle_after
+        return self.immutable_ttl if settled else self.ttl
+
+    def _get_local(self, key: str) -> list | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: list, ttl: float):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            METRICS.incr("cache.evicted")
+
+    async def get_or_fetch(
+        self, provider: str, start: str, end: str, bbox: List[float], fetch: Fetch
+    ) -> List[Dict[str, Any]]:
+        value = await self._get_or_fetch(provider, start, end, bbox, fetch)
+        # The entry covers the snapped query; hand back only what was asked
+        return within(value, start, end, bbox)
+
+    async def _get_or_fetch(
+        self, provider: str, start: str, end: str, bbox: List[float], fetch: Fetch
+    ) -> List[Dict[str, Any]]:
+        start, end, bbox = self.normalize(start, end, bbox)
+        key = self.key(provider, start, end, bbox)
+
+        value = self._get_local(key)
+        if value is not None:
+            METRICS.incr("cache.hit", provider=provider)
+            return value
+
+        # Identical concurrent misses share one upstream call
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            METRICS.incr("cache.coalesced", provider=provider)
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fetch(provider, key, start, end, bbox, fetch)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so lone failures don't warn on garbage collection
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fetch(self, provider, key, start, end, bbox, fetch) -> list:
+        ttl = self.ttl_for(end)
+
+        if self.shared is not None:
+            raw = await self.shared.get(key)
+            if raw is not None:
+                METRICS.incr("cache.shared_hit", provider=provider)
+                value = codec.loads(raw)
+                self._set_local(key, value, ttl)
+                return value
+
+        METRICS.incr("cache.miss", provider=provider)
+        value = await fetch(start, end, bbox)
+        self._set_local(key, value, ttl)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, codec.dumps(value), ttl)
+            except Exception as e:
+                logger.warning(f"⚠️ Shared cache write failed: {e}")
+        return value
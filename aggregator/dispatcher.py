@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Set
+
+import aio_pika
+from logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger("Dispatcher")
+
+Handler = Callable[[aio_pika.IncomingMessage], Awaitable[None]]
+
+
+class OrderDispatcher:
+    """
+    Runs up to `max_in_flight` orders concurrently.
+
+    The channel prefetch should match `max_in_flight`, so the broker stops
+    delivering once every slot is busy and keeps the backlog on its side.
+    Each handler acks its own message when the order completes.
+    """
+
+    def __init__(self, handler: Handler, max_in_flight: int):
+        self._handler = handler
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks: Set[asyncio.Task] = set()
+        self._closing = False
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def submit(self, msg: aio_pika.IncomingMessage):
+        """Start processing a message once a slot is free."""
+        if self._closing:
+            # Hand it back to the broker for another worker
+            await msg.nack(requeue=True)
+            return
+
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run(msg))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, msg: aio_pika.IncomingMessage):
+        try:
+            await self._handler(msg)
+        except Exception as e:
+            logger.error(f"Error processing: {e}")
+            await msg.nack(requeue=False)
+        finally:
+            self._slots.release()
+
+    async def drain(self, timeout: float | None = None):
+        """Stop taking new orders and wait for in-flight ones to finish."""
+        self._closing = True
+        if not self._tasks:
+            return
+
+        logger.info(f"⏳ Draining {len(self._tasks)} in-flight order(s)...")
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            # Unacked messages are redelivered once the connection closes
+            logger.warning(f"⚠️ Cancelling {len(pending)} order(s) after drain timeout")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,263 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List
+
+from logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger("FeasibilityTracker")
+
+Publisher = Callable[[str, dict, str], Awaitable[None]]
+
+DONE_STATUSES = ("COMPLETED", "FAILED", "CANCELLED")
+
+
+@dataclass
+class PendingFeasibility:
+    feasibility_id: str
+    order_id: str
+    provider: str
+    submitted_at: float
+    next_check_at: float
+    interval: float
+    # The order's `order.complete` waits until this feasibility settles
+    holds_order: bool = False
+
+
+class FeasibilityStore:
+    """
+    One JSON file per pending feasibility under `directory`.
+
+    Each tracked file is kept open with an exclusive `flock`, so several worker
+    processes can share the directory: the kernel drops the lock when a worker
+    dies, and a sibling adopts the orphaned feasibility on its next scan.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._locks: Dict[str, int] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, feasibility_id: str) -> str:
+        return os.path.join(self.directory, f"{feasibility_id}.json")
+
+    def _lock(self, feasibility_id: str) -> bool:
+        fd = os.open(self._path(feasibility_id), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._locks[feasibility_id] = fd
+        return True
+
+    def save(self, pending: PendingFeasibility):
+        fid = pending.feasibility_id
+        if fid not in self._locks and not self._lock(fid):
+            raise RuntimeError(f"Feasibility {fid} is tracked by another worker")
+
+        fd = self._locks[fid]
+        data = json.dumps(asdict(pending)).encode()
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, data, 0)
+
+    def remove(self, feasibility_id: str):
+        fd = self._locks.pop(feasibility_id, None)
+        try:
+            os.unlink(self._path(feasibility_id))
+        except FileNotFoundError:
+            pass
+        if fd is not None:
+            os.close(fd)
+
+    def adopt(self) -> List[PendingFeasibility]:
+        """Lock and load feasibilities nobody else is tracking."""
+        adopted = []
+        for fname in os.listdir(self.directory):
+            fid, ext = os.path.splitext(fname)
+            if ext != ".json" or fid in self._locks or not self._lock(fid):
+                continue
+            try:
+                with open(self._path(fid)) as f:
+                    adopted.append(PendingFeasibility(**json.load(f)))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"⚠️ Dropping unreadable feasibility state {fname}: {e}")
+                self.remove(fid)
+        return adopted
+
+    def close(self):
+        """Release locks but keep the files for the next worker."""
+        for fd in self._locks.values():
+            os.close(fd)
+        self._locks.clear()
+
+
+class FeasibilityTracker:
+    """
+    Single poller for all outstanding feasibility requests of this worker.
+
+    Orders only submit a feasibility and move on; every tick the tracker checks
+    all due feasibilities at once, backs off adaptively on the ones still
+    running, and publishes a `provider.update` when each one finishes. Orders
+    handed over with `hold` get their `order.complete` from the tracker, after
+    the last of their feasibilities has settled.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Any],
+        publish: Publisher,
+        store: FeasibilityStore,
+        min_interval: float = 5.0,
+        max_interval: float = 60.0,
+        backoff: float = 1.5,
+        max_age: float = 1800.0,
+    ):
+        self.providers = providers
+        self.publish = publish
+        self.store = store
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_age = max_age
+
+        self.pending: Dict[str, PendingFeasibility] = {}
+        self._wakeup = asyncio.Event()
+
+    async def track(self, order_id: str, provider: str, feasibility_id: str):
+        now = time.time()
+        pending = PendingFeasibility(
+            feasibility_id=feasibility_id,
+            order_id=order_id,
+            provider=provider,
+            submitted_at=now,
+            next_check_at=now + self.min_interval,
+            interval=self.min_interval,
+        )
+        self.store.save(pending)
+        self.pending[feasibility_id] = pending
+        self._wakeup.set()
+        logger.info(f"📌 Tracking {provider} feasibility {feasibility_id}")
+
+    def hold(self, order_id: str) -> bool:
+        """
+        Defer `order.complete` for `order_id` until its feasibilities settle.
+
+        Returns False when none are pending, so the caller completes the order.
+        """
+        held = [p for p in self.pending.values() if p.order_id == order_id]
+        for pending in held:
+            pending.holds_order = True
+            self.store.save(pending)
+        return bool(held)
+
+    def adopt(self):
+        for pending in self.store.adopt():
+            self.pending[pending.feasibility_id] = pending
+            logger.info(f"📌 Adopted feasibility {pending.feasibility_id}")
+
+    async def _check(self, pending: PendingFeasibility):
+        fid = pending.feasibility_id
+        provider = self.providers.get(pending.provider)
+        if provider is None:
+            logger.warning(f"⚠️ Unknown provider {pending.provider} for {fid}")
+            await self._finish(pending)
+            return
+
+        try:
+            status = await provider.get_feasibility(fid)
+        except Exception as e:
+            logger.warning(f"⚠️ Feasibility {fid} check failed: {e}")
+            status = None
+
+        if status and status.get("status") in DONE_STATUSES:
+            await self._complete(pending, status)
+            return
+
+        if time.time() - pending.submitted_at > self.max_age:
+            await self._emit(
+                pending,
+                {"status": "error", "error": f"Feasibility {fid} polling timed out"},
+            )
+            await self._finish(pending)
+            return
+
+        pending.interval = min(pending.interval * self.backoff, self.max_interval)
+        pending.next_check_at = time.time() + pending.interval
+        self.store.save(pending)
+
+    async def _complete(self, pending: PendingFeasibility, status: dict):
+        fid = pending.feasibility_id
+        if status["status"] == "COMPLETED":
+            logger.info(f"[{pending.provider}] Feasibility {fid} completed")
+            opportunities = status.get("opportunities", [])
+            evt = {"status": "ok" if opportunities else "empty"}
+            if opportunities:
+                evt["opportunities"] = opportunities
+        else:
+            evt = {"status": "error", "error": f"Feasibility {fid} failed: {status}"}
+
+        await self._emit(pending, evt)
+        await self._finish(pending)
+
+    async def _emit(self, pending: PendingFeasibility, fields: dict):
+        evt = {
+            "type": "provider.update",
+            "provider": pending.provider,
+            "mode": "feasibility",
+            "feasibilityId": pending.feasibility_id,
+            **fields,
+        }
+        await self.publish(
+            pending.order_id,
+            evt,
+            f"order.{pending.order_id}.provider.{pending.provider}.{evt['status']}",
+        )
+
+    async def _finish(self, pending: PendingFeasibility):
+        self.pending.pop(pending.feasibility_id, None)
+        self.store.remove(pending.feasibility_id)
+
+        order_id = pending.order_id
+        if not pending.holds_order or any(
+            p.order_id == order_id for p in self.pending.values()
+        ):
+            return
+        await self.publish(
+            order_id, {"type": "order.complete"}, f"order.{order_id}.complete"
+        )
+
+    async def tick(self):
+        """Check every feasibility that is due, all in one batch."""
+        now = time.time()
+        due = [p for p in self.pending.values() if p.next_check_at <= now]
+        if due:
+            await asyncio.gather(*[self._check(p) for p in due])
+
+    async def run(self, adopt_every: float = 60.0):
+        last_adopt = 0.0
+        try:
+            while True:
+                if time.time() - last_adopt >= adopt_every:
+                    self.adopt()
+                    last_adopt = time.time()
+
+                await self.tick()
+
+                self._wakeup.clear()
+                next_at = min(
+                    (p.next_check_at for p in self.pending.values()),
+                    default=time.time() + self.max_interval,
+                )
+                timeout = max(0.0, min(next_at - time.time(), adopt_every))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.store.close()
@@ -0,0 +1,74 @@
+import asyncio
+import importlib.util
+import logging
+from typing import Dict
+
+import httpx
+from logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger("HttpClientPool")
+
+# HTTP/2 needs the optional `h2` package (installed via `httpx[http2]`)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HttpClientPool:
+    """
+    Worker-lifetime pool of `httpx.AsyncClient`s, one per provider.
+
+    Each provider gets its own connection limits so a slow upstream can't
+    starve the others, and connections are kept alive between orders so we
+    don't pay the TCP+TLS handshake on every STAC search.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        http2: bool = True,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        # Custom transport (e.g. httpx.MockTransport in tests)
+        self.transport = transport
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning(
+                "⚠️ HTTP/2 requested but `h2` is not installed, using HTTP/1.1"
+            )
+
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._closed = False
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        """Return the shared client for a provider, creating it on first use."""
+        if self._closed:
+            raise RuntimeError("HTTP client pool is closed")
+
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport,
+            )
+            self._clients[provider] = client
+            logger.info(f"🔌 Opened HTTP client for {provider} (http2={self.http2})")
+        return client
+
+    async def aclose(self):
+        """Close every client. Call once in-flight orders have drained."""
+        self._closed = True
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*[c.aclose() for c in clients], return_exceptions=True)
+        logger.info(f"🔌 Closed {len(clients)} HTTP client(s)")
@@ -1,9 +1,23 @@
 import abc
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+from http_pool import HttpClientPool
 
 
 class BaseProvider(abc.ABC):
     name: str
+    # Max features per archive search; fewer back means the search was exhaustive
+    archive_page_size: int | None = None
+
+    def __init__(self, http_pool: HttpClientPool | None = None):
+        # Shared pool injected by the worker; standalone use gets a private one
+        self.http_pool = http_pool or HttpClientPool()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled keep-alive client dedicated to this provider."""
+        return self.http_pool.client(self.name)
 
     @abc.abstractmethod
     async def search_archive(
@@ -11,6 +25,76 @@ class BaseProvider(abc.ABC):
     ) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
+    async def sign_assets(self, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Make asset hrefs fetchable right before features are handed out"""
+        return features
+
+    async def iter_archive_pages(
+        self,
+        start_date: str,
+        end_date: str,
+        bbox: List[float],
+        max_items: int | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream archive results page by page (default: one search_archive page)"""
+        page = await self.search_archive(start_date, end_date, bbox)
+        yield page if max_items is None else page[:max_items]
+
+    async def first_archive_page(
+        self, start_date: str, end_date: str, bbox: List[float]
+    ) -> List[Dict[str, Any]]:
+        """First page of iter_archive_pages, capped at archive_page_size"""
+        pages = self.iter_archive_pages(
+            start_date, end_date, bbox, max_items=self.archive_page_size
+        )
+        try:
+            async for page in pages:
+                return page
+            return []
+        finally:
+            await pages.aclose()
+
+    async def stac_pages(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str] | None = None,
+        max_items: int | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield raw feature pages of a STAC item search, following `next` links"""
+        method, body, seen = "POST", payload, 0
+
+        while True:
+            if method == "GET":
+                resp = await self.client.get(url, headers=headers)
+            else:
+                resp = await self.client.post(url, headers=headers, json=body)
+            resp.raise_for_status()
+            data = resp.json()
+
+            features = data.get("features", [])
+            if max_items is not None:
+                features = features[: max_items - seen]
+            if not features:
+                return
+
+            seen += len(features)
+            yield features
+            if max_items is not None and seen >= max_items:
+                return
+
+            nxt = next(
+                (x for x in data.get("links", []) if x.get("rel") == "next"), None
+            )
+            if nxt is None:
+                return
+
+            # STAC API: POST next links carry a body, optionally merged into ours
+            url, method = nxt["href"], nxt.get("method", "GET").upper()
+            if method == "POST":
+                next_body = nxt.get("body", {})
+                body = {**body, **next_body} if nxt.get("merge") else next_body or body
+
     @abc.abstractmethod
     async def search_feasibility(
         self, start_date: str, end_date: str, geometry: Dict[str, Any]
@@ -1,7 +1,6 @@
 import logging
 import os
 
-import httpx
 from dotenv import load_dotenv
 from logging_config import setup_logging
 
@@ -14,19 +13,23 @@ logger = logging.getLogger("Copernicus")
 
 class CopernicusProvider(BaseProvider):
     name = "Copernicus"
+    archive_page_size = 5
     stac_url = os.getenv("COPERNICUS_URL")
 
     async def search_archive(self, start_date, end_date, bbox):
-        payload = {"bbox": bbox, "datetime": f"{start_date}/{end_date}", "limit": 5}
+        return await self.first_archive_page(start_date, end_date, bbox)
 
-        logger.info(f"[Copernicus] Searching archive with payload={payload}")
+    async def iter_archive_pages(self, start_date, end_date, bbox, max_items=None):
+        payload = {
+            "bbox": bbox,
+            "datetime": f"{start_date}/{end_date}",
+            "limit": self.archive_page_size,
+        }
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(self.stac_url, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
+        logger.info(f"[Copernicus] Searching archive with payload={payload}")
 
-        return [self.format_feature(feat) for feat in data.get("features", [])]
+        async for page in self.stac_pages(self.stac_url, payload, max_items=max_items):
+            yield [self.format_feature(feat) for feat in page]
 
     async def search_feasibility(self, *args, **kwargs):
         return []  # Not supported
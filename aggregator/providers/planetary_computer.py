@@ -1,10 +1,10 @@
 import logging
 import os
 
-import httpx
-import planetary_computer
 from dotenv import load_dotenv
+from http_pool import HttpClientPool
 from logging_config import setup_logging
+from signing import AssetSigner
 
 from .base import BaseProvider
 
@@ -15,9 +15,21 @@ logger = logging.getLogger("PlanetaryProvider")
 
 class PlanetaryComputerProvider(BaseProvider):
     name = "PlanetaryComputer"
+    archive_page_size = 5
     stac_url = os.getenv("PLANETARY_COMPUTER_URL")
 
+    def __init__(
+        self,
+        http_pool: HttpClientPool | None = None,
+        signer: AssetSigner | None = None,
+    ):
+        super().__init__(http_pool)
+        self.signer = signer or AssetSigner()
+
     async def search_archive(self, start_date, end_date, bbox, mode="archive"):
+        return await self.first_archive_page(start_date, end_date, bbox)
+
+    async def iter_archive_pages(self, start_date, end_date, bbox, max_items=None):
         # Here we explicitly list major collections PC hosts (EO + SAR)
         collections = [
             "sentinel-2-l2a",
@@ -30,28 +42,18 @@ class PlanetaryComputerProvider(BaseProvider):
             "collections": collections,
             "bbox": bbox,
             "datetime": f"{start_date}/{end_date}",
-            "limit": 5,
+            "limit": self.archive_page_size,
         }
 
         logger.info(f"[PlanetaryComputer] Searching archive with payload={payload}")
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(self.stac_url, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-
-        results = []
-        for feat in data.get("features", []):
-            signed_assets = {}
-            for k, v in feat["assets"].items():
-                try:
-                    signed_assets[k] = planetary_computer.sign(v["href"])
-                except Exception:
-                    signed_assets[k] = v["href"]
-
-            results.append(self.format_feature(feat, signed_assets=signed_assets))
+        # Pages stay unsigned so they can be cached past the SAS token expiry;
+        # sign_assets signs them when they are handed out
+        async for page in self.stac_pages(self.stac_url, payload, max_items=max_items):
+            yield [self.format_feature(feat) for feat in page]
 
-        return results
+    async def sign_assets(self, features):
+        return await self.signer.sign_assets(features)
 
     async def search_feasibility(self, *args, **kwargs):
         return []  # Not supported
@@ -2,7 +2,7 @@ import asyncio
 import logging
 from functools import lru_cache
 
-import httpx
+from http_pool import HttpClientPool
 from logging_config import setup_logging
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -34,34 +34,42 @@ logger = logging.getLogger("UmbraProvider")
 # --- Provider ---
 class UmbraProvider(BaseProvider):
     name = "Umbra"
+    archive_page_size = 10
 
-    def __init__(self, settings: UmbraSettings | None = None):
+    def __init__(
+        self,
+        settings: UmbraSettings | None = None,
+        http_pool: HttpClientPool | None = None,
+    ):
+        super().__init__(http_pool)
         self.settings = settings or get_settings()
         self.base_url = self.settings.url
         self.token = self.settings.token
         self.headers = {"Authorization": f"Bearer {self.token}"}
 
-    async def search_archive(self, start_date, end_date, bbox, limit=10):
+    async def search_archive(self, start_date, end_date, bbox):
         """Search Umbra archive (STAC API)"""
+        return await self.first_archive_page(start_date, end_date, bbox)
+
+    async def iter_archive_pages(self, start_date, end_date, bbox, max_items=None):
+        """Stream Umbra archive pages (STAC API)"""
         url = f"{self.base_url}/v2/stac/search"
         payload = {
             "collections": ["umbra:imagery"],
             "bbox": bbox,
             "datetime": f"{start_date}/{end_date}",
-            "limit": limit,
+            "limit": self.archive_page_size,
         }
 
         logger.info(f"[Umbra] Searching archive bbox={bbox}")
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                url, headers=self.headers, json=payload, timeout=60
-            )
-            resp.raise_for_status()
-            return resp.json().get("features", [])
+        async for page in self.stac_pages(
+            url, payload, headers=self.headers, max_items=max_items
+        ):
+            yield page
 
-    async def search_feasibility(self, start_date, end_date, geometry):
-        """Request feasibility opportunities for new tasking"""
+    async def submit_feasibility(self, start_date, end_date, geometry) -> str:
+        """Submit a feasibility request and return its id without waiting"""
         url = f"{self.base_url}/tasking/feasibilities"
         payload = {
             "imagingMode": "SPOTLIGHT",
@@ -81,22 +89,24 @@ class UmbraProvider(BaseProvider):
 
         logger.info(f"[Umbra] Checking feasibility for {geometry}")
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                url, headers=self.headers, json=payload, timeout=60
-            )
-            resp.raise_for_status()
-            feas = resp.json()
+        resp = await self.client.post(url, headers=self.headers, json=payload)
+        resp.raise_for_status()
+        return resp.json()["id"]
 
-        feas_id = feas["id"]
+    async def get_feasibility(self, feas_id: str):
+        """Fetch the current state of a feasibility request"""
+        url = f"{self.base_url}/tasking/feasibilities/{feas_id}"
+        resp = await self.client.get(url, headers=self.headers)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def search_feasibility(self, start_date, end_date, geometry):
+        """Request feasibility opportunities for new tasking and wait for them"""
+        feas_id = await self.submit_feasibility(start_date, end_date, geometry)
 
         # Poll until completed
-        poll_url = f"{self.base_url}/tasking/feasibilities/{feas_id}"
         for _ in range(30):  # up to ~5 minutes if 10s interval
-            async with httpx.AsyncClient() as client:
-                poll = await client.get(poll_url, headers=self.headers, timeout=60)
-                poll.raise_for_status()
-                status = poll.json()
+            status = await self.get_feasibility(feas_id)
 
             if status["status"] == "COMPLETED":
                 logger.info(f"[Umbra] Feasibility {feas_id} completed")
@@ -136,17 +146,13 @@ class UmbraProvider(BaseProvider):
 
         logger.info(f"[Umbra] Creating task with payload {payload}")
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                url, headers=self.headers, json=payload, timeout=60
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self.client.post(url, headers=self.headers, json=payload)
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_task_status(self, task_id: str):
         url = f"{self.base_url}/tasking/tasks/{task_id}"
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=self.headers, timeout=60)
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("properties", {}).get("status", "UNKNOWN")
+        resp = await self.client.get(url, headers=self.headers)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("properties", {}).get("status", "UNKNOWN")
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict
+
+import httpx
+from contracts.metrics import METRICS
+from logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger("Resilience")
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Errors worth retrying and counting against the provider's health."""
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding time window.
+
+    Opens when at least `min_calls` outcomes in the last `window` seconds have
+    a failure rate of `failure_rate` or more, rejects calls for `open_for`
+    seconds, then lets a single probe through (half-open) to decide whether
+    to close again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 60.0,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        open_for: float = 30.0,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_for = open_for
+
+        self._outcomes: deque = deque()  # (timestamp, ok)
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.open_for:
+            return "half_open"
+        return "open"
+
+    def acquire(self) -> bool | None:
+        """Admit a call: None if rejected, else whether it is the half-open probe."""
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        METRICS.incr("circuit.rejected", provider=self.name)
+        return None
+
+    def allow(self) -> bool:
+        return self.acquire() is not None
+
+    def release(self):
+        """
+        End a probe that produced no outcome (e.g. it was cancelled). Only the
+        call that acquired the probe may release it.
+        """
+        self._probing = False
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+        if self._opened_at is not None:
+            # Outcome of the half-open probe
+            self._probing = False
+            if ok:
+                logger.info(f"✅ Circuit for {self.name} closed")
+                self._opened_at = None
+                self._outcomes.clear()
+            else:
+                self._opened_at = now
+            return
+
+        self._outcomes.append((now, ok))
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+        failures = sum(1 for _, success in self._outcomes if not success)
+        total = len(self._outcomes)
+        if total >= self.min_calls and failures / total >= self.failure_rate:
+            logger.warning(
+                f"⚡ Circuit for {self.name} opened ({failures}/{total} failed)"
+            )
+            METRICS.incr("circuit.opened", provider=self.name)
+            self._opened_at = now
+
+
+class ProviderGuard:
+    """
+    Deadlines, retries, hedging and a circuit breaker around one provider.
+
+    Idempotent operations are retried with full-jitter exponential backoff on
+    transient errors and, when `hedge_after` is set, get a second concurrent
+    attempt if the first is slower than that; whichever succeeds first wins.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker,
+        deadlines: Dict[str, float] | None = None,
+        default_deadline: float = 60.0,
+        retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        hedge_after: float | None = None,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.deadlines = deadlines or {}
+        self.default_deadline = default_deadline
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+
+    def check(self) -> bool:
+        """Raise if the circuit is open; returns whether this call is the probe."""
+        probe = self.breaker.acquire()
+        if probe is None:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        return probe
+
+    def record(self, exc: BaseException | None):
+        # Client errors (4xx, bad input) still mean the provider answered
+        self.breaker.record(exc is None or not is_transient(exc))
+
+    async def call(
+        self,
+        op: str,
+        fn: Callable[..., Awaitable[Any]],
+        *args,
+        idempotent: bool = True,
+    ) -> Any:
+        deadline = self.deadlines.get(op, self.default_deadline)
+        attempts = self.retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            probe = self.check()
+            METRICS.incr("provider.calls", provider=self.name, op=op)
+            t0 = time.monotonic()
+            try:
+                if idempotent and self.hedge_after is not None:
+                    coro = self._hedged(op, fn, *args)
+                else:
+                    coro = fn(*args)
+                result = await asyncio.wait_for(coro, deadline)
+            except Exception as e:
+                self.record(e)
+                METRICS.incr("provider.failures", provider=self.name, op=op)
+                if isinstance(e, asyncio.TimeoutError):
+                    METRICS.incr("provider.timeouts", provider=self.name, op=op)
+                    e = TimeoutError(f"{self.name} {op} exceeded {deadline}s")
+                if attempt == attempts - 1 or not is_transient(e):
+                    raise e
+                error = e
+            else:
+                self.record(None)
+                METRICS.observe(
+                    "provider.latency", time.monotonic() - t0, provider=self.name, op=op
+                )
+                return result
+            finally:
+                # A cancelled half-open probe records nothing; don't stay stuck
+                if probe:
+                    self.breaker.release()
+
+            delay = random.uniform(
+                0, min(self.backoff_max, self.backoff_base * 2**attempt)
+            )
+            METRICS.incr("provider.retries", provider=self.name, op=op)
+            logger.warning(
+                f"🔁 {self.name} {op} failed ({error}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _hedged(self, op: str, fn: Callable[..., Awaitable[Any]], *args) -> Any:
+        tasks = [asyncio.create_task(fn(*args))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                METRICS.incr("provider.hedged", provider=self.name, op=op)
+                tasks.append(asyncio.create_task(fn(*args)))
+
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            METRICS.incr("provider.hedge_wins", provider=self.name)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
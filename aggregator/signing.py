@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from contracts.metrics import METRICS
+from logging_config import setup_logging
+from planetary_computer.sas import (
+    BLOB_STORAGE_DOMAIN,
+    SASToken,
+    get_token,
+    parse_blob_url,
+)
+
+setup_logging()
+logger = logging.getLogger("AssetSigner")
+
+# Thumbnails live in a public account and must not be signed
+PUBLIC_ASSETS_ACCOUNT = "ai4edatasetspublicassets.blob.core.windows.net"
+
+Target = Tuple[str, str]  # (storage account, container)
+
+
+def blob_target(href: str) -> Target | None:
+    """Storage account/container an href needs a token for, if any."""
+    parsed = urlparse(href.rstrip("/"))
+    if not parsed.netloc.endswith(BLOB_STORAGE_DOMAIN):
+        return None
+    if parsed.netloc == PUBLIC_ASSETS_ACCOUNT:
+        return None
+    if set(parse_qs(parsed.query)) & {"st", "se", "sp"}:
+        return None  # already signed
+    try:
+        return parse_blob_url(parsed)
+    except ValueError:
+        return None
+
+
+class AssetSigner:
+    """
+    Signs Planetary Computer assets with cached SAS tokens.
+
+    Tokens are cached per storage account/container and refreshed
+    `refresh_margin` seconds before they expire. A whole page of features is
+    signed in one pass: the distinct containers are collected first, any
+    missing tokens are fetched concurrently on a small thread pool (the token
+    endpoint client is blocking), and then every href is signed in memory.
+    """
+
+    def __init__(
+        self,
+        refresh_margin: float = 300.0,
+        max_workers: int = 4,
+        fetch_token: Callable[[str, str], SASToken] = get_token,
+    ):
+        self.refresh_margin = refresh_margin
+        self.fetch_token = fetch_token
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sas-token"
+        )
+        self._tokens: Dict[Target, SASToken] = {}
+        self._locks: Dict[Target, asyncio.Lock] = {}
+
+    def _fresh(self, target: Target) -> SASToken | None:
+        token = self._tokens.get(target)
+        if token is not None and token.ttl() > self.refresh_margin:
+            return token
+        return None
+
+    async def token(self, target: Target) -> SASToken | None:
+        token = self._fresh(target)
+        if token is not None:
+            METRICS.incr("sas.token_hit")
+            return token
+
+        lock = self._locks.setdefault(target, asyncio.Lock())
+        async with lock:
+            # Another page may have refreshed it while we waited
+            token = self._fresh(target)
+            if token is not None:
+                return token
+
+            METRICS.incr("sas.token_fetch")
+            loop = asyncio.get_running_loop()
+            try:
+                token = await loop.run_in_executor(
+                    self._executor, self.fetch_token, *target
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ SAS token fetch failed for {target}: {e}")
+                return None
+            self._tokens[target] = token
+            return token
+
+    async def sign_assets(self, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of formatted features (`assets` as `{key: href}`), signed."""
+        signed = await self.sign_hrefs([feat.get("assets") or {} for feat in features])
+        return [{**feat, "assets": assets} for feat, assets in zip(features, signed)]
+
+    async def sign_hrefs(self, hrefs: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Sign every `{asset key: href}` map in one pass."""
+        targets = {
+            href: blob_target(href) for assets in hrefs for href in assets.values()
+        }
+
+        needed = list({t for t in targets.values() if t is not None})
+        tokens = dict(
+            zip(needed, await asyncio.gather(*[self.token(t) for t in needed]))
+        )
+
+        signed = []
+        for assets in hrefs:
+            out = {}
+            for k, href in assets.items():
+                token = tokens.get(targets[href])
+                # Unsignable assets are passed through as-is
+                out[k] = token.sign(href).href if token else href
+            signed.append(out)
+        return signed
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Set, Tuple
+
+from cache import Fetch, bbox_2d, feature_datetime, intersects, parse_datetime
+from contracts.metrics import METRICS
+from logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger("CoverageIndex")
+
+Tile = Tuple[int, int]
+Rect = Tuple[int, int, int, int]  # tile x0, y0, x1, y1 (inclusive)
+
+
+@dataclass
+class TileState:
+    # (start_ts, end_ts, expires_at) windows fetched exhaustively for this tile
+    windows: List[Tuple[float, float, float]] = field(default_factory=list)
+    features: Set[str] = field(default_factory=set)
+
+
+def merge_tiles(tiles: List[Tile]) -> List[Rect]:
+    """Merge tiles into few rectangles: runs per row, then equal runs per column."""
+    rows: Dict[int, List[int]] = {}
+    for x, y in tiles:
+        rows.setdefault(y, []).append(x)
+
+    runs: List[Rect] = []
+    for y in sorted(rows):
+        xs = sorted(rows[y])
+        start = prev = xs[0]
+        for x in xs[1:]:
+            if x != prev + 1:
+                runs.append((start, y, prev, y))
+                start = x
+            prev = x
+        runs.append((start, y, prev, y))
+
+    rects: List[Rect] = []
+    for x0, y, x1, _ in runs:
+        for i, (rx0, ry0, rx1, ry1) in enumerate(rects):
+            if (rx0, rx1) == (x0, x1) and ry1 == y - 1:
+                rects[i] = (rx0, ry0, rx1, y)
+                break
+        else:
+            rects.append((x0, y, x1, y))
+    return rects
+
+
+class CoverageIndex:
+    """
+    Grid index over archive features already fetched per provider.
+
+    The world is cut into `tile_deg` tiles. Each tile remembers the time
+    windows it was fetched for exhaustively and the features overlapping it,
+    so a query whose tiles are all covered is answered locally and a
+    partially covered query only goes upstream for the missing tiles.
+    A fetch only counts as exhaustive when the provider returned fewer
+    features than its page size. Tiles are evicted LRU beyond `max_tiles`,
+    and queries spanning more than `max_query_tiles` bypass the index.
+    Settled windows never expire, so indexed features are kept unsigned; the
+    worker signs whatever the index returns.
+    """
+
+    def __init__(
+        self,
+        tile_deg: float = 0.25,
+        max_tiles: int = 4096,
+        ttl: float = 300.0,
+        settle_after: timedelta = timedelta(days=7),
+        max_results: int = 100,
+        max_query_tiles: int = 1024,
+    ):
+        self.tile_deg = tile_deg
+        self.max_tiles = max_tiles
+        self.ttl = ttl
+        self.settle_after = settle_after
+        self.max_results = max_results
+        self.max_query_tiles = max_query_tiles
+
+        self._tiles: OrderedDict[Tuple[str, Tile], TileState] = OrderedDict()
+        self._features: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._refs: Dict[Tuple[str, str], int] = {}
+
+    # --- geometry ---
+    def tiles_for(self, bbox: List[float]) -> List[Tile]:
+        d = self.tile_deg
+        x0, y0 = math.floor(bbox[0] / d), math.floor(bbox[1] / d)
+        # A bbox edge lying exactly on a tile boundary doesn't spill over
+        x1 = max(x0, math.ceil(bbox[2] / d) - 1)
+        y1 = max(y0, math.ceil(bbox[3] / d) - 1)
+        return [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+    def rect_bbox(self, rect: Rect) -> List[float]:
+        d = self.tile_deg
+        x0, y0, x1, y1 = rect
+        return [
+            round(x0 * d, 6),
+            round(y0 * d, 6),
+            round((x1 + 1) * d, 6),
+            round((y1 + 1) * d, 6),
+        ]
+
+    # --- index maintenance ---
+    def _tile(self, provider: str, tile: Tile) -> TileState:
+        key = (provider, tile)
+        state = self._tiles.get(key)
+        if state is None:
+            state = self._tiles[key] = TileState()
+        self._tiles.move_to_end(key)
+        return state
+
+    def _evict(self):
+        while len(self._tiles) > self.max_tiles:
+            (provider, _), state = self._tiles.popitem(last=False)
+            for fid in state.features:
+                ref = (provider, fid)
+                self._refs[ref] -= 1
+                if self._refs[ref] == 0:
+                    del self._refs[ref]
+                    del self._features[ref]
+            METRICS.incr("coverage.evicted_tiles")
+
+    def is_covered(self, provider: str, tile: Tile, start: float, end: float) -> bool:
+        state = self._tiles.get((provider, tile))
+        if state is None:
+            return False
+        now = time.time()
+        state.windows = [w for w in state.windows if w[2] > now]
+        return any(ws <= start and end <= we for ws, we, _ in state.windows)
+
+    def add(
+        self,
+        provider: str,
+        features: List[Dict[str, Any]],
+        start: float,
+        end: float,
+        tiles: List[Tile],
+        exhaustive: bool,
+    ):
+        """
+        Index features fetched for `tiles`, marking them covered if exhaustive.
+
+        Features are only indexed into the fetched tiles, so a scene spanning
+        many tiles never blows up the index; neighbouring tiles pick it up
+        when they are fetched themselves.
+        """
+        if exhaustive:
+            settled = end < (datetime.now(timezone.utc) - self.settle_after).timestamp()
+            expires_at = math.inf if settled else time.time() + self.ttl
+            for tile in tiles:
+                self._tile(provider, tile).windows.append((start, end, expires_at))
+
+        fetched = set(tiles)
+        for feat in features:
+            fid, bbox = feat.get("id"), feat.get("bbox")
+            if not fid or not bbox or len(bbox) < 4:
+                continue
+            ref = (provider, fid)
+            self._features[ref] = feat
+            for tile in fetched.intersection(self.tiles_for(bbox_2d(bbox))):
+                state = self._tile(provider, tile)
+                if fid not in state.features:
+                    state.features.add(fid)
+                    self._refs[ref] = self._refs.get(ref, 0) + 1
+            if ref not in self._refs:
+                del self._features[ref]
+
+        self._evict()
+
+    def query(
+        self, provider: str, start: float, end: float, bbox: List[float]
+    ) -> List[Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        for tile in self.tiles_for(bbox):
+            state = self._tiles.get((provider, tile))
+            if state is None:
+                continue
+            for fid in state.features:
+                feat = self._features[(provider, fid)]
+                ts = feature_datetime(feat)
+                if ts is None or not (start <= ts <= end):
+                    continue
+                if intersects(bbox_2d(feat["bbox"]), bbox):
+                    found[fid] = feat
+
+        results = sorted(found.values(), key=feature_datetime, reverse=True)
+        return results[: self.max_results]
+
+    # --- search ---
+    async def search(
+        self,
+        provider: str,
+        start: str,
+        end: str,
+        bbox: List[float],
+        fetch: Fetch,
+        page_size: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        start_ts = parse_datetime(start).timestamp()
+        end_ts = parse_datetime(end).timestamp()
+
+        tiles = self.tiles_for(bbox)
+        if len(tiles) > self.max_query_tiles:
+            # Continent-sized AOIs aren't worth indexing
+            METRICS.incr("coverage.bypassed", provider=provider)
+            return await fetch(start, end, bbox)
+
+        missing = [
+            t for t in tiles if not self.is_covered(provider, t, start_ts, end_ts)
+        ]
+        if not missing:
+            METRICS.incr("coverage.local", provider=provider)
+            return self.query(provider, start_ts, end_ts, bbox)
+
+        rects = merge_tiles(missing)
+        METRICS.incr("coverage.fetched_tiles", len(missing), provider=provider)
+        results = await asyncio.gather(
+            *[fetch(start, end, self.rect_bbox(r)) for r in rects]
+        )
+
+        for (x0, y0, x1, y1), features in zip(rects, results):
+            tiles = [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+            exhaustive = page_size is not None and len(features) < page_size
+            self.add(provider, features, start_ts, end_ts, tiles, exhaustive)
+
+        return self.query(provider, start_ts, end_ts, bbox)
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import multiprocessing as mp
+import os
+import signal
+import time
+from typing import Any, Callable, Dict, List
+
+from dotenv import load_dotenv
+from logging_config import setup_logging
+
+load_dotenv()
+setup_logging()
+logger = logging.getLogger("Supervisor")
+
+
+# --- Child entry point ---
+def run_worker(slot: int, heartbeats, heartbeat_interval: float):
+    """
+    Run one aggregator worker (own event loop, AMQP connection and channel).
+
+    A background task stamps `heartbeats[slot]` while the event loop is
+    responsive, so the supervisor can spot hung workers as well as dead ones.
+    """
+    import worker
+
+    async def beat():
+        while True:
+            heartbeats[slot] = time.time()
+            await asyncio.sleep(heartbeat_interval)
+
+    async def run():
+        task = asyncio.create_task(beat())
+        try:
+            await worker.main()
+        finally:
+            task.cancel()
+
+    # Drop the supervisor's handlers inherited through fork
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    asyncio.run(run())
+
+
+# --- Supervisor ---
+class Supervisor:
+    """
+    Forks N aggregator workers that all consume `orders.search`.
+
+    RabbitMQ round-robins deliveries across the consumers, so every process
+    gets its own share of orders. Dead or unresponsive workers are restarted
+    with a per-slot backoff, and SIGTERM/SIGINT is forwarded to every worker
+    so they drain their in-flight orders before exiting.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        target: Callable[..., None] = run_worker,
+        heartbeat_interval: float = 5.0,
+        heartbeat_timeout: float = 60.0,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 60.0,
+        shutdown_grace: float = 35.0,
+        health_file: str | None = None,
+    ):
+        self.processes = processes
+        self.target = target
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.shutdown_grace = shutdown_grace
+        self.health_file = health_file
+
+        self.heartbeats = mp.Array("d", processes, lock=False)
+        self.procs: List[mp.Process | None] = [None] * processes
+        self.restarts = [0] * processes
+        self.next_start_at = [0.0] * processes
+        self.stopping = False
+
+    def start_slot(self, slot: int):
+        # Grace period for startup before the first heartbeat lands
+        self.heartbeats[slot] = time.time()
+        proc = mp.Process(
+            target=self.target,
+            args=(slot, self.heartbeats, self.heartbeat_interval),
+            name=f"aggregator-worker-{slot}",
+            daemon=False,
+        )
+        proc.start()
+        self.procs[slot] = proc
+        logger.info(f"🚀 Started worker {slot} (pid={proc.pid})")
+
+    def schedule_restart(self, slot: int, reason: str):
+        self.restarts[slot] += 1
+        delay = min(
+            self.restart_backoff * 2 ** (self.restarts[slot] - 1),
+            self.max_restart_backoff,
+        )
+        self.next_start_at[slot] = time.time() + delay
+        self.procs[slot] = None
+        logger.warning(f"⚠️ Worker {slot} {reason}, restarting in {delay:.1f}s")
+
+    def check(self):
+        """Restart dead or hung workers whose backoff has elapsed."""
+        now = time.time()
+        for slot, proc in enumerate(self.procs):
+            if proc is None:
+                if now >= self.next_start_at[slot]:
+                    self.start_slot(slot)
+                continue
+
+            if not proc.is_alive():
+                proc.join()
+                self.schedule_restart(slot, f"exited with code {proc.exitcode}")
+            elif now - self.heartbeats[slot] > self.heartbeat_timeout:
+                proc.kill()
+                proc.join()
+                self.schedule_restart(slot, "stopped sending heartbeats")
+
+    def health(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [
+            {
+                "slot": slot,
+                "pid": proc.pid if proc else None,
+                "alive": bool(proc and proc.is_alive()),
+                "heartbeatAge": round(now - self.heartbeats[slot], 1),
+                "restarts": self.restarts[slot],
+            }
+            for slot, proc in enumerate(self.procs)
+        ]
+
+    def report_health(self):
+        health = self.health()
+        alive = sum(h["alive"] for h in health)
+        logger.info(f"💓 {alive}/{self.processes} workers alive")
+        if self.health_file:
+            tmp = f"{self.health_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"ts": time.time(), "workers": health}, f)
+            os.replace(tmp, self.health_file)
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def shutdown(self):
+        """Ask every worker to drain, then kill whatever is left after the grace."""
+        procs = [p for p in self.procs if p is not None]
+        logger.info(f"🛑 Stopping {len(procs)} worker(s)...")
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+
+        deadline = time.time() + self.shutdown_grace
+        for proc in procs:
+            proc.join(max(0.0, deadline - time.time()))
+            if proc.is_alive():
+                logger.warning(f"⚠️ Worker pid={proc.pid} did not drain in time")
+                proc.kill()
+                proc.join()
+
+    def run(self, health_interval: float = 30.0):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        last_report = 0.0
+        try:
+            while not self.stopping:
+                self.check()
+                if time.time() - last_report >= health_interval:
+                    self.report_health()
+                    last_report = time.time()
+                time.sleep(min(1.0, self.heartbeat_interval))
+        finally:
+            self.shutdown()
+
+
+def main():
+    from worker import get_settings
+
+    settings = get_settings()
+    processes = settings.WORKER_PROCESSES or os.cpu_count() or 1
+    logger.info(f"🧭 Supervisor starting {processes} worker process(es)")
+
+    Supervisor(
+        processes,
+        heartbeat_interval=settings.WORKER_HEARTBEAT_INTERVAL,
+        heartbeat_timeout=settings.WORKER_HEARTBEAT_TIMEOUT,
+        shutdown_grace=settings.SHUTDOWN_GRACE_SECONDS + 5,
+        health_file=settings.WORKER_HEALTH_FILE,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
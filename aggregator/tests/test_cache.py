@@ -0,0 +1,121 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from cache import FileCacheBackend, SearchCache, quantize_bbox, quantize_window
+
+
+class CountingFetch:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def __call__(self, start, end, bbox):
+        self.calls.append((start, end, bbox))
+        await asyncio.sleep(self.delay)
+        return [{"id": f"feat-{len(self.calls)}"}]
+
+
+def test_quantization_snaps_outwards():
+    assert quantize_bbox([0.123, 1.001, 0.456, 1.009], 0.01) == [0.12, 1.0, 0.46, 1.01]
+    assert quantize_window(
+        "2024-01-01T00:30:00Z", "2024-01-01T05:10:00Z", timedelta(hours=1)
+    ) == ("2024-01-01T00:00:00Z", "2024-01-01T06:00:00Z")
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_nearby_queries_share_an_entry():
+    cache = SearchCache()
+    fetch = CountingFetch()
+
+    first = await cache.get_or_fetch(
+        "PC", "2024-01-01T00:10:00Z", "2024-01-02T00:00:00Z", [0.101, 0, 1, 1], fetch
+    )
+    second = await cache.get_or_fetch(
+        "PC", "2024-01-01T00:20:00Z", "2024-01-02T00:00:00Z", [0.105, 0, 1, 1], fetch
+    )
+
+    assert first == second
+    assert len(fetch.calls) == 1
+    # Upstream sees the normalized query the entry is keyed on
+    assert fetch.calls[0] == (
+        "2024-01-01T00:00:00Z",
+        "2024-01-02T00:00:00Z",
+        [0.1, 0, 1, 1],
+    )
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_lru_eviction_and_concurrent_misses():
+    cache = SearchCache(max_entries=1)
+    fetch = CountingFetch(delay=0.01)
+    args = ("2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", [0, 0, 1, 1])
+
+    await asyncio.gather(*[cache.get_or_fetch("PC", *args, fetch) for _ in range(5)])
+    assert len(fetch.calls) == 1
+
+    await cache.get_or_fetch("Umbra", *args, fetch)
+    await cache.get_or_fetch("PC", *args, fetch)
+    assert len(fetch.calls) == 3
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_shared_backend_serves_other_workers(tmp_path):
+    args = ("2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", [0, 0, 1, 1])
+    fetch = CountingFetch()
+
+    await SearchCache(shared=FileCacheBackend(str(tmp_path))).get_or_fetch(
+        "PC", *args, fetch
+    )
+    value = await SearchCache(shared=FileCacheBackend(str(tmp_path))).get_or_fetch(
+        "PC", *args, fetch
+    )
+
+    assert value == [{"id": "feat-1"}]
+    assert len(fetch.calls) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_results_are_trimmed_to_the_callers_query():
+    cache = SearchCache()
+    features = [
+        {"id": "in", "datetime": "2024-01-01T12:00:00Z", "bbox": [0.5, 0.5, 0.6, 0.6]},
+        {
+            "id": "early",
+            "datetime": "2024-01-01T00:05:00Z",
+            "bbox": [0.5, 0.5, 0.6, 0.6],
+        },
+        {
+            "id": "west",
+            "datetime": "2024-01-01T12:00:00Z",
+            "bbox": [0.1, 0.5, 0.1, 0.6],
+        },
+    ]
+
+    async def fetch(start, end, bbox):
+        return features
+
+    value = await cache.get_or_fetch(
+        "PC", "2024-01-01T00:10:00Z", "2024-01-02T00:00:00Z", [0.105, 0, 1, 1], fetch
+    )
+    assert [f["id"] for f in value] == ["in"]
+
+    # The snapped entry still serves the wider query in full
+    value = await cache.get_or_fetch(
+        "PC", "2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", [0.1, 0, 1, 1], fetch
+    )
+    assert [f["id"] for f in value] == ["in", "early", "west"]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_expired_shared_entries_are_deleted(tmp_path):
+    backend = FileCacheBackend(str(tmp_path))
+    await backend.set("stale", b"x", ttl=-1)
+    await backend.set("fresh", b"y", ttl=60)
+
+    assert await backend.get("stale") is None
+    assert len(list(tmp_path.iterdir())) == 1
+
+    await backend.set("other", b"z", ttl=-1)
+    assert backend.sweep() == 1
+    assert await backend.get("fresh") == b"y"
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from conftest import DummyMessage
+from dispatcher import OrderDispatcher
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_dispatcher_bounds_in_flight_orders():
+    running = 0
+    peak = 0
+
+    async def handler(msg):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        await msg.ack()
+
+    dispatcher = OrderDispatcher(handler, max_in_flight=2)
+    msgs = [DummyMessage() for _ in range(6)]
+    for msg in msgs:
+        await dispatcher.submit(msg)
+    await dispatcher.drain(timeout=1)
+
+    assert peak == 2
+    assert all(m.acked for m in msgs)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_dispatcher_nacks_failed_and_requeues_after_drain():
+    async def handler(msg):
+        raise RuntimeError("boom")
+
+    dispatcher = OrderDispatcher(handler, max_in_flight=1)
+    failed = DummyMessage()
+    await dispatcher.submit(failed)
+    await dispatcher.drain(timeout=1)
+
+    late = DummyMessage()
+    await dispatcher.submit(late)
+
+    assert failed.nacked is False
+    assert late.nacked is True
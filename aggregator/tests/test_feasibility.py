@@ -0,0 +1,110 @@
+import pytest
+from feasibility import FeasibilityStore, FeasibilityTracker
+
+
+class FakeUmbra:
+    name = "Umbra"
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.checks = 0
+
+    async def get_feasibility(self, feas_id):
+        self.checks += 1
+        return self.statuses.pop(0)
+
+
+def make_tracker(tmp_path, provider, published):
+    async def publish(order_id, evt, rk):
+        published.append((order_id, evt, rk))
+
+    return FeasibilityTracker(
+        {provider.name: provider},
+        publish,
+        FeasibilityStore(str(tmp_path)),
+        min_interval=0.0,
+        max_interval=0.0,
+    )
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_tracker_publishes_when_feasibility_completes(tmp_path):
+    published = []
+    provider = FakeUmbra(
+        [
+            {"status": "RUNNING"},
+            {"status": "COMPLETED", "opportunities": [{"id": "opp-1"}]},
+        ]
+    )
+    tracker = make_tracker(tmp_path, provider, published)
+
+    await tracker.track("order1", "Umbra", "feas-1")
+    assert (tmp_path / "feas-1.json").exists()
+
+    await tracker.tick()
+    assert published == []
+
+    await tracker.tick()
+    order_id, evt, rk = published[0]
+    assert order_id == "order1"
+    assert evt["status"] == "ok"
+    assert evt["opportunities"] == [{"id": "opp-1"}]
+    assert rk == "order.order1.provider.Umbra.ok"
+    assert not tracker.pending
+    assert not (tmp_path / "feas-1.json").exists()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_pending_feasibilities_survive_a_worker_restart(tmp_path):
+    provider = FakeUmbra([])
+    first = make_tracker(tmp_path, provider, [])
+    await first.track("order1", "Umbra", "feas-1")
+
+    # Still locked by the first worker
+    second = make_tracker(tmp_path, provider, [])
+    second.adopt()
+    assert not second.pending
+
+    first.store.close()
+    second.adopt()
+    assert second.pending["feas-1"].order_id == "order1"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_held_order_completes_after_its_last_feasibility(tmp_path):
+    published = []
+    provider = FakeUmbra(
+        [
+            {"status": "COMPLETED", "opportunities": [{"id": "opp-1"}]},
+            {"status": "RUNNING"},
+            {"status": "FAILED"},
+        ]
+    )
+    tracker = make_tracker(tmp_path, provider, published)
+
+    await tracker.track("order1", "Umbra", "feas-1")
+    await tracker.track("order1", "Umbra", "feas-2")
+    assert tracker.hold("order1")
+
+    await tracker.tick()
+    assert [evt["type"] for _, evt, _ in published] == ["provider.update"]
+
+    await tracker.tick()
+    types = [evt["type"] for _, evt, _ in published]
+    assert types == ["provider.update", "provider.update", "order.complete"]
+    assert published[-1][2] == "order.order1.complete"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_hold_without_pending_feasibilities_leaves_completion_to_caller(
+    tmp_path,
+):
+    published = []
+    provider = FakeUmbra([{"status": "COMPLETED", "opportunities": []}])
+    tracker = make_tracker(tmp_path, provider, published)
+
+    await tracker.track("order1", "Umbra", "feas-1")
+    await tracker.tick()
+
+    assert not tracker.hold("order1")
+    assert [evt["type"] for _, evt, _ in published] == ["provider.update"]
@@ -0,0 +1,24 @@
+import pytest
+from http_pool import HttpClientPool
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_client_is_reused_per_provider():
+    pool = HttpClientPool(http2=False)
+    try:
+        assert pool.client("Copernicus") is pool.client("Copernicus")
+        assert pool.client("Copernicus") is not pool.client("Umbra")
+    finally:
+        await pool.aclose()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aclose_closes_clients_and_rejects_new_ones():
+    pool = HttpClientPool(http2=False)
+    client = pool.client("Copernicus")
+
+    await pool.aclose()
+
+    assert client.is_closed
+    with pytest.raises(RuntimeError):
+        pool.client("Copernicus")
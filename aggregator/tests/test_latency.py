@@ -0,0 +1,72 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from conftest import DummyChannel, DummyMessage
+from worker import Settings, process_order
+
+# End-to-end budget for one order against stubbed providers that each take
+# PROVIDER_LATENCY seconds. Providers run concurrently, so the order should
+# cost roughly one provider call plus publishing overhead.
+PROVIDER_LATENCY = 0.05
+ORDER_BUDGET = 0.5
+
+
+class SlowProvider:
+    def __init__(self, name):
+        self.name = name
+
+    async def search_archive(self, start, end, bbox):
+        await asyncio.sleep(PROVIDER_LATENCY)
+        return [{"id": f"{self.name}-feature"}]
+
+    async def search_feasibility(self, start, end, geometry):
+        await asyncio.sleep(PROVIDER_LATENCY)
+        return []
+
+
+def archive_order(order_id):
+    payload = {
+        "orderId": order_id,
+        "type": "search",
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-02-01T00:00:00Z",
+        "bbox": [0, 0, 1, 1],
+    }
+    return DummyMessage(json.dumps(payload).encode())
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_order_latency_within_budget():
+    ch = DummyChannel()
+    msg = archive_order("bench-order")
+    providers = [SlowProvider(f"P{i}") for i in range(3)]
+
+    with patch("worker.PROVIDERS", providers):
+        t0 = time.perf_counter()
+        await process_order(ch, msg)
+        elapsed = time.perf_counter() - t0
+
+    assert msg.acked
+    assert ch.published[-1][0]["type"] == "order.complete"
+    assert elapsed < ORDER_BUDGET, f"order took {elapsed:.3f}s > {ORDER_BUDGET}s"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_demo_pacing_adds_delays_when_enabled():
+    ch = DummyChannel()
+    msg = archive_order("paced-order")
+    settings = Settings(DEMO_PACING=True, DEMO_PACING_SECONDS=0.1)
+
+    with (
+        patch("worker.PROVIDERS", [SlowProvider("P0")]),
+        patch("worker.get_settings", return_value=settings),
+    ):
+        t0 = time.perf_counter()
+        await process_order(ch, msg)
+        elapsed = time.perf_counter() - t0
+
+    # One pause before order.started and one before the provider call
+    assert elapsed >= 0.2
@@ -0,0 +1,84 @@
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from conftest import DummyChannel
+from http_pool import HttpClientPool
+from providers.copernicus import CopernicusProvider
+from worker import JobRequest, Settings, call_provider
+
+
+def stac_page(ids, next_token=None):
+    page = {"features": [{"id": i, "properties": {}, "assets": {}} for i in ids]}
+    if next_token:
+        page["links"] = [
+            {
+                "rel": "next",
+                "href": "https://stac.test/search",
+                "method": "POST",
+                "body": {"token": next_token},
+                "merge": True,
+            }
+        ]
+    return page
+
+
+def fake_stac(requests):
+    pages = {
+        None: stac_page(["a", "b"], "p2"),
+        "p2": stac_page(["c", "d"], "p3"),
+        "p3": stac_page(["e"]),
+    }
+
+    def handler(request: httpx.Request):
+        body = json.loads(request.content)
+        requests.append(body)
+        return httpx.Response(200, json=pages[body.get("token")])
+
+    return handler
+
+
+def make_provider(requests):
+    pool = HttpClientPool(
+        http2=False, transport=httpx.MockTransport(fake_stac(requests))
+    )
+    provider = CopernicusProvider(http_pool=pool)
+    provider.stac_url = "https://stac.test/search"
+    return provider
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_stac_pages_follow_next_links_up_to_cap():
+    requests = []
+    provider = make_provider(requests)
+
+    pages = [
+        [f["id"] for f in page]
+        async for page in provider.iter_archive_pages("s", "e", [0, 0, 1, 1], 3)
+    ]
+
+    assert pages == [["a", "b"], ["c"]]
+    # The next-link body is merged into the original search payload
+    assert requests[1]["bbox"] == [0, 0, 1, 1] and requests[1]["token"] == "p2"
+    await provider.http_pool.aclose()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_streaming_publishes_each_page():
+    provider = make_provider([])
+    ch = DummyChannel()
+    req = JobRequest(
+        start_date="2024-01-01T00:00:00Z",
+        end_date="2024-02-01T00:00:00Z",
+        bbox=[0, 0, 1, 1],
+    )
+    settings = Settings(ARCHIVE_STREAMING=True, ARCHIVE_MAX_RESULTS=100)
+
+    with patch("worker.get_settings", return_value=settings):
+        await call_provider(ch, "order1", provider, "search", req)
+
+    statuses = [(evt["status"], evt.get("page")) for evt, _ in ch.published]
+    assert statuses == [("partial", 1), ("partial", 2), ("partial", 3), ("ok", None)]
+    assert ch.published[-1][0]["total"] == 5
+    await provider.http_pool.aclose()
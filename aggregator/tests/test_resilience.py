@@ -0,0 +1,147 @@
+import asyncio
+
+import httpx
+import pytest
+from resilience import CircuitBreaker, CircuitOpenError, ProviderGuard
+
+
+def server_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://provider.test")
+    response = httpx.Response(503, request=request)
+    return httpx.HTTPStatusError("503", request=request, response=response)
+
+
+def make_guard(**kwargs) -> ProviderGuard:
+    breaker = CircuitBreaker(
+        "Test",
+        min_calls=kwargs.pop("min_calls", 5),
+        open_for=kwargs.pop("open_for", 30),
+    )
+    kwargs.setdefault("backoff_base", 0)
+    return ProviderGuard("Test", breaker, **kwargs)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_retries_transient_errors_then_succeeds():
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise server_error()
+        return ["ok"]
+
+    guard = make_guard(retries=2)
+    assert await guard.call("search_archive", flaky) == ["ok"]
+    assert calls == 3
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_non_idempotent_calls_are_not_retried():
+    calls = 0
+
+    async def submit():
+        nonlocal calls
+        calls += 1
+        raise server_error()
+
+    guard = make_guard(retries=2)
+    with pytest.raises(httpx.HTTPStatusError):
+        await guard.call("submit_feasibility", submit, idempotent=False)
+    assert calls == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_deadline_turns_slow_calls_into_timeouts():
+    async def slow():
+        await asyncio.sleep(1)
+
+    guard = make_guard(retries=0, deadlines={"search_archive": 0.01})
+    with pytest.raises(TimeoutError):
+        await guard.call("search_archive", slow)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_breaker_opens_and_rejects_until_probe_succeeds():
+    async def failing():
+        raise server_error()
+
+    async def healthy():
+        return []
+
+    guard = make_guard(retries=0, min_calls=2, open_for=0)
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await guard.call("search_archive", failing)
+    assert guard.breaker.state == "half_open"
+
+    # One probe at a time while half-open
+    assert guard.breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        await guard.call("search_archive", healthy)
+
+    guard.record(None)
+    assert guard.breaker.state == "closed"
+    assert await guard.call("search_archive", healthy) == []
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_hedged_request_wins_over_slow_first_attempt():
+    calls = 0
+
+    async def tail_latency():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(1 if calls == 1 else 0)
+        return calls
+
+    guard = make_guard(hedge_after=0.01)
+    assert await guard.call("search_archive", tail_latency) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_cancelled_probe_lets_the_next_one_through():
+    async def failing():
+        raise server_error()
+
+    async def hanging():
+        await asyncio.sleep(60)
+
+    guard = make_guard(retries=0, min_calls=2, open_for=0)
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await guard.call("search_archive", failing)
+
+    probe = asyncio.create_task(guard.call("search_archive", hanging))
+    await asyncio.sleep(0)
+    assert not guard.breaker.allow()
+
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert guard.breaker.state == "half_open"
+    assert guard.breaker.allow()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_call_admitted_while_closed_keeps_the_probe():
+    async def failing():
+        raise server_error()
+
+    async def hanging():
+        await asyncio.sleep(60)
+
+    guard = make_guard(retries=0, min_calls=2, open_for=0)
+    slow = asyncio.create_task(guard.call("search_archive", hanging))
+    await asyncio.sleep(0)
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await guard.call("search_archive", failing)
+    assert guard.breaker.allow()
+
+    # Finishing without an outcome must not hand out a second probe
+    slow.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await slow
+    assert not guard.breaker.allow()
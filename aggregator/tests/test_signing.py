@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from planetary_computer.sas import SASToken
+from signing import AssetSigner
+
+BLOB = "https://acct.blob.core.windows.net/container/path/{}.tif"
+
+
+def feature(*names):
+    return {"assets": {n: BLOB.format(n) for n in names}}
+
+
+class FakeTokenEndpoint:
+    def __init__(self, ttl=timedelta(hours=1)):
+        self.calls = []
+        self.ttl = ttl
+
+    def __call__(self, account, container):
+        self.calls.append((account, container))
+        return SASToken(
+            token=f"sig={len(self.calls)}",
+            **{"msft:expiry": datetime.now(timezone.utc) + self.ttl},
+        )
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_page_is_signed_with_one_token_fetch_per_container():
+    endpoint = FakeTokenEndpoint()
+    signer = AssetSigner(fetch_token=endpoint)
+    features = [feature("B02", "B03"), feature("B04")]
+    features[1]["assets"]["thumb"] = "https://example.com/t.png"
+
+    signed = await signer.sign_assets(features)
+    await signer.sign_assets(features)
+
+    assert endpoint.calls == [("acct", "container")]
+    assert signed[0]["assets"]["B02"] == BLOB.format("B02") + "?sig=1"
+    assert signed[1]["assets"]["thumb"] == "https://example.com/t.png"
+    signer.close()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_tokens_close_to_expiry_are_refreshed():
+    endpoint = FakeTokenEndpoint(ttl=timedelta(seconds=60))
+    signer = AssetSigner(refresh_margin=300, fetch_token=endpoint)
+
+    await signer.sign_assets([feature("B02")])
+    signed = await signer.sign_assets([feature("B02")])
+
+    assert len(endpoint.calls) == 2
+    assert signed[0]["assets"]["B02"].endswith("?sig=2")
+    signer.close()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_formatted_features_are_signed_as_copies():
+    signer = AssetSigner(fetch_token=FakeTokenEndpoint())
+    features = [{"id": "scene", "assets": {"B02": BLOB.format("B02")}}]
+
+    signed = await signer.sign_assets(features)
+
+    assert signed[0]["assets"]["B02"] == BLOB.format("B02") + "?sig=1"
+    assert signed[0]["id"] == "scene"
+    # The cached original stays unsigned
+    assert features[0]["assets"]["B02"] == BLOB.format("B02")
+    signer.close()
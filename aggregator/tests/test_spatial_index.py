@@ -0,0 +1,71 @@
+import pytest
+from spatial_index import CoverageIndex, merge_tiles
+
+START, END = "2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z"
+
+
+def feature(fid, bbox, dt="2024-01-15T00:00:00Z"):
+    return {"id": fid, "datetime": dt, "bbox": bbox}
+
+
+class FakeArchive:
+    """Upstream returning the features intersecting the requested bbox."""
+
+    def __init__(self, features):
+        self.features = features
+        self.calls = []
+
+    async def __call__(self, start, end, bbox):
+        self.calls.append(bbox)
+        return [
+            f
+            for f in self.features
+            if f["bbox"][0] <= bbox[2]
+            and bbox[0] <= f["bbox"][2]
+            and f["bbox"][1] <= bbox[3]
+            and bbox[1] <= f["bbox"][3]
+        ]
+
+
+def test_merge_tiles_builds_rectangles():
+    tiles = [(0, 0), (1, 0), (0, 1), (1, 1), (3, 1)]
+    assert sorted(merge_tiles(tiles)) == [(0, 0, 1, 1), (3, 1, 3, 1)]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_contained_query_is_answered_locally():
+    index = CoverageIndex(tile_deg=1.0)
+    upstream = FakeArchive([feature("a", [0.2, 0.2, 0.4, 0.4])])
+
+    await index.search("PC", START, END, [0, 0, 2, 2], upstream, page_size=5)
+    found = await index.search(
+        "PC", "2024-01-10T00:00:00Z", END, [0.1, 0.1, 0.5, 0.5], upstream, page_size=5
+    )
+
+    assert [f["id"] for f in found] == ["a"]
+    assert len(upstream.calls) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_partial_overlap_only_fetches_missing_tiles():
+    index = CoverageIndex(tile_deg=1.0)
+    upstream = FakeArchive(
+        [feature("a", [0.2, 0.2, 0.4, 0.4]), feature("b", [2.2, 0.2, 2.4, 0.4])]
+    )
+
+    await index.search("PC", START, END, [0, 0, 2, 1], upstream, page_size=5)
+    found = await index.search("PC", START, END, [0, 0, 3, 1], upstream, page_size=5)
+
+    assert upstream.calls[-1] == [2.0, 0.0, 3.0, 1.0]
+    assert {f["id"] for f in found} == {"a", "b"}
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_truncated_fetch_is_not_treated_as_coverage():
+    index = CoverageIndex(tile_deg=1.0)
+    upstream = FakeArchive([feature("a", [0.2, 0.2, 0.4, 0.4])])
+
+    await index.search("PC", START, END, [0, 0, 1, 1], upstream, page_size=1)
+    await index.search("PC", START, END, [0, 0, 1, 1], upstream, page_size=1)
+
+    assert len(upstream.calls) == 2
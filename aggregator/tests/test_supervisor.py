@@ -0,0 +1,49 @@
+import time
+
+from supervisor import Supervisor
+
+
+def crashing_worker(slot, heartbeats, heartbeat_interval):
+    raise SystemExit(1)
+
+
+def sleeping_worker(slot, heartbeats, heartbeat_interval):
+    while True:
+        heartbeats[slot] = time.time()
+        time.sleep(heartbeat_interval)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_supervisor_restarts_crashed_workers():
+    sup = Supervisor(1, target=crashing_worker, restart_backoff=0.0)
+    try:
+        sup.check()
+        assert wait_for(lambda: not sup.procs[0].is_alive())
+
+        sup.check()  # notices the exit and schedules a restart
+        assert sup.restarts[0] == 1
+        sup.check()  # backoff of 0s has elapsed, so it starts again
+        assert sup.procs[0] is not None
+    finally:
+        sup.shutdown()
+
+
+def test_supervisor_shutdown_stops_all_workers():
+    sup = Supervisor(2, target=sleeping_worker, heartbeat_interval=0.05)
+    sup.check()
+    procs = list(sup.procs)
+    assert all(p.is_alive() for p in procs)
+
+    health = sup.health()
+    assert [h["alive"] for h in health] == [True, True]
+
+    sup.shutdown()
+    assert not any(p.is_alive() for p in procs)
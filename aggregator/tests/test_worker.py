@@ -2,6 +2,10 @@ import json
 from unittest.mock import patch
 
 import pytest
+from cache import SearchCache
+from conftest import DummyChannel, DummyMessage
+from contracts import FileBlobStore
+from spatial_index import CoverageIndex
 
 
 # --- Dummy UmbraProvider to avoid real token logic ---
@@ -11,26 +15,6 @@ class DummyUmbraProvider:
 
 
 # --- Dummy classes for channel and provider ---
-class DummyChannel:
-    def __init__(self):
-        self.published = []
-
-    async def get_exchange(self, _):
-        return self
-
-    async def publish(self, message, routing_key):
-        self.published.append((json.loads(message.body), routing_key))
-
-
-class DummyMessage:
-    def __init__(self, body):
-        self.body = body
-        self.acked = False
-
-    async def ack(self):
-        self.acked = True
-
-
 class DummyProvider:
     name = "Dummy"
 
@@ -43,7 +27,13 @@ class DummyProvider:
 
 # --- Patch UmbraProvider before importing worker ---
 with patch("providers.umbra_canopy.UmbraProvider", DummyUmbraProvider):
-    from worker import JobRequest, call_provider, process_order
+    from worker import (
+        JobRequest,
+        call_provider,
+        process_order,
+        publish_event,
+        search_archive,
+    )
 
 
 # --- Tests ---
@@ -74,3 +64,93 @@ async def test_process_order_with_unknown_type():
         
     assert msg.acked
     assert any(evt["type"] == "order.failed" for evt, _ in ch.published)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_publish_event_offloads_large_results(tmp_path):
+    ch = DummyChannel()
+    store = FileBlobStore(str(tmp_path))
+    features = [{"id": f"scene-{i}", "assets": {"href": "x" * 100}} for i in range(300)]
+    evt = {"type": "provider.update", "status": "ok", "features": features}
+
+    with patch("worker.BLOB_STORE", store):
+        await publish_event(ch, "order1", evt, "order.order1.provider.Dummy.ok")
+        await publish_event(ch, "order1", {"type": "x", "features": []}, "rk")
+
+    big, small = (published for published, _ in ch.published)
+    assert "features" not in big
+    assert big["featuresRef"]["count"] == 300
+    assert await store.get(big["featuresRef"]["digest"]) == features
+    # Small results stay inline
+    assert small["features"] == []
+
+
+class SigningProvider(DummyProvider):
+    """Archive provider whose hrefs need a fresh signature on every read."""
+
+    def __init__(self):
+        self.fetches = 0
+        self.signatures = 0
+
+    archive_page_size = 10
+
+    async def search_archive(self, start, end, bbox):
+        self.fetches += 1
+        scene = {
+            "id": "scene",
+            "datetime": "2020-01-15T00:00:00Z",
+            "bbox": [0.1, 0.1, 0.2, 0.2],
+            "assets": {"data": "https://blob/scene.tif"},
+        }
+        return [scene]
+
+    async def sign_assets(self, features):
+        self.signatures += 1
+        sig = f"?sig={self.signatures}"
+        return [
+            {**f, "assets": {k: v + sig for k, v in f["assets"].items()}}
+            for f in features
+        ]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_cached_archive_results_are_signed_on_every_read():
+    provider = SigningProvider()
+    req = JobRequest(
+        start_date="2020-01-01T00:00:00Z",
+        end_date="2020-02-01T00:00:00Z",
+        bbox=[0, 0, 1, 1],
+    )
+
+    with (
+        patch("worker.SEARCH_CACHE", SearchCache()),
+        patch("worker.COVERAGE_INDEX", None),
+    ):
+        first = await search_archive(provider, req)
+        second = await search_archive(provider, req)
+
+    assert provider.fetches == 1
+    assert first[0]["assets"]["data"].endswith("?sig=1")
+    assert second[0]["assets"]["data"].endswith("?sig=2")
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_indexed_archive_features_stay_unsigned():
+    provider = SigningProvider()
+    index = CoverageIndex()
+    req = JobRequest(
+        start_date="2020-01-01T00:00:00Z",
+        end_date="2020-02-01T00:00:00Z",
+        bbox=[0, 0, 1, 1],
+    )
+
+    with patch("worker.SEARCH_CACHE", None), patch("worker.COVERAGE_INDEX", index):
+        first = await search_archive(provider, req)
+        second = await search_archive(provider, req)
+
+    assert provider.fetches == 1
+    assert first[0]["assets"]["data"].endswith("?sig=1")
+    assert second[0]["assets"]["data"].endswith("?sig=2")
+    assert index.query("Dummy", 0, 2e9, [0, 0, 1, 1])[0]["assets"] == {
+        "data": "https://blob/scene.tif"
+    }
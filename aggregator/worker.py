@@ -1,18 +1,30 @@
 import asyncio
-import json
 import logging
+import os
+import signal
+import uuid
 from datetime import datetime, timezone
-from functools import lru_cache
-from typing import List
+from functools import lru_cache, partial
+from typing import Dict, List
 
 import aio_pika
+from cache import FileCacheBackend, SearchCache
+from contracts import FileBlobStore, codec, offload
+from contracts.metrics import METRICS
+from dispatcher import OrderDispatcher
 from dotenv import load_dotenv
+from feasibility import FeasibilityStore, FeasibilityTracker
+from http_pool import HttpClientPool
 from logging_config import setup_logging
+from providers.base import BaseProvider
 from providers.copernicus import CopernicusProvider
 from providers.planetary_computer import PlanetaryComputerProvider
 from providers.umbra_canopy import UmbraProvider
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
+from resilience import CircuitBreaker, ProviderGuard
+from signing import AssetSigner
+from spatial_index import CoverageIndex
 
 
 # --- Unified Pydantic model ---
@@ -25,6 +37,140 @@ class JobRequest(BaseModel):
 # --- Environment Settings ---
 class Settings(BaseSettings):
     AMQP_URL: str = Field(..., description="AMQP connection string")
+    HTTP_MAX_CONNECTIONS: int = Field(
+        20, description="Max open connections per provider"
+    )
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        10, description="Max idle keep-alive connections per provider"
+    )
+    HTTP_KEEPALIVE_EXPIRY: float = Field(
+        30.0, description="Seconds an idle connection is kept open"
+    )
+    HTTP_TIMEOUT: float = Field(60.0, description="Upstream request timeout (s)")
+    HTTP2_ENABLED: bool = Field(True, description="Use HTTP/2 when available")
+    MAX_IN_FLIGHT_ORDERS: int = Field(
+        5, ge=1, description="Orders processed concurrently (also AMQP prefetch)"
+    )
+    SHUTDOWN_GRACE_SECONDS: float = Field(
+        30.0, description="How long to wait for in-flight orders on shutdown"
+    )
+    WORKER_PROCESSES: int | None = Field(
+        None, ge=1, description="Worker processes under the supervisor (default: cores)"
+    )
+    WORKER_HEARTBEAT_INTERVAL: float = Field(
+        5.0, description="Seconds between worker heartbeats to the supervisor"
+    )
+    WORKER_HEARTBEAT_TIMEOUT: float = Field(
+        60.0, description="Restart a worker after this long without a heartbeat"
+    )
+    WORKER_HEALTH_FILE: str | None = Field(
+        None, description="Where the supervisor writes worker health as JSON"
+    )
+    FEASIBILITY_STATE_DIR: str = Field(
+        "state/feasibilities", description="Where pending feasibility ids are kept"
+    )
+    FEASIBILITY_MIN_INTERVAL: float = Field(
+        5.0, description="First delay (s) before checking a new feasibility"
+    )
+    FEASIBILITY_MAX_INTERVAL: float = Field(
+        60.0, description="Backoff ceiling (s) between feasibility checks"
+    )
+    FEASIBILITY_MAX_AGE: float = Field(
+        1800.0, description="Give up on a feasibility after this many seconds"
+    )
+    SEARCH_CACHE_ENABLED: bool = Field(True, description="Cache archive searches")
+    SEARCH_CACHE_MAX_ENTRIES: int = Field(
+        1024, description="LRU capacity of the in-process search cache"
+    )
+    SEARCH_CACHE_TTL: float = Field(
+        300.0, description="TTL (s) for windows that may still receive scenes"
+    )
+    SEARCH_CACHE_IMMUTABLE_TTL: float = Field(
+        86400.0, description="TTL (s) for settled past windows"
+    )
+    SEARCH_CACHE_BBOX_QUANTUM: float = Field(
+        0.01, description="Grid (degrees) bboxes are snapped to for cache keys"
+    )
+    SEARCH_CACHE_SHARED_DIR: str | None = Field(
+        None, description="Directory shared by workers as a second-level cache"
+    )
+    COVERAGE_INDEX_ENABLED: bool = Field(
+        True, description="Answer searches from already fetched coverage"
+    )
+    COVERAGE_TILE_DEG: float = Field(
+        0.25, description="Tile size (degrees) of the coverage index grid"
+    )
+    COVERAGE_MAX_TILES: int = Field(
+        4096, description="Tiles kept in the coverage index before LRU eviction"
+    )
+    COVERAGE_MAX_RESULTS: int = Field(
+        100, description="Max features returned per provider from the index"
+    )
+    ARCHIVE_STREAMING: bool = Field(
+        False, description="Publish archive results page by page as they arrive"
+    )
+    ARCHIVE_MAX_RESULTS: int = Field(
+        500, ge=1, description="Cap on streamed archive features per provider"
+    )
+    SAS_TOKEN_REFRESH_MARGIN: float = Field(
+        300.0, description="Refresh Planetary Computer SAS tokens this early (s)"
+    )
+    SAS_TOKEN_THREADS: int = Field(
+        4, ge=1, description="Threads for blocking SAS token fetches"
+    )
+    PROVIDER_DEADLINES: Dict[str, float] = Field(
+        {
+            "search_archive": 20.0,
+            "submit_feasibility": 30.0,
+            "search_feasibility": 330.0,
+            "create_task": 60.0,
+        },
+        description="Deadline (s) per provider operation",
+    )
+    PROVIDER_DEFAULT_DEADLINE: float = Field(
+        60.0, description="Deadline (s) for operations not in PROVIDER_DEADLINES"
+    )
+    PROVIDER_RETRIES: int = Field(
+        2, ge=0, description="Retries for idempotent provider calls"
+    )
+    PROVIDER_BACKOFF_BASE: float = Field(
+        0.2, description="Base delay (s) of the jittered retry backoff"
+    )
+    PROVIDER_BACKOFF_MAX: float = Field(
+        5.0, description="Ceiling (s) of the jittered retry backoff"
+    )
+    PROVIDER_HEDGE_AFTER: float | None = Field(
+        None, description="Send a second request after this many seconds (off)"
+    )
+    CIRCUIT_WINDOW: float = Field(
+        60.0, description="Sliding window (s) for provider failure rates"
+    )
+    CIRCUIT_MIN_CALLS: int = Field(
+        5, ge=1, description="Calls in the window before the breaker may open"
+    )
+    CIRCUIT_FAILURE_RATE: float = Field(
+        0.5, gt=0, le=1, description="Failure rate that opens the breaker"
+    )
+    CIRCUIT_OPEN_SECONDS: float = Field(
+        30.0, description="How long an open breaker rejects calls"
+    )
+    BLOB_DIR: str | None = Field(
+        "state/blobs", description="Blob store shared with the gateway (unset: off)"
+    )
+    BLOB_OFFLOAD_BYTES: int = Field(
+        16384,
+        ge=0,
+        description="Result arrays this large go to the blob store (0: off)",
+    )
+    METRICS_LOG_INTERVAL: float = Field(
+        60.0, description="Seconds between metrics snapshots in the log"
+    )
+    DEMO_PACING: bool = Field(
+        False, description="Add artificial delays so demo clients can follow SSE"
+    )
+    DEMO_PACING_SECONDS: float = Field(
+        3.0, description="Length of each demo pause when DEMO_PACING is on"
+    )
 
 
 @lru_cache
@@ -37,29 +183,214 @@ load_dotenv()
 setup_logging()
 logger = logging.getLogger("Aggregator")
 
-PROVIDERS = [
-    CopernicusProvider(),
-    PlanetaryComputerProvider(),
-    UmbraProvider(),
-]
+# Built in main() once the shared HTTP pool exists
+PROVIDERS: List[BaseProvider] = []
+
+# Built in main(); None disables caching
+SEARCH_CACHE: SearchCache | None = None
+
+# Built in main(); None disables overlap reuse
+COVERAGE_INDEX: CoverageIndex | None = None
+
+# Built in main(); one guard per provider name
+GUARDS: Dict[str, ProviderGuard] = {}
+
+# Built in main(); None keeps results inline in events
+BLOB_STORE: FileBlobStore | None = None
+
+# Started in consume() once the channel exists
+FEASIBILITY_TRACKER: FeasibilityTracker | None = None
+
+
+def build_search_cache(settings: Settings) -> SearchCache | None:
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    shared = None
+    if settings.SEARCH_CACHE_SHARED_DIR:
+        shared = FileCacheBackend(settings.SEARCH_CACHE_SHARED_DIR)
+    return SearchCache(
+        max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+        ttl=settings.SEARCH_CACHE_TTL,
+        immutable_ttl=settings.SEARCH_CACHE_IMMUTABLE_TTL,
+        bbox_quantum=settings.SEARCH_CACHE_BBOX_QUANTUM,
+        shared=shared,
+    )
+
+
+def build_coverage_index(settings: Settings) -> CoverageIndex | None:
+    if not settings.COVERAGE_INDEX_ENABLED:
+        return None
+    return CoverageIndex(
+        tile_deg=settings.COVERAGE_TILE_DEG,
+        max_tiles=settings.COVERAGE_MAX_TILES,
+        ttl=settings.SEARCH_CACHE_TTL,
+        max_results=settings.COVERAGE_MAX_RESULTS,
+    )
+
+
+def build_blob_store(settings: Settings) -> FileBlobStore | None:
+    if not settings.BLOB_DIR or not settings.BLOB_OFFLOAD_BYTES:
+        return None
+    os.makedirs(settings.BLOB_DIR, exist_ok=True)
+    return FileBlobStore(settings.BLOB_DIR)
+
+
+def build_providers(
+    http_pool: HttpClientPool, signer: AssetSigner
+) -> List[BaseProvider]:
+    return [
+        CopernicusProvider(http_pool=http_pool),
+        PlanetaryComputerProvider(http_pool=http_pool, signer=signer),
+        UmbraProvider(http_pool=http_pool),
+    ]
+
+
+def build_guards(
+    settings: Settings, providers: List[BaseProvider]
+) -> Dict[str, ProviderGuard]:
+    return {
+        p.name: ProviderGuard(
+            p.name,
+            CircuitBreaker(
+                p.name,
+                window=settings.CIRCUIT_WINDOW,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                failure_rate=settings.CIRCUIT_FAILURE_RATE,
+                open_for=settings.CIRCUIT_OPEN_SECONDS,
+            ),
+            deadlines=settings.PROVIDER_DEADLINES,
+            default_deadline=settings.PROVIDER_DEFAULT_DEADLINE,
+            retries=settings.PROVIDER_RETRIES,
+            backoff_base=settings.PROVIDER_BACKOFF_BASE,
+            backoff_max=settings.PROVIDER_BACKOFF_MAX,
+            hedge_after=settings.PROVIDER_HEDGE_AFTER,
+        )
+        for p in providers
+    }
+
+
+def guarded(provider, op: str, idempotent: bool = True):
+    """Provider method `op` wrapped in the provider's guard, if it has one."""
+    fn = getattr(provider, op)
+    guard = GUARDS.get(provider.name)
+    if guard is None:
+        return fn
+    return partial(guard.call, op, fn, idempotent=idempotent)
+
+
+# --- Demo pacing (off in production) ---
+async def demo_pause():
+    """Sleep only when demo pacing is enabled, so SSE clients can watch updates."""
+    settings = get_settings()
+    if settings.DEMO_PACING:
+        await asyncio.sleep(settings.DEMO_PACING_SECONDS)
 
 
 # --- Helper to publish back into "events" exchange ---
 async def publish_event(ch: aio_pika.Channel, order_id: str, evt: dict, rk: str):
     """Publish event to the events exchange and always inject orderId."""
     evt.setdefault("orderId", order_id)
+    # Stored as the event's id, so gateways can line their buffers up with it
+    evt.setdefault("eventId", str(uuid.uuid4()))
+    if BLOB_STORE is not None:
+        # Large results travel (and get stored) as references
+        evt = await offload(evt, BLOB_STORE, get_settings().BLOB_OFFLOAD_BYTES)
 
     ex = await ch.get_exchange("events")
-    body = json.dumps(evt).encode()
+    body = codec.dumps(evt)
     await ex.publish(aio_pika.Message(body=body), routing_key=rk)
 
 
+# --- Archive search through the cache and coverage index ---
+async def search_archive(provider, request: JobRequest):
+    # Only real upstream calls go through the guard, not cache/index hits
+    fetch = upstream = guarded(provider, "search_archive")
+    if COVERAGE_INDEX is not None:
+        fetch = partial(
+            COVERAGE_INDEX.search,
+            provider.name,
+            fetch=upstream,
+            page_size=getattr(provider, "archive_page_size", None),
+        )
+
+    if SEARCH_CACHE is None:
+        res = await fetch(request.start_date, request.end_date, request.bbox)
+    else:
+        res = await SEARCH_CACHE.get_or_fetch(
+            provider.name,
+            request.start_date,
+            request.end_date,
+            request.bbox,
+            fetch,
+        )
+
+    # Cached features are unsigned; sign them fresh for every order
+    if hasattr(provider, "sign_assets"):
+        res = await provider.sign_assets(res)
+    return res
+
+
+# --- Streaming archive search ---
+async def stream_archive(
+    ch: aio_pika.Channel, order_id: str, provider, request: JobRequest, max_items: int
+):
+    """
+    Publish every archive page as its own `provider.update` ("partial") as soon
+    as it arrives, then a closing "ok"/"empty" update with the totals.
+    """
+    guard = GUARDS.get(provider.name)
+    probe = guard.check() if guard is not None else False
+
+    pages = total = 0
+    try:
+        async for page in provider.iter_archive_pages(
+            request.start_date, request.end_date, request.bbox, max_items=max_items
+        ):
+            pages += 1
+            total += len(page)
+            if hasattr(provider, "sign_assets"):
+                page = await provider.sign_assets(page)
+            evt = {
+                "type": "provider.update",
+                "provider": provider.name,
+                "mode": "archive",
+                "status": "partial",
+                "page": pages,
+                "features": page,
+            }
+            await publish_event(
+                ch, order_id, evt, f"order.{order_id}.provider.{provider.name}.partial"
+            )
+    except Exception as e:
+        # Pages can't be replayed once published, so streams are never retried
+        if guard is not None:
+            guard.record(e)
+        raise
+    else:
+        if guard is not None:
+            guard.record(None)
+    finally:
+        if probe:
+            guard.breaker.release()
+
+    evt = {
+        "type": "provider.update",
+        "provider": provider.name,
+        "mode": "archive",
+        "status": "ok" if total else "empty",
+        "pages": pages,
+        "total": total,
+    }
+    await publish_event(
+        ch, order_id, evt, f"order.{order_id}.provider.{provider.name}.{evt['status']}"
+    )
+
+
 # --- Per-provider order runner ---
 async def call_provider(
     ch: aio_pika.Channel, order_id: str, provider, job_type: str, request: JobRequest
 ):
-    # Small artificial delay for testing SSE updates
-    await asyncio.sleep(3)
+    await demo_pause()
 
     try:
         if job_type == "search":
@@ -76,22 +407,49 @@ async def call_provider(
             if start_dt <= now <= end_dt:
                 modes.append("mixed")
 
+            settings = get_settings()
+
             # Run provider per mode
             for mode in modes:
-                if mode in ["archive", "mixed"]:
-                    res = await provider.search_archive(
-                        request.start_date, request.end_date, request.bbox
+                res, feasibility_id = None, None
+
+                if (
+                    mode == "archive"
+                    and settings.ARCHIVE_STREAMING
+                    and hasattr(provider, "iter_archive_pages")
+                ):
+                    await stream_archive(
+                        ch, order_id, provider, request, settings.ARCHIVE_MAX_RESULTS
                     )
+                    continue
+
+                if mode in ["archive", "mixed"]:
+                    res = await search_archive(provider, request)
                     key = "features"
 
                 if mode in ["feasibility", "mixed"]:
                     lon = (request.bbox[0] + request.bbox[2]) / 2
                     lat = (request.bbox[1] + request.bbox[3]) / 2
                     geometry = {"type": "Point", "coordinates": [lon, lat]}
-                    res = await provider.search_feasibility(
-                        request.start_date, request.end_date, geometry
-                    )
-                    key = "opportunities"
+                    if FEASIBILITY_TRACKER and hasattr(provider, "submit_feasibility"):
+                        # Don't hold the order: the tracker publishes the result
+                        submit = guarded(
+                            provider, "submit_feasibility", idempotent=False
+                        )
+                        feasibility_id = await submit(
+                            request.start_date, request.end_date, geometry
+                        )
+                        await FEASIBILITY_TRACKER.track(
+                            order_id, provider.name, feasibility_id
+                        )
+                    else:
+                        search = guarded(
+                            provider, "search_feasibility", idempotent=False
+                        )
+                        res = await search(
+                            request.start_date, request.end_date, geometry
+                        )
+                        key = "opportunities"
 
                 evt = {
                     "type": "provider.update",
@@ -101,6 +459,9 @@ async def call_provider(
                 }
                 if res:
                     evt[key] = res
+                if feasibility_id:
+                    evt["status"] = "pending"
+                    evt["feasibilityId"] = feasibility_id
 
                 await publish_event(
                     ch,
@@ -115,9 +476,8 @@ async def call_provider(
                 lon = (request.bbox[0] + request.bbox[2]) / 2
                 lat = (request.bbox[1] + request.bbox[3]) / 2
                 geometry = {"type": "Point", "coordinates": [lon, lat]}
-                res = await provider.create_task(
-                    request.start_date, request.end_date, geometry
-                )
+                create = guarded(provider, "create_task", idempotent=False)
+                res = await create(request.start_date, request.end_date, geometry)
                 evt = {
                     "type": "provider.update",
                     "provider": provider.name,
@@ -146,7 +506,7 @@ async def call_provider(
 
 # --- Main order processor ---
 async def process_order(ch: aio_pika.Channel, msg: aio_pika.IncomingMessage):
-    payload = json.loads(msg.body)
+    payload = codec.loads(msg.body)
     order_id = payload["orderId"]
     job_type = payload.get("type", "search")
 
@@ -155,8 +515,8 @@ async def process_order(ch: aio_pika.Channel, msg: aio_pika.IncomingMessage):
     if job_type not in ("search", "task"):
         logger.warning(f"⚠️ Unknown job type {job_type} for order {order_id}")
 
-        # Delay to show the user a failed job
-        await asyncio.sleep(3)
+        # Give demo clients time to see the failed job
+        await demo_pause()
 
         await publish_event(
             ch,
@@ -167,8 +527,8 @@ async def process_order(ch: aio_pika.Channel, msg: aio_pika.IncomingMessage):
         await msg.ack()
         return
 
-    # Delay so the client can see the order started event
-    await asyncio.sleep(3)
+    # Give demo clients time to see the order started event
+    await demo_pause()
 
     await publish_event(
         ch,
@@ -185,6 +545,12 @@ async def process_order(ch: aio_pika.Channel, msg: aio_pika.IncomingMessage):
             *[call_provider(ch, order_id, p, job_type, request) for p in PROVIDERS]
         )
 
+        # Feasibilities still being polled finish the order from the tracker
+        if FEASIBILITY_TRACKER and FEASIBILITY_TRACKER.hold(order_id):
+            logger.info(f"⏳ Order {order_id} waits on pending feasibilities")
+            await msg.ack()
+            return
+
         await publish_event(
             ch,
             order_id,
@@ -204,12 +570,47 @@ async def process_order(ch: aio_pika.Channel, msg: aio_pika.IncomingMessage):
     await msg.ack()
 
 
+async def report_metrics(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        METRICS.log()
+
+
 # --- Main loop ---
 async def main():
+    global PROVIDERS, GUARDS, SEARCH_CACHE, COVERAGE_INDEX, BLOB_STORE
     settings = get_settings()
+
+    http_pool = HttpClientPool(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        timeout=settings.HTTP_TIMEOUT,
+        http2=settings.HTTP2_ENABLED,
+    )
+    signer = AssetSigner(
+        refresh_margin=settings.SAS_TOKEN_REFRESH_MARGIN,
+        max_workers=settings.SAS_TOKEN_THREADS,
+    )
+    PROVIDERS = build_providers(http_pool, signer)
+    GUARDS = build_guards(settings, PROVIDERS)
+    SEARCH_CACHE = build_search_cache(settings)
+    COVERAGE_INDEX = build_coverage_index(settings)
+    BLOB_STORE = build_blob_store(settings)
+
+    try:
+        await consume(settings)
+    finally:
+        await http_pool.aclose()
+        signer.close()
+
+
+async def consume(settings: Settings):
+    global FEASIBILITY_TRACKER
     conn = await aio_pika.connect_robust(settings.AMQP_URL)
     ch = await conn.channel()
-    await ch.set_qos(prefetch_count=5)
+    # Prefetch == max in-flight: the broker holds the backlog, not us
+    await ch.set_qos(prefetch_count=settings.MAX_IN_FLIGHT_ORDERS)
 
     await ch.declare_exchange("orders", aio_pika.ExchangeType.DIRECT, durable=True)
     await ch.declare_exchange("events", aio_pika.ExchangeType.TOPIC, durable=True)
@@ -217,15 +618,44 @@ async def main():
     q = await ch.declare_queue("orders.search", durable=True)
     await q.bind("orders", routing_key="search")
 
-    logger.info("🚀 Worker started, waiting for jobs...")
+    FEASIBILITY_TRACKER = FeasibilityTracker(
+        {p.name: p for p in PROVIDERS},
+        lambda order_id, evt, rk: publish_event(ch, order_id, evt, rk),
+        FeasibilityStore(settings.FEASIBILITY_STATE_DIR),
+        min_interval=settings.FEASIBILITY_MIN_INTERVAL,
+        max_interval=settings.FEASIBILITY_MAX_INTERVAL,
+        max_age=settings.FEASIBILITY_MAX_AGE,
+    )
+    poller = asyncio.create_task(FEASIBILITY_TRACKER.run())
+    reporter = asyncio.create_task(report_metrics(settings.METRICS_LOG_INTERVAL))
+
+    dispatcher = OrderDispatcher(
+        lambda msg: process_order(ch, msg), settings.MAX_IN_FLIGHT_ORDERS
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
 
-    async with q.iterator() as queue_iter:
-        async for msg in queue_iter:
-            try:
-                await process_order(ch, msg)
-            except Exception as e:
-                logger.error(f"Error processing: {e}")
-                await msg.nack(requeue=False)
+    consumer_tag = await q.consume(dispatcher.submit)
+    logger.info(
+        f"🚀 Worker started (max {settings.MAX_IN_FLIGHT_ORDERS} in-flight orders), "
+        "waiting for jobs..."
+    )
+
+    try:
+        await stop.wait()
+        logger.info("🛑 Shutdown requested, no longer accepting orders")
+        await q.cancel(consumer_tag)
+        await dispatcher.drain(timeout=settings.SHUTDOWN_GRACE_SECONDS)
+    finally:
+        # Pending feasibilities stay on disk for the next worker to adopt
+        poller.cancel()
+        reporter.cancel()
+        await asyncio.gather(poller, reporter, return_exceptions=True)
+        METRICS.log()
+        await conn.close()
 
 
 if __name__ == "__main__":
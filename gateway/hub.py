@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import re
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from functools import lru_cache
+from typing import Deque, Dict, List, Set, Tuple
+
+import aio_pika
+from contracts import codec
+from contracts.metrics import METRICS
+
+logger = logging.getLogger("EventHub")
+
+TERMINAL_EVENTS = ("order.complete", "order.failed")
+
+# What the aggregator publishes first for every order
+FIRST_EVENT = "order.started"
+
+Sequenced = Tuple[int, dict]  # (per-order event id, event)
+
+# Last item of a mailbox that was dropped for not keeping up
+EVICTED: Sequenced = (0, {"type": "__evicted__"})
+
+# What a full mailbox does with a new event
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+
+class RawEvent(dict):
+    """Decoded event that keeps the body it came in, to forward as is."""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, evt: dict, raw: bytes):
+        super().__init__(evt)
+        self.raw = raw
+
+
+def parse_event(body: bytes) -> dict:
+    try:
+        evt = codec.loads(body)
+    except Exception:
+        return {"type": "update", "raw": body.decode("utf-8", "ignore")}
+    return RawEvent(evt, body) if isinstance(evt, dict) else {"type": "update"}
+
+
+def encode_event(evt: dict) -> str:
+    """JSON of an event; broker bodies are passed through without re-encoding."""
+    raw = getattr(evt, "raw", None)
+    if raw is not None:
+        return raw.decode()
+    return codec.dumps_str(evt)
+
+
+def order_id_from(routing_key: str, evt: dict) -> str | None:
+    """Order id from the event body, falling back to `order.<id>.…` keys."""
+    if evt.get("orderId"):
+        return evt["orderId"]
+    parts = routing_key.split(".")
+    if len(parts) > 1 and parts[0] == "order":
+        return parts[1]
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _topic_regex(pattern: str) -> re.Pattern:
+    # Matched against "." + routing key so every word carries its own dot
+    words = {"*": r"\.[^.]+", "#": r"(?:\.[^.]+)*"}
+    regex = "".join(
+        words.get(word, r"\." + re.escape(word)) for word in pattern.split(".")
+    )
+    return re.compile(f"^{regex}$")
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """AMQP topic matching: `*` is exactly one word, `#` zero or more."""
+    return _topic_regex(pattern).match(f".{routing_key}") is not None
+
+
+def _coalesce_key(evt: dict) -> tuple | None:
+    # Partial archive pages add up rather than supersede each other
+    if evt.get("type") != "provider.update" or evt.get("status") == "partial":
+        return None
+    return evt.get("orderId"), evt.get("provider"), evt.get("mode")
+
+
+class Mailbox(asyncio.Queue):
+    """
+    Subscriber queue of `(id, event)` items, optionally bounded.
+
+    When full, the overflow policy decides: `drop_oldest` discards the oldest
+    queued `provider.update`, `coalesce` first drops a queued update of the
+    same order/provider/mode and queues the new one, and `disconnect` (or
+    nothing left to drop) has the hub evict the subscriber. Lifecycle events
+    (`order.*`) are never dropped.
+
+    Remembers its subscriptions so the hub can drop it everywhere at once
+    when it is evicted; an evicted mailbox only holds `EVICTED`.
+    """
+
+    def __init__(self, maxsize: int = 0, policy: str = "disconnect"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy {policy!r}")
+        super().__init__(maxsize)
+        self.policy = policy
+        self.orders: Set[str] = set()
+        self.patterns: Set[str] = set()
+        self.evicted = False
+
+    def offer(self, item: Sequenced) -> bool:
+        """Queue an item under the overflow policy; False means evict."""
+        if not self.full():
+            self.put_nowait(item)
+            return True
+        if self.policy == "disconnect":
+            return False
+
+        key = _coalesce_key(item[1])
+        if self.policy == "coalesce" and key is not None:
+            for i, (_, queued) in enumerate(self._queue):
+                if _coalesce_key(queued) == key:
+                    # The newer state goes to the back so ids stay in order
+                    del self._queue[i]
+                    self.put_nowait(item)
+                    METRICS.incr("sse.coalesced")
+                    return True
+
+        for i, (_, queued) in enumerate(self._queue):
+            if queued.get("type") == "provider.update":
+                del self._queue[i]
+                METRICS.incr("sse.dropped")
+                self.put_nowait(item)
+                return True
+        return False
+
+    def renumber(self, ids: Dict[int, int]):
+        """Give queued events new ids, keyed by `id()` of the event."""
+        self._queue = deque((ids.get(id(evt), seq), evt) for seq, evt in self._queue)
+
+    def evict(self):
+        self.evicted = True
+        while not self.empty():
+            self.get_nowait()
+        self.put_nowait(EVICTED)
+
+
+class EventHub:
+    """
+    One gateway-wide consumer on the `events` exchange.
+
+    Every event is read once from a single exclusive queue bound to
+    `order.#` and fanned out to the in-process mailboxes of the SSE
+    connections subscribed to its order, so connecting and disconnecting
+    clients never touches the broker.
+
+    Each event gets a monotonic per-order id and the last `history_size`
+    events of the `max_orders` most recently active orders are kept so
+    late or reconnecting clients can be replayed what they missed.
+
+    Mailboxes can also follow routing-key patterns (`order.*.failed`).
+    Bounded mailboxes apply their overflow policy when full; one that still
+    can't take an event belongs to a slow consumer and is evicted.
+    """
+
+    def __init__(
+        self,
+        exchange: str = "events",
+        binding: str = "order.#",
+        history_size: int = 256,
+        max_orders: int = 10000,
+        mailbox_size: int = 0,
+        overflow_policy: str = "disconnect",
+        prefetch: int = 256,
+    ):
+        self.exchange = exchange
+        self.binding = binding
+        self.history_size = history_size
+        self.max_orders = max_orders
+        self.mailbox_size = mailbox_size
+        self.overflow_policy = overflow_policy
+        self.prefetch = prefetch
+        self._subscribers: Dict[str, Set[Mailbox]] = defaultdict(set)
+        self._patterns: Dict[str, Set[Mailbox]] = defaultdict(set)
+        self._history: OrderedDict[str, Deque[Sequenced]] = OrderedDict()
+        self._last_seq: Dict[str, int] = {}
+        # Orders whose buffered ids match storage's positions
+        self._anchored: Set[str] = set()
+        self._queue: aio_pika.abc.AbstractQueue | None = None
+        self._consumer_tag: str | None = None
+
+    async def start(self, channel: aio_pika.abc.AbstractChannel):
+        # Messages are acked once fanned out, so unacked ones beyond the
+        # prefetch stay queued in the broker instead of in our heap
+        await channel.set_qos(prefetch_count=self.prefetch)
+        ex = await channel.get_exchange(self.exchange)
+        self._queue = await channel.declare_queue(
+            name=f"gateway-events-{uuid.uuid4().hex}",
+            exclusive=True,
+            auto_delete=True,
+            durable=False,
+        )
+        await self._queue.bind(ex, routing_key=self.binding)
+        self._consumer_tag = await self._queue.consume(self.on_message)
+
+    async def stop(self):
+        if self._queue is not None and self._consumer_tag is not None:
+            try:
+                await self._queue.cancel(self._consumer_tag)
+            except Exception:
+                pass
+        self._queue = self._consumer_tag = None
+
+    def mailbox(self, maxsize: int | None = None, policy: str | None = None) -> Mailbox:
+        return Mailbox(
+            self.mailbox_size if maxsize is None else maxsize,
+            policy or self.overflow_policy,
+        )
+
+    def subscribe(
+        self, order_id: str, mailbox: Mailbox | None = None, replay: bool = False
+    ) -> Mailbox:
+        """
+        Mailbox receiving the order's events; pass one in to fan several in.
+        With `replay`, buffered events are delivered first.
+        """
+        if mailbox is None:
+            mailbox = self.mailbox()
+        self._subscribers[order_id].add(mailbox)
+        mailbox.orders.add(order_id)
+        if replay:
+            for item in self.history(order_id):
+                if not self._deliver(mailbox, item):
+                    break
+        return mailbox
+
+    def unsubscribe(self, order_id: str, mailbox: Mailbox):
+        mailbox.orders.discard(order_id)
+        mailboxes = self._subscribers.get(order_id)
+        if mailboxes is None:
+            return
+        mailboxes.discard(mailbox)
+        if not mailboxes:
+            del self._subscribers[order_id]
+
+    def subscribe_pattern(self, pattern: str, mailbox: Mailbox) -> Mailbox:
+        self._patterns[pattern].add(mailbox)
+        mailbox.patterns.add(pattern)
+        return mailbox
+
+    def unsubscribe_pattern(self, pattern: str, mailbox: Mailbox):
+        mailbox.patterns.discard(pattern)
+        mailboxes = self._patterns.get(pattern)
+        if mailboxes is None:
+            return
+        mailboxes.discard(mailbox)
+        if not mailboxes:
+            del self._patterns[pattern]
+
+    def close(self, mailbox: Mailbox):
+        """Drop every subscription of a mailbox."""
+        for order_id in list(mailbox.orders):
+            self.unsubscribe(order_id, mailbox)
+        for pattern in list(mailbox.patterns):
+            self.unsubscribe_pattern(pattern, mailbox)
+
+    def subscriber_count(self, order_id: str) -> int:
+        return len(self._subscribers.get(order_id, ()))
+
+    def last_seq(self, order_id: str) -> int:
+        return self._last_seq.get(order_id, 0)
+
+    def history(self, order_id: str, after: int = 0) -> List[Sequenced]:
+        """Buffered events of an order with an id greater than `after`."""
+        return [item for item in self._history.get(order_id, ()) if item[0] > after]
+
+    def covers(self, order_id: str, after: int) -> bool:
+        """
+        Whether the buffer still holds every event after `after`.
+
+        Only buffers known to number the order like storage does count: ones
+        that saw its `order.started` first, or that were rebased on storage.
+        """
+        ring = self._history.get(order_id)
+        if not ring or order_id not in self._anchored:
+            return False
+        return ring[0][0] <= after + 1 and after <= ring[-1][0]
+
+    def rebase(self, order_id: str, stored: List[dict]):
+        """
+        Align an order's ids with the events storage holds for it.
+
+        Stored events are numbered by their position. After a gateway restart
+        or an eviction the buffer numbered the order from 1 again, so buffered
+        events are matched to stored ones by `eventId`: those storage has take
+        its ids and the rest follow the stored ones. Events still queued for
+        subscribers are renumbered too.
+        """
+        ring = self._history.get(order_id)
+        if not ring and not stored:
+            return
+        positions: Dict[str, int] = {}
+        for pos, evt in enumerate(stored, 1):
+            if evt.get("eventId"):
+                positions.setdefault(evt["eventId"], pos)
+
+        last = len(stored)
+        items: List[Sequenced] = []
+        for _, evt in ring or ():
+            seq = positions.get(evt.get("eventId"))
+            if seq is None:
+                last += 1
+                seq = last
+            items.append((seq, evt))
+        items.sort(key=lambda item: item[0])
+        ids = {id(evt): seq for seq, evt in items}
+
+        self._history[order_id] = deque(items, maxlen=self.history_size)
+        self._history.move_to_end(order_id)
+        self._last_seq[order_id] = last
+        self._anchored.add(order_id)
+        for mailbox in self._subscribers.get(order_id, ()):
+            mailbox.renumber(ids)
+        self._trim()
+
+    def _trim(self):
+        while len(self._history) > self.max_orders:
+            oldest, _ = self._history.popitem(last=False)
+            self._last_seq.pop(oldest, None)
+            self._anchored.discard(oldest)
+
+    def _remember(self, order_id: str, evt: dict) -> int:
+        seq = self._last_seq.get(order_id, 0) + 1
+        ring = self._history.get(order_id)
+        if ring is None:
+            ring = self._history[order_id] = deque(maxlen=self.history_size)
+        self._history.move_to_end(order_id)
+        ring.append((seq, evt))
+        self._last_seq[order_id] = seq
+        if seq == 1 and evt.get("type") == FIRST_EVENT:
+            self._anchored.add(order_id)
+        self._trim()
+        return seq
+
+    def _deliver(self, mailbox: Mailbox, item: Sequenced) -> bool:
+        if mailbox.offer(item):
+            return True
+        logger.warning(f"🐢 Evicting slow subscriber of {sorted(mailbox.orders)}")
+        METRICS.incr("sse.evicted")
+        self.close(mailbox)
+        mailbox.evict()
+        return False
+
+    def publish(self, order_id: str, evt: dict, routing_key: str | None = None) -> int:
+        seq = self._remember(order_id, evt)
+
+        # A mailbox following both the order and a pattern gets it once
+        targets = set(self._subscribers.get(order_id, ()))
+        if routing_key:
+            for pattern, mailboxes in self._patterns.items():
+                if topic_matches(pattern, routing_key):
+                    targets |= mailboxes
+
+        for mailbox in targets:
+            self._deliver(mailbox, (seq, evt))
+        return seq
+
+    async def on_message(self, msg: aio_pika.abc.AbstractIncomingMessage):
+        async with msg.process():
+            evt = parse_event(msg.body)
+            order_id = order_id_from(msg.routing_key or "", evt)
+            if order_id is None:
+                logger.warning(f"⚠️ Event without order id on {msg.routing_key}")
+                return
+            self.publish(order_id, evt, msg.routing_key)
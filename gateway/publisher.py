@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Tuple
+
+import aio_pika
+from contracts.metrics import METRICS
+
+logger = logging.getLogger("Publisher")
+
+
+class OutboxFull(RuntimeError):
+    pass
+
+
+@dataclass
+class OutboxItem:
+    body: bytes
+    routing_key: str
+    message_id: str | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+class PublisherPool:
+    """
+    Confirmed publishing over a small pool of AMQP channels.
+
+    Orders go into a bounded in-memory outbox and are drained in batches:
+    every message of a batch is published at once, spread round-robin over
+    the channels (each with its exchange handle cached), and the publisher
+    confirms are awaited together. Unconfirmed messages go back to the front
+    of the outbox and are retried with jittered backoff, up to `max_attempts`
+    times each (0 retries forever); after that they are logged and dropped.
+    """
+
+    def __init__(
+        self,
+        exchange: str = "orders",
+        channels: int = 4,
+        outbox_size: int = 10000,
+        batch_size: int = 100,
+        confirm_timeout: float = 5.0,
+        retry_base: float = 0.5,
+        retry_max: float = 10.0,
+        max_attempts: int = 20,
+    ):
+        self.exchange = exchange
+        self.channels = channels
+        self.outbox_size = outbox_size
+        self.batch_size = batch_size
+        self.confirm_timeout = confirm_timeout
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_attempts = max_attempts
+
+        self._pool: List[Tuple[aio_pika.abc.AbstractChannel, aio_pika.Exchange]] = []
+        self._next = 0
+        self._outbox: Deque[OutboxItem] = deque()
+        self._ready = asyncio.Event()
+        self._failures = 0
+        self._runner: asyncio.Task | None = None
+
+    async def start(self, connection: aio_pika.abc.AbstractConnection):
+        for _ in range(self.channels):
+            channel = await connection.channel(publisher_confirms=True)
+            self._pool.append((channel, await channel.get_exchange(self.exchange)))
+        self._runner = asyncio.create_task(self.run())
+
+    async def stop(self, timeout: float = 5.0):
+        """Give the outbox `timeout` seconds to drain, then close the channels."""
+        deadline = time.monotonic() + timeout
+        while self._outbox and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._outbox:
+            logger.warning(f"⚠️ Dropping {len(self._outbox)} unpublished messages")
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        for channel, _ in self._pool:
+            try:
+                await channel.close()
+            except Exception:
+                pass
+        self._pool.clear()
+
+    def pending(self) -> int:
+        return len(self._outbox)
+
+    def enqueue(self, body: bytes, routing_key: str, message_id: str | None = None):
+        if len(self._outbox) >= self.outbox_size:
+            METRICS.incr("publish.rejected", exchange=self.exchange)
+            raise OutboxFull(f"{self.exchange} outbox is full")
+        self._outbox.append(OutboxItem(body, routing_key, message_id))
+        self._ready.set()
+
+    def enqueue_many(self, items: List[Tuple[bytes, str, str | None]]):
+        """Enqueue `(body, routing_key, message_id)` items all or nothing."""
+        if len(self._outbox) + len(items) > self.outbox_size:
+            METRICS.incr("publish.rejected", len(items), exchange=self.exchange)
+            raise OutboxFull(f"{self.exchange} outbox can't take {len(items)} more")
+        self._outbox.extend(OutboxItem(*item) for item in items)
+        self._ready.set()
+
+    def _exchange(self) -> aio_pika.Exchange:
+        _, exchange = self._pool[self._next % len(self._pool)]
+        self._next += 1
+        return exchange
+
+    async def _publish(self, item: OutboxItem):
+        t0 = time.monotonic()
+        await self._exchange().publish(
+            aio_pika.Message(
+                body=item.body,
+                message_id=item.message_id,
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            ),
+            routing_key=item.routing_key,
+            timeout=self.confirm_timeout,
+        )
+        now = time.monotonic()
+        METRICS.observe("publish.confirm_latency", now - t0, exchange=self.exchange)
+        METRICS.observe(
+            "publish.outbox_latency", now - item.enqueued_at, exchange=self.exchange
+        )
+
+    async def flush(self) -> int:
+        """Publish one batch from the outbox; returns how many failed."""
+        batch = [
+            self._outbox.popleft()
+            for _ in range(min(self.batch_size, len(self._outbox)))
+        ]
+        results = await asyncio.gather(
+            *[self._publish(item) for item in batch], return_exceptions=True
+        )
+
+        failed, retry = 0, []
+        for item, result in zip(batch, results):
+            if not isinstance(result, Exception):
+                continue
+            failed += 1
+            item.attempts += 1
+            if self.max_attempts and item.attempts >= self.max_attempts:
+                METRICS.incr("publish.dropped", exchange=self.exchange)
+                logger.error(
+                    f"❌ Dropping message {item.message_id} for {self.exchange} "
+                    f"after {item.attempts} attempts: {result!r}"
+                )
+                continue
+            retry.append(item)
+            logger.warning(
+                f"⚠️ Publish to {self.exchange} failed "
+                f"(attempt {item.attempts}): {result!r}"
+            )
+        METRICS.incr("publish.confirmed", len(batch) - failed, exchange=self.exchange)
+        if failed:
+            METRICS.incr("publish.failed", failed, exchange=self.exchange)
+            # Keep the original order for the retry
+            self._outbox.extendleft(reversed(retry))
+        return failed
+
+    async def run(self):
+        while True:
+            if not self._outbox:
+                self._ready.clear()
+                await self._ready.wait()
+
+            if await self.flush():
+                self._failures += 1
+                delay = random.uniform(
+                    0, min(self.retry_max, self.retry_base * 2**self._failures)
+                )
+                await asyncio.sleep(delay)
+            else:
+                self._failures = 0
@@ -0,0 +1,64 @@
+import logging
+from typing import List
+
+import httpx
+from hub import EventHub, Sequenced
+
+logger = logging.getLogger("Replay")
+
+
+async def fetch_stored_events(
+    client: httpx.AsyncClient, order_id: str, page_size: int = 500
+) -> List[dict]:
+    """All events the storage service persisted for an order, oldest first."""
+    rows: List[dict] = []
+    params = {"limit": page_size}
+    while True:
+        r = await client.get(f"/orders/{order_id}/events", params=params)
+        if r.status_code == 404:
+            return []
+        r.raise_for_status()
+        rows.extend(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": page_size, "cursor": cursor}
+
+    # Storage lists newest first
+    rows.reverse()
+    return [
+        {
+            **(row.get("data") or {}),
+            "type": row["type"],
+            "orderId": order_id,
+            # The id the aggregator stamped, so the hub can match it
+            "eventId": row["id"],
+        }
+        for row in rows
+    ]
+
+
+async def replay_events(
+    hub: EventHub, client: httpx.AsyncClient, order_id: str, after: int
+) -> List[Sequenced]:
+    """
+    Events of an order with an id greater than `after`.
+
+    Served from the hub's ring buffer when it still covers the gap. Otherwise
+    the persisted events are fetched from storage (their position in the
+    order's history is their id) and topped up with anything buffered that
+    storage doesn't have yet. The hub is rebased on the stored events first,
+    matching them by `eventId`, so buffered and live ids continue after them.
+    """
+    if hub.covers(order_id, after):
+        return hub.history(order_id, after)
+
+    try:
+        stored = await fetch_stored_events(client, order_id)
+    except httpx.HTTPError as e:
+        logger.warning(f"⚠️ Replay from storage failed for {order_id}: {e}")
+        return hub.history(order_id, after)
+
+    hub.rebase(order_id, stored)
+    events = [(seq, evt) for seq, evt in enumerate(stored, 1) if seq > after]
+    return events + hub.history(order_id, max(after, len(stored)))
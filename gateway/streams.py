@@ -0,0 +1,93 @@
+import time
+import uuid
+from typing import Dict, Iterable
+
+from hub import EventHub, Mailbox
+
+
+class Stream:
+    """One client connection following any number of orders and patterns."""
+
+    def __init__(self, hub: EventHub, mailbox: Mailbox):
+        self.id = str(uuid.uuid4())
+        self.hub = hub
+        self.mailbox = mailbox
+        self.connected = False
+        self.touched_at = time.monotonic()
+
+    def subscribe(self, orders: Iterable[str] = (), patterns: Iterable[str] = ()):
+        self.touched_at = time.monotonic()
+        for order_id in orders:
+            if order_id not in self.mailbox.orders:
+                self.hub.subscribe(order_id, self.mailbox, replay=True)
+        for pattern in patterns:
+            self.hub.subscribe_pattern(pattern, self.mailbox)
+
+    def unsubscribe(self, orders: Iterable[str] = (), patterns: Iterable[str] = ()):
+        self.touched_at = time.monotonic()
+        for order_id in orders:
+            self.hub.unsubscribe(order_id, self.mailbox)
+        for pattern in patterns:
+            self.hub.unsubscribe_pattern(pattern, self.mailbox)
+
+    def subscriptions(self) -> dict:
+        return {
+            "orders": sorted(self.mailbox.orders),
+            "patterns": sorted(self.mailbox.patterns),
+        }
+
+    def close(self):
+        self.hub.close(self.mailbox)
+
+
+class StreamRegistry:
+    """
+    Multiplexed streams by id.
+
+    Each stream has its own bounded mailbox (`queue_size` events). A stream
+    is closed when its client disconnects, when it is evicted for falling
+    behind, or after `idle_timeout` seconds without a client attached.
+    """
+
+    def __init__(
+        self,
+        hub: EventHub,
+        queue_size: int = 1000,
+        max_streams: int = 10000,
+        idle_timeout: float = 60.0,
+    ):
+        self.hub = hub
+        self.queue_size = queue_size
+        self.max_streams = max_streams
+        self.idle_timeout = idle_timeout
+        self._streams: Dict[str, Stream] = {}
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def create(self) -> Stream | None:
+        self.expire()
+        if len(self._streams) >= self.max_streams:
+            return None
+        stream = Stream(self.hub, self.hub.mailbox(self.queue_size))
+        self._streams[stream.id] = stream
+        return stream
+
+    def get(self, stream_id: str) -> Stream | None:
+        stream = self._streams.get(stream_id)
+        if stream is None or stream.mailbox.evicted:
+            return None
+        return stream
+
+    def close(self, stream_id: str):
+        stream = self._streams.pop(stream_id, None)
+        if stream is not None:
+            stream.close()
+
+    def expire(self):
+        """Close streams that were evicted or never got (back) a client."""
+        cutoff = time.monotonic() - self.idle_timeout
+        for stream_id, stream in list(self._streams.items()):
+            idle = not stream.connected and stream.touched_at < cutoff
+            if idle or stream.mailbox.evicted:
+                self.close(stream_id)
@@ -5,6 +5,14 @@ import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
 from main import app
+from sse_starlette.sse import AppStatus
+
+
+@pytest.fixture(autouse=True)
+def reset_sse_app_status():
+    """sse-starlette keeps a module-level exit event bound to the first loop."""
+    AppStatus.should_exit_event = None
+    yield
 
 
 @pytest.fixture
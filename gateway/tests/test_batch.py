@@ -0,0 +1,83 @@
+import asyncio
+
+import main
+import pytest
+from httpx import ASGITransport, AsyncClient
+from hub import EventHub
+from main import app
+from publisher import PublisherPool
+
+ORDER = {
+    "bbox": [10.0, 45.0, 10.5, 45.5],
+    "start_date": "2024-01-01T00:00:00Z",
+    "end_date": "2024-01-31T00:00:00Z",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr("main.publisher", PublisherPool(outbox_size=3))
+    monkeypatch.setattr("main.hub", EventHub())
+    monkeypatch.setattr("main.batches", {})
+    transport = ASGITransport(app=app)
+    return AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.mark.unit
+async def test_batch_enqueues_every_order(client):
+    async with client:
+        r = await client.post(
+            "/orders:batch", json={"orders": [ORDER, {**ORDER, "type": "task"}]}
+        )
+
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert len(body["orders"]) == 2
+    assert body["sseUrl"] == f"/batches/{body['batchId']}/events"
+
+    assert main.publisher.pending() == 2
+
+
+@pytest.mark.unit
+async def test_batch_is_validated_in_one_pass(client):
+    bad = {**ORDER, "bbox": [1, 1, 0, 0]}
+    async with client:
+        r = await client.post("/orders:batch", json={"orders": [ORDER, bad, bad]})
+
+    assert r.status_code == 422
+    assert [e["loc"][2] for e in r.json()["detail"]] == [1, 2]
+
+
+@pytest.mark.unit
+async def test_batch_is_all_or_nothing_when_outbox_is_full(client):
+    async with client:
+        r = await client.post("/orders:batch", json={"orders": [ORDER] * 4})
+
+    assert r.status_code == 503
+
+    assert main.publisher.pending() == 0
+
+
+@pytest.mark.unit
+async def test_batch_stream_multiplexes_orders_until_all_finish(client):
+    async with client:
+        r = await client.post("/orders:batch", json={"orders": [ORDER, ORDER]})
+        body = r.json()
+        first, second = [o["orderId"] for o in body["orders"]]
+
+        hub = main.hub
+        hub.publish(first, {"type": "order.started", "orderId": first})
+
+        async def feed():
+            while not hub.subscriber_count(second):
+                await asyncio.sleep(0.01)
+            hub.publish(first, {"type": "order.complete", "orderId": first})
+            hub.publish(second, {"type": "order.failed", "orderId": second})
+
+        feeder = asyncio.create_task(feed())
+        r = await client.get(body["sseUrl"])
+        await feeder
+
+    assert f"id: {first}:1" in r.text
+    assert f"id: {first}:2" in r.text
+    assert f"id: {second}:1" in r.text
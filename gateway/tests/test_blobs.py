@@ -0,0 +1,92 @@
+import gzip
+import os
+import time
+
+import main
+import pytest
+from contracts import FileBlobStore, offload
+from httpx import ASGITransport, AsyncClient
+from main import app
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = FileBlobStore(str(tmp_path))
+    monkeypatch.setattr(main, "blobs", store)
+    return store
+
+
+@pytest.fixture
+def client():
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.unit
+async def test_offload_replaces_large_fields_with_refs(store):
+    features = [{"id": i} for i in range(100)]
+    evt = {"type": "provider.update", "features": features, "opportunities": [1]}
+
+    out = await offload(evt, store, threshold=256)
+
+    assert out["opportunities"] == [1]
+    assert "features" not in out and evt["features"] is features
+    ref = out["featuresRef"]
+    assert ref["count"] == 100 and ref["digest"].startswith("sha256:")
+    # Same content, same blob
+    assert (await offload(evt, store, threshold=256))["featuresRef"] == ref
+
+
+@pytest.mark.unit
+async def test_blob_served_by_digest(store, client):
+    ref = await store.put([{"id": "scene-1"}])
+
+    async with client:
+        r = await client.get(
+            f"/blobs/{ref.digest}", headers={"Accept-Encoding": "identity"}
+        )
+        assert r.status_code == 200
+        assert r.json() == [{"id": "scene-1"}]
+        assert "immutable" in r.headers["cache-control"]
+
+        r = await client.get(
+            f"/blobs/{ref.digest}", headers={"If-None-Match": r.headers["etag"]}
+        )
+        assert r.status_code == 304
+
+        missing = "sha256:" + "0" * 64
+        assert (await client.get(f"/blobs/{missing}")).status_code == 404
+        assert (await client.get("/blobs/../../etc/passwd")).status_code == 404
+
+
+@pytest.mark.unit
+async def test_blob_served_gzipped_as_stored(store, client):
+    value = {"big": "x" * 1000}
+    ref = await store.put(value)
+    with open(store.path(ref.digest), "rb") as f:
+        assert gzip.decompress(f.read()) == b'{"big":"' + b"x" * 1000 + b'"}'
+
+    async with client:
+        r = await client.get(
+            f"/blobs/{ref.digest}", headers={"Accept-Encoding": "gzip"}
+        )
+    assert r.headers["content-encoding"] == "gzip"
+    assert int(r.headers["content-length"]) < ref.size
+    assert r.json() == value
+
+
+@pytest.mark.unit
+async def test_sweep_deletes_blobs_unused_past_retention(store):
+    old = await store.put(["old"])
+    kept = await store.put(["kept"])
+    reused = await store.put(["reused"])
+    day_ago = time.time() - 86400
+    for ref in (old, reused):
+        os.utime(store.path(ref.digest), (day_ago, day_ago))
+
+    # Offloading the same content again keeps its blob alive
+    await store.put(["reused"])
+
+    assert store.sweep(max_age=3600) == 1
+    assert await store.get(old.digest) is None
+    assert await store.get(kept.digest) == ["kept"]
+    assert await store.get(reused.digest) == ["reused"]
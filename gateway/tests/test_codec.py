@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from contracts import codec
+
+VALUE = {
+    "type": "provider.update",
+    "orderId": uuid.UUID(int=1),
+    "at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    "features": [{"id": "é", "cloud": 12.5}],
+}
+
+
+@pytest.mark.unit
+def test_fast_path_and_stdlib_fallback_agree():
+    assert codec.dumps(VALUE) == codec._stdlib_dumps(VALUE)
+    assert codec.dumps(VALUE, sort_keys=True) == codec._stdlib_dumps(
+        VALUE, sort_keys=True
+    )
+    assert codec.loads(codec.dumps(VALUE)) == codec._stdlib_loads(codec.dumps(VALUE))
+    assert codec.dumps_str({"a": 1}) == '{"a":1}'
+
+
+@pytest.mark.unit
+def test_malformed_input_is_a_value_error():
+    with pytest.raises(ValueError):
+        codec.loads(b"{")
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from hub import EventHub, encode_event, order_id_from, parse_event
+from main import app
+
+
+class FakeMessage:
+    def __init__(self, routing_key: str, evt: dict):
+        self.routing_key = routing_key
+        self.body = json.dumps(evt).encode()
+        self.acked = False
+
+    @asynccontextmanager
+    async def process(self):
+        yield
+        self.acked = True
+
+
+def test_order_id_falls_back_to_routing_key():
+    assert order_id_from("order.abc.started", {}) == "abc"
+    assert order_id_from("order.abc.started", {"orderId": "xyz"}) == "xyz"
+    assert order_id_from("other", {}) is None
+
+
+@pytest.mark.unit
+async def test_hub_fans_out_to_subscribers_of_the_order():
+    hub = EventHub()
+    first, second = hub.subscribe("a"), hub.subscribe("a")
+    other = hub.subscribe("b")
+
+    msg = FakeMessage("order.a.started", {"type": "order.started", "orderId": "a"})
+    await hub.on_message(msg)
+
+    assert msg.acked
+    assert first.get_nowait() == (1, {"type": "order.started", "orderId": "a"})
+    assert second.get_nowait()[1]["type"] == "order.started"
+    assert other.empty()
+
+    hub.unsubscribe("a", first)
+    hub.unsubscribe("a", second)
+    assert hub.subscriber_count("a") == 0
+
+
+@pytest.mark.unit
+async def test_sse_streams_hub_events_until_completion(monkeypatch):
+    hub = EventHub()
+    monkeypatch.setattr("main.hub", hub)
+
+    async def feed():
+        while not hub.subscriber_count("o1"):
+            await asyncio.sleep(0.01)
+        for evt_type in ("order.started", "order.complete"):
+            await hub.on_message(
+                FakeMessage(f"order.o1.{evt_type}", {"type": evt_type, "orderId": "o1"})
+            )
+
+    feeder = asyncio.create_task(feed())
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/orders/o1/events")
+    await feeder
+
+    assert r.status_code == 200
+    assert "id: 1" in r.text
+    assert "event: order.started" in r.text
+    assert "event: order.complete" in r.text
+    assert hub.subscriber_count("o1") == 0
+
+
+@pytest.mark.unit
+def test_hub_keeps_bounded_history_per_order():
+    hub = EventHub(history_size=2, max_orders=1)
+    hub.publish("a", {"type": "order.started"})
+    for i in range(2):
+        hub.publish("a", {"type": "provider.update", "n": i})
+
+    assert [seq for seq, _ in hub.history("a")] == [2, 3]
+    assert hub.covers("a", 1)
+    assert not hub.covers("a", 0)  # event 1 was evicted
+    assert not hub.covers("a", 7)  # ids from before a restart
+
+    hub.publish("b", {"type": "order.started"})
+    assert hub.history("a") == []  # least recently active order dropped
+
+
+@pytest.mark.unit
+def test_broker_bodies_are_forwarded_without_reencoding():
+    body = b'{"type": "provider.update",   "orderId": "a", "n": 1}'
+    evt = parse_event(body)
+    assert evt["orderId"] == "a"
+    assert encode_event(evt) == body.decode()
+    # Events built in-process are encoded as usual
+    assert encode_event({"type": "x"}) == '{"type":"x"}'
+    assert parse_event(b"not json")["type"] == "update"
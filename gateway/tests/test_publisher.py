@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from main import app
+from publisher import OutboxFull, PublisherPool
+
+
+class FakeExchange:
+    def __init__(self, fail: int = 0):
+        self.fail = fail
+        self.published = []
+
+    async def publish(self, message, routing_key, timeout=None):
+        if self.fail:
+            self.fail -= 1
+            raise asyncio.TimeoutError()
+        self.published.append((message.message_id, routing_key))
+
+
+class FakeChannel:
+    def __init__(self, exchange: FakeExchange):
+        self.exchange = exchange
+        self.closed = False
+
+    async def get_exchange(self, name):
+        return self.exchange
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, exchanges):
+        self.exchanges = iter(exchanges)
+        self.opened = []
+
+    async def channel(self, publisher_confirms=True):
+        assert publisher_confirms
+        channel = FakeChannel(next(self.exchanges))
+        self.opened.append(channel)
+        return channel
+
+
+@pytest.mark.unit
+async def test_batch_is_spread_over_the_channel_pool():
+    exchanges = [FakeExchange(), FakeExchange()]
+    pool = PublisherPool(channels=2, batch_size=10)
+    await pool.start(FakeConnection(exchanges))
+
+    for i in range(4):
+        pool.enqueue(b"{}", "search", message_id=str(i))
+    await pool.stop(timeout=1)
+
+    assert [len(ex.published) for ex in exchanges] == [2, 2]
+    assert pool.pending() == 0
+
+
+@pytest.mark.unit
+async def test_unconfirmed_messages_are_retried_in_order():
+    exchange = FakeExchange(fail=1)
+    pool = PublisherPool(channels=1, batch_size=2, retry_base=0)
+    pool._pool = [(FakeChannel(exchange), exchange)]
+
+    pool.enqueue(b"{}", "search", message_id="a")
+    pool.enqueue(b"{}", "search", message_id="b")
+    assert await pool.flush() == 1
+    assert pool.pending() == 1
+    assert await pool.flush() == 0
+
+    assert exchange.published == [("b", "search"), ("a", "search")]
+
+
+@pytest.mark.unit
+async def test_messages_past_max_attempts_are_dropped():
+    exchange = FakeExchange(fail=2)
+    pool = PublisherPool(channels=1, batch_size=1, retry_base=0, max_attempts=2)
+    pool._pool = [(FakeChannel(exchange), exchange)]
+
+    pool.enqueue(b"{}", "search", message_id="poison")
+    pool.enqueue(b"{}", "search", message_id="next")
+    assert await pool.flush() == 1
+    assert await pool.flush() == 1
+    assert pool.pending() == 1
+    assert await pool.flush() == 0
+
+    assert exchange.published == [("next", "search")]
+
+
+@pytest.mark.unit
+def test_outbox_is_bounded():
+    pool = PublisherPool(outbox_size=1)
+    pool.enqueue(b"{}", "search")
+    with pytest.raises(OutboxFull):
+        pool.enqueue(b"{}", "search")
+
+
+@pytest.mark.unit
+async def test_create_order_rejects_when_outbox_is_full(monkeypatch):
+    monkeypatch.setattr("main.publisher", PublisherPool(outbox_size=0))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.post("/orders", json={"bbox": [0, 0, 1, 1]})
+
+    assert r.status_code == 503
@@ -0,0 +1,98 @@
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+from hub import EventHub
+from main import app
+from replay import replay_events
+
+
+def storage(rows: list, status_code: int = 200) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, json=rows)
+
+    return httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://storage"
+    )
+
+
+# Storage lists events newest first
+STORED = [
+    {"id": "e3", "type": "order.complete", "data": {}},
+    {"id": "e2", "type": "provider.update", "data": {"provider": "Umbra"}},
+    {"id": "e1", "type": "order.started", "data": {}},
+]
+
+
+@pytest.mark.unit
+async def test_replay_served_from_ring_buffer_when_it_covers_the_gap():
+    hub = EventHub()
+    hub.publish("o1", {"type": "order.started"})
+    hub.publish("o1", {"type": "provider.update"})
+
+    events = await replay_events(hub, storage([], status_code=500), "o1", after=1)
+    assert events == [(2, {"type": "provider.update"})]
+
+
+@pytest.mark.unit
+async def test_replay_falls_back_to_storage_for_unknown_orders():
+    events = await replay_events(EventHub(), storage(STORED), "o1", after=1)
+
+    assert [seq for seq, _ in events] == [2, 3]
+    assert events[0][1] == {
+        "provider": "Umbra",
+        "type": "provider.update",
+        "orderId": "o1",
+        "eventId": "e2",
+    }
+
+
+@pytest.mark.unit
+async def test_fresh_client_of_an_order_the_hub_never_saw_gets_storage_history():
+    events = await replay_events(EventHub(), storage(STORED), "o1", after=0)
+
+    assert [evt["type"] for _, evt in events] == [
+        "order.started",
+        "provider.update",
+        "order.complete",
+    ]
+
+
+@pytest.mark.unit
+async def test_sse_resumes_after_last_event_id(monkeypatch):
+    hub = EventHub()
+    for evt_type in ("order.started", "provider.update", "order.complete"):
+        hub.publish("o1", {"type": evt_type, "orderId": "o1"})
+    monkeypatch.setattr("main.hub", hub)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/orders/o1/events", headers={"Last-Event-ID": "1"})
+
+    assert "event: order.started" not in r.text
+    assert "id: 2" in r.text
+    assert "event: order.complete" in r.text
+
+
+@pytest.mark.unit
+async def test_restarted_hub_is_aligned_with_storage_by_event_id():
+    # Storage has 12 events; the restarted hub buffered the last 3, of which
+    # the persister has only stored the first 2 so far
+    stored = [
+        {"id": f"e{n}", "type": "provider.update", "data": {"n": n}}
+        for n in range(12, 0, -1)
+    ]
+    hub = EventHub()
+    for n in (11, 12):
+        hub.publish("o1", {"type": "provider.update", "n": n, "eventId": f"e{n}"})
+    inbox = hub.subscribe("o1")
+    hub.publish("o1", {"type": "order.complete", "eventId": "e13"})
+    # A restarted hub doesn't know how the order was numbered before
+    assert not hub.covers("o1", 1)
+
+    events = await replay_events(hub, storage(stored), "o1", after=10)
+
+    assert [seq for seq, _ in events] == [11, 12, 13]
+    assert events[-1][1]["type"] == "order.complete"
+    assert inbox.get_nowait() == (13, {"type": "order.complete", "eventId": "e13"})
+    assert hub.publish("o1", {"type": "late", "eventId": "e14"}) == 14
+    assert hub.covers("o1", 12)
@@ -0,0 +1,156 @@
+import asyncio
+
+import main
+import pytest
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from hub import EVICTED, EventHub
+from main import app
+from streams import StreamRegistry
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = EventHub()
+    monkeypatch.setattr("main.hub", hub)
+    monkeypatch.setattr("main.streams", StreamRegistry(hub, queue_size=2))
+    return hub
+
+
+@pytest.mark.unit
+def test_pattern_subscriptions_follow_routing_keys(hub):
+    mailbox = hub.subscribe_pattern("order.*.failed", hub.mailbox())
+    hub.subscribe("a", mailbox)
+
+    hub.publish("a", {"type": "order.failed"}, "order.a.failed")
+    hub.publish("b", {"type": "order.started"}, "order.b.started")
+    hub.publish("b", {"type": "order.failed"}, "order.b.failed")
+
+    # Matching both the order and the pattern still delivers once
+    assert [mailbox.get_nowait()[1] for _ in range(mailbox.qsize())] == [
+        {"type": "order.failed"},
+        {"type": "order.failed"},
+    ]
+
+
+@pytest.mark.unit
+def test_slow_consumer_is_evicted_and_unsubscribed(hub):
+    mailbox = hub.subscribe("a", hub.mailbox(maxsize=2))
+    hub.subscribe_pattern("order.#", mailbox)
+    for _ in range(3):
+        hub.publish("a", {"type": "provider.update"}, "order.a.provider.x.ok")
+
+    assert mailbox.evicted
+    assert mailbox.get_nowait() is EVICTED
+    assert hub.subscriber_count("a") == 0
+    assert not mailbox.patterns
+
+
+@pytest.mark.unit
+async def test_stream_subscribes_and_unsubscribes_orders(hub):
+    hub.publish("a", {"type": "order.started", "orderId": "a"})
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.post("/streams", json={"orders": ["a"]})
+        assert r.status_code == 201
+        stream_id = r.json()["streamId"]
+
+        r = await client.post(
+            f"/streams/{stream_id}/subscriptions", json={"patterns": ["order.#"]}
+        )
+        assert r.json() == {"orders": ["a"], "patterns": ["order.#"]}
+
+        r = await client.request(
+            "DELETE", f"/streams/{stream_id}/subscriptions", json={"orders": ["a"]}
+        )
+        assert r.json() == {"orders": [], "patterns": ["order.#"]}
+
+        # Overflow the 2-slot mailbox: the stream ends with an eviction notice
+        async def flood():
+            while not main.streams.get(stream_id).connected:
+                await asyncio.sleep(0.01)
+            for _ in range(3):
+                hub.publish("b", {"type": "provider.update"}, "order.b.x")
+
+        feeder = asyncio.create_task(flood())
+        r = await client.get(f"/streams/{stream_id}/events")
+        await feeder
+
+    # The replayed order.started and one update were queued before overflow
+    assert "event: stream.evicted" in r.text
+    assert len(main.streams) == 0
+
+
+@pytest.mark.unit
+def test_websocket_stream_replays_subscribed_orders(hub):
+    hub.publish("a", {"type": "order.started", "orderId": "a"})
+
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"action": "subscribe", "orders": ["a"]})
+        messages = [ws.receive_json(), ws.receive_json()]
+
+    events = {m["event"]: m for m in messages}
+    assert set(events) == {"order.started", "subscriptions"}
+    assert events["order.started"]["data"] == {"type": "order.started", "orderId": "a"}
+
+
+def update(order_id: str, provider: str, status: str = "ok") -> dict:
+    return {
+        "type": "provider.update",
+        "orderId": order_id,
+        "provider": provider,
+        "mode": "archive",
+        "status": status,
+    }
+
+
+@pytest.mark.unit
+def test_coalesce_replaces_queued_update_of_the_same_provider():
+    hub = EventHub(mailbox_size=2, overflow_policy="coalesce")
+    mailbox = hub.subscribe("a")
+    hub.publish("a", update("a", "Umbra", "pending"))
+    hub.publish("a", {"type": "order.started", "orderId": "a"})
+    hub.publish("a", update("a", "Umbra", "ok"))
+
+    assert not mailbox.evicted
+    assert mailbox.get_nowait() == (2, {"type": "order.started", "orderId": "a"})
+    assert mailbox.get_nowait() == (3, update("a", "Umbra", "ok"))
+
+
+@pytest.mark.unit
+def test_coalesced_mailbox_delivers_ids_in_order():
+    hub = EventHub(mailbox_size=3, overflow_policy="coalesce")
+    mailbox = hub.subscribe("a")
+    hub.publish("a", update("a", "Umbra", "pending"))
+    hub.publish("a", update("a", "Copernicus", "ok"))
+    hub.publish("a", update("a", "PlanetaryComputer", "ok"))
+    hub.publish("a", update("a", "Umbra", "ok"))
+    hub.publish("a", update("a", "Copernicus", "empty"))
+
+    ids = [mailbox.get_nowait()[0] for _ in range(mailbox.qsize())]
+    assert ids == sorted(ids) == [3, 4, 5]
+
+
+@pytest.mark.unit
+def test_drop_oldest_discards_updates_but_keeps_lifecycle_events():
+    hub = EventHub(mailbox_size=2, overflow_policy="drop_oldest")
+    mailbox = hub.subscribe("a")
+    hub.publish("a", {"type": "order.started", "orderId": "a"})
+    hub.publish("a", update("a", "Umbra", "partial"))
+    hub.publish("a", update("a", "Copernicus", "partial"))
+    hub.publish("a", {"type": "order.complete", "orderId": "a"})
+
+    assert [mailbox.get_nowait()[0] for _ in range(2)] == [1, 4]
+    assert not mailbox.evicted
+
+
+@pytest.mark.unit
+def test_mailbox_without_droppable_events_is_evicted():
+    hub = EventHub(mailbox_size=1, overflow_policy="drop_oldest")
+    mailbox = hub.subscribe("a")
+    hub.publish("a", {"type": "order.started", "orderId": "a"})
+    hub.publish("a", {"type": "order.complete", "orderId": "a"})
+
+    assert mailbox.evicted
+    assert hub.subscriber_count("a") == 0
@@ -1,9 +1,9 @@
 import asyncio
-import json
 import logging
 from functools import lru_cache
 
 import aio_pika
+from contracts import codec
 from dotenv import load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -87,7 +87,7 @@ async def main():
         async for msg in queue_iter:
             async with msg.process():
                 try:
-                    evt = json.loads(msg.body)
+                    evt = codec.loads(msg.body)
                     logger.info(f"📥 Received event: {evt}")
                     await handle_event(evt)
                 except Exception as e:
@@ -0,0 +1,86 @@
+"""
+Microbenchmark of contracts.codec against the stdlib json it replaces.
+
+    python packages/oneapi-contracts/benchmarks/codec_bench.py [--number N]
+
+Times the hot paths on a representative `provider.update` event: encoding
+it for AMQP (aggregator), decoding it (gateway, storage, notifications) and
+the gateway turning a broker body into an SSE frame, both by decoding and
+re-encoding and by forwarding the raw body.
+"""
+
+import argparse
+import json
+import timeit
+
+from contracts import codec
+
+
+def provider_update(features: int) -> dict:
+    return {
+        "type": "provider.update",
+        "orderId": "5f0c6a1e-8d8e-4a43-9c55-2f1b7c8e9a10",
+        "provider": "PlanetaryComputer",
+        "mode": "archive",
+        "status": "ok",
+        "features": [
+            {
+                "id": f"S2B_MSIL2A_20240105T{i:06d}",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [
+                        [[10.0, 45.0], [10.5, 45.0], [10.5, 45.5], [10.0, 45.0]]
+                    ],
+                },
+                "properties": {
+                    "datetime": "2024-01-05T10:23:41Z",
+                    "eo:cloud_cover": 12.5,
+                },
+                "assets": {
+                    "visual": {
+                        "href": f"https://example.blob.core.windows.net/{i}.tif?sig=abc",
+                        "type": "image/tiff",
+                    }
+                },
+            }
+            for i in range(features)
+        ],
+    }
+
+
+def stdlib_frame(body: bytes) -> str:
+    return json.dumps(json.loads(body))
+
+
+def codec_frame(body: bytes) -> str:
+    # What the gateway does now: decode for routing, forward the body
+    codec.loads(body)
+    return body.decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"codec backend: {codec.BACKEND}")
+    for features in (0, 10, 100):
+        evt = provider_update(features)
+        body = json.dumps(evt).encode()
+        cases = {
+            "encode": (lambda: json.dumps(evt).encode(), lambda: codec.dumps(evt)),
+            "decode": (lambda: json.loads(body), lambda: codec.loads(body)),
+            "sse frame": (lambda: stdlib_frame(body), lambda: codec_frame(body)),
+        }
+        print(f"\n{features} features, {len(body)} bytes")
+        for name, (stdlib, fast) in cases.items():
+            t_std = timeit.timeit(stdlib, number=args.number) / args.number * 1e6
+            t_fast = timeit.timeit(fast, number=args.number) / args.number * 1e6
+            print(
+                f"  {name:<10} stdlib {t_std:8.1f} µs   codec {t_fast:8.1f} µs"
+                f"   x{t_std / t_fast:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,26 @@
-from .events import EventCreate, EventRead
+from .blobs import BlobRef, FileBlobStore, offload
+from .events import EventBulkCreate, EventCreate, EventRead
 from .order_provider import (
     OrderProviderCreate,
     OrderProviderRead,
     OrderProviderStatus,
     OrderProviderUpdate,
 )
-from .orders import OrderCreate, OrderRead, OrderStatus, OrderUpdate
+from .orders import (
+    OrderCreate,
+    OrderRead,
+    OrderStatus,
+    OrderSubmit,
+    OrderType,
+    OrderUpdate,
+)
 from .providers import ProviderBase, ProviderCreate, ProviderRead, ProviderUpdate
+from .summary import OrderProviderSummary, OrderSummary
 
 __all__ = [
+    "BlobRef",
+    "FileBlobStore",
+    "offload",
     "OrderProviderRead",
     "OrderProviderCreate",
     "OrderProviderUpdate",
@@ -21,7 +33,12 @@ __all__ = [
     "OrderRead",
     "OrderUpdate",
     "OrderStatus",
+    "OrderSubmit",
+    "OrderType",
+    "OrderSummary",
+    "OrderProviderSummary",
     "EventCreate",
+    "EventBulkCreate",
     "EventRead",
 ]
 __version__ = "0.1.0"
@@ -0,0 +1,143 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import time
+from typing import Any, Iterable
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from . import codec
+
+DIGEST_PATTERN = r"^sha256:[0-9a-f]{64}$"
+
+# Result arrays of `provider.update` events worth moving out of the message
+OFFLOAD_FIELDS = ("features", "opportunities")
+
+
+class BlobRef(BaseModel):
+    """
+    Stand-in for an event field moved to the blob store.
+
+    An event carrying `features` over the threshold instead carries
+    `featuresRef`; the value itself is served by the gateway at
+    `/blobs/{digest}`.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    digest: str = Field(pattern=DIGEST_PATTERN)
+    size: int = Field(ge=0, description="Bytes of the uncompressed JSON")
+    count: int | None = Field(None, description="Items, when the value is a list")
+
+
+def ref_field(field: str) -> str:
+    return f"{field}Ref"
+
+
+def encode(value: Any) -> bytes:
+    """Canonical JSON, so equal values share one digest."""
+    return codec.dumps(value, sort_keys=True)
+
+
+class FileBlobStore:
+    """
+    Content-addressed blobs as gzipped JSON files on a filesystem shared by
+    writers and readers (`<root>/<2 hex>/<64 hex>.json.gz`).
+
+    A blob is written once: its name is the SHA-256 of its content, so
+    writing it again only refreshes its mtime and a file is never changed in
+    place. `sweep` deletes blobs nobody has written for a while.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        hexdigest = digest.removeprefix("sha256:")
+        return os.path.join(self.root, hexdigest[:2], f"{hexdigest}.json.gz")
+
+    def _write(self, digest: str, raw: bytes):
+        path = self.path(digest)
+        try:
+            # Already stored: mark it as in use again so sweeps keep it
+            os.utime(path)
+            return
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(raw, compresslevel=6))
+        os.replace(tmp, path)
+
+    def _read(self, digest: str) -> bytes | None:
+        try:
+            with open(self.path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def sweep(self, max_age: float) -> int:
+        """Delete blobs (and stray temp files) older than `max_age` seconds."""
+        cutoff, removed = time.time() - max_age, 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def put_bytes(self, raw: bytes, count: int | None = None) -> BlobRef:
+        digest = f"sha256:{hashlib.sha256(raw).hexdigest()}"
+        self._write(digest, raw)
+        return BlobRef(digest=digest, size=len(raw), count=count)
+
+    async def put(self, value: Any) -> BlobRef:
+        raw = encode(value)
+        count = len(value) if isinstance(value, list) else None
+        return await asyncio.to_thread(self.put_bytes, raw, count)
+
+    async def get_compressed(self, digest: str) -> bytes | None:
+        """The stored gzip bytes, or None for unknown digests."""
+        return await asyncio.to_thread(self._read, digest)
+
+    async def get(self, digest: str) -> Any:
+        compressed = await self.get_compressed(digest)
+        if compressed is None:
+            return None
+        return codec.loads(gzip.decompress(compressed))
+
+
+def _offload(evt: dict, store: FileBlobStore, threshold: int, fields) -> dict:
+    out = dict(evt)
+    for field in fields:
+        value = out.get(field)
+        if value is None:
+            continue
+        raw = encode(value)
+        if len(raw) < threshold:
+            continue
+        count = len(value) if isinstance(value, list) else None
+        ref = store.put_bytes(raw, count)
+        del out[field]
+        out[ref_field(field)] = ref.model_dump(exclude_none=True)
+    return out
+
+
+async def offload(
+    evt: dict,
+    store: FileBlobStore,
+    threshold: int,
+    fields: Iterable[str] = OFFLOAD_FIELDS,
+) -> dict:
+    """
+    Copy of `evt` whose `fields` of at least `threshold` JSON bytes are
+    written to `store` and replaced by a `<field>Ref` reference.
+    """
+    # Encoding large result sets is too slow for the event loop
+    return await asyncio.to_thread(_offload, evt, store, threshold, tuple(fields))
@@ -0,0 +1,66 @@
+"""
+JSON codec shared by the services for AMQP bodies and SSE frames.
+
+Uses orjson when it is installed (`pip install contracts[fast]`) and the
+stdlib otherwise; both produce the same compact UTF-8 JSON. The APIs are
+bytes in / bytes out, which is what AMQP bodies are and what orjson
+produces natively.
+"""
+
+import datetime
+import json
+import uuid
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(value: Any) -> Any:
+    # What orjson serializes natively
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _stdlib_dumps(value: Any, sort_keys: bool = False) -> bytes:
+    return json.dumps(
+        value,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=sort_keys,
+    ).encode()
+
+
+def _stdlib_loads(data: bytes | str) -> Any:
+    return json.loads(data)
+
+
+if orjson is not None:
+
+    def dumps(value: Any, sort_keys: bool = False) -> bytes:
+        """Compact JSON bytes."""
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, default=_default, option=option)
+
+    def loads(data: bytes | str) -> Any:
+        """Parse JSON; raises ValueError on malformed input."""
+        return orjson.loads(data)
+
+else:
+    dumps = _stdlib_dumps
+    loads = _stdlib_loads
+
+
+def dumps_str(value: Any) -> str:
+    """Compact JSON text, for APIs that want `str` (SSE data, WebSockets)."""
+    return dumps(value).decode()
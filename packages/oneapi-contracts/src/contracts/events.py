@@ -20,6 +20,12 @@ class EventCreate(EventBase):
     pass
 
 
+class EventBulkCreate(EventBase):
+    """Cross-order bulk create: each event names its order."""
+
+    order_id: uuid.UUID
+
+
 class EventRead(EventBase):
     """Read: adds database-generated fields; ORM-friendly."""
 
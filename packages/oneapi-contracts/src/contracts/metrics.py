@@ -0,0 +1,51 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Tuple
+
+logger = logging.getLogger("Metrics")
+
+
+class Metrics:
+    """
+    Minimal in-process counters and timers, shared by the services.
+
+    Names are dotted strings (`cache.hit`); optional labels are folded into
+    the key so `incr("cache.hit", provider="Umbra")` is tracked separately.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.timers: Dict[str, Tuple[int, float, float]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> str:
+        if not labels:
+            return name
+        tags = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+        return f"{name}{{{tags}}}"
+
+    def incr(self, name: str, value: float = 1, **labels):
+        self.counters[self._key(name, labels)] += value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = self._key(name, labels)
+        count, total, peak = self.timers.get(key, (0, 0.0, 0.0))
+        self.timers[key] = (count + 1, total + seconds, max(peak, seconds))
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "timers": {
+                k: {"count": c, "avg": t / c, "max": m}
+                for k, (c, t, m) in self.timers.items()
+            },
+        }
+
+    def log(self):
+        snap = self.snapshot()
+        if snap["counters"] or snap["timers"]:
+            logger.info(f"📊 {snap}")
+
+
+# One registry per process
+METRICS = Metrics()
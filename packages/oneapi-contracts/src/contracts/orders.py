@@ -1,11 +1,16 @@
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import StrEnum
 from typing import Annotated, List, Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
+class OrderType(StrEnum):
+    SEARCH = "search"
+    TASK = "task"
+
+
 class OrderStatus(StrEnum):
     PENDING = "pending"
     PROCESSING = "processing"
@@ -61,6 +66,43 @@ class OrderCreate(OrderBase):
         return v
 
 
+class OrderSubmit(BaseModel):
+    """Order as submitted to the gateway and queued for the aggregator."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    type: OrderType = OrderType.SEARCH
+    bbox: BBox
+    start_date: datetime
+    end_date: datetime
+
+    @field_validator("type", mode="before")
+    @classmethod
+    def normalize_type(cls, v):
+        if isinstance(v, str):
+            return OrderType(v.lower())
+        return v
+
+    @field_validator("bbox")
+    @classmethod
+    def bbox_order(cls, v: List[float]):
+        return OrderBase.bbox_order(v)
+
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def assume_utc(cls, v: datetime):
+        # The aggregator compares against aware "now"
+        return v if v.tzinfo else v.replace(tzinfo=timezone.utc)
+
+    @field_validator("end_date")
+    @classmethod
+    def end_after_start(cls, end: datetime, info):
+        start = info.data.get("start_date")
+        if start and end <= start:
+            raise ValueError("end_date must be strictly greater than start_date")
+        return end
+
+
 class OrderUpdate(BaseModel):
     """Patch: all optional; forbid unknown fields."""
 
@@ -84,5 +126,9 @@ class OrderRead(OrderBase):
 
     model_config = ConfigDict(from_attributes=True, extra="ignore")
     id: uuid.UUID
+    # Orders storage only learned about from their events have no request yet
+    bbox: Optional[BBox] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
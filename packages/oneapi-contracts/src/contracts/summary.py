@@ -0,0 +1,24 @@
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+from .events import EventRead
+from .order_provider import OrderProviderRead
+from .orders import OrderRead
+from .providers import ProviderRead
+
+
+class OrderProviderSummary(OrderProviderRead):
+    """Order/provider link with its provider inlined."""
+
+    provider: ProviderRead
+
+
+class OrderSummary(BaseModel):
+    """Everything needed to render an order: itself, its providers, recent events."""
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+    order: OrderRead
+    providers: List[OrderProviderSummary]
+    events: List[EventRead]
@@ -1,7 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from . import catalog
 from . import db as db_module
+from .pagination import NEXT_CURSOR_HEADER
 from .routers import events, order_providers, orders, providers
 from .settings import settings as default_settings
 
@@ -19,6 +21,9 @@ def create_app(
     app = FastAPI(title=settings.APP_NAME, version="0.1.0")
 
     app.get("/health")(lambda: {"ok": True, "service": settings.APP_NAME})
+    app.add_event_handler("startup", catalog.start_broadcast)
+    app.add_event_handler("shutdown", catalog.stop_broadcast)
+    app.add_event_handler("shutdown", db_module.dispose_engines)
 
     app.add_middleware(
         CORSMiddleware,
@@ -26,11 +31,13 @@ def create_app(
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     # include your routers
     app.include_router(providers.router)
     app.include_router(events.router)
+    app.include_router(events.bulk_router)
     app.include_router(order_providers.router)
     app.include_router(orders.router)
 
@@ -0,0 +1,69 @@
+import uuid
+from typing import Iterable, List, Set
+
+from contracts import OrderStatus
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+# Postgres caps a statement at 65535 bind parameters (3 per event row)
+MAX_BULK_EVENTS = 5000
+
+
+async def missing_orders(
+    db: AsyncSession, order_ids: Iterable[uuid.UUID]
+) -> Set[uuid.UUID]:
+    """Which of the given order ids don't exist, in one query."""
+    wanted = set(order_ids)
+    if not wanted:
+        return set()
+    found = await db.scalars(select(models.Order.id).where(models.Order.id.in_(wanted)))
+    return wanted - set(found)
+
+
+async def insert_events(
+    db: AsyncSession, rows: List[dict], returning: bool = True
+) -> List[models.Event]:
+    """
+    Insert `{order_id, type, data}` rows with one multi-row
+    INSERT ... RETURNING. The caller commits.
+    """
+    if not rows:
+        return []
+    stmt = insert(models.Event).values(rows)
+    if not returning:
+        await db.execute(stmt)
+        return []
+    return list(await db.scalars(stmt.returning(models.Event)))
+
+
+async def ensure_orders(db: AsyncSession, order_ids: Iterable[uuid.UUID]):
+    """Create bare `pending` rows for orders storage hasn't seen yet."""
+    rows = [{"id": oid, "status": OrderStatus.PENDING} for oid in set(order_ids)]
+    if not rows:
+        return
+    stmt = pg_insert(models.Order).values(rows).on_conflict_do_nothing()
+    await db.execute(stmt)
+
+
+async def upsert_orders(db: AsyncSession, rows: List[dict]):
+    """
+    Insert submitted orders, or fill in the bare rows events created for
+    them; the status is left to their events.
+    """
+    if not rows:
+        return
+    stmt = pg_insert(models.Order).values(
+        [{**row, "status": OrderStatus.PENDING} for row in rows]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Order.id],
+        set_={
+            "bbox": stmt.excluded.bbox,
+            "start_date": stmt.excluded.start_date,
+            "end_date": stmt.excluded.end_date,
+        },
+    )
+    await db.execute(stmt)
@@ -0,0 +1,178 @@
+"""
+In-process read-through cache of the provider catalog.
+
+The `providers` table is small and rarely changes, so the whole table is
+loaded at once and served from memory with id and slug indexes. Writes
+through the `providers` router invalidate it; other replicas hear about
+them over AMQP when `CATALOG_BROADCAST` is on, and reload after
+`CATALOG_TTL` seconds regardless. A lookup that misses reloads early (at
+most every `miss_reload_after` seconds), so a provider created on another
+replica is found without waiting out the TTL.
+"""
+
+import hashlib
+import logging
+import time
+import uuid
+from typing import Dict, List
+
+import aio_pika
+from contracts import ProviderRead
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .settings import settings
+
+logger = logging.getLogger("ProviderCatalog")
+
+
+class ProviderCatalog:
+    def __init__(self, ttl: float = 300.0, miss_reload_after: float = 5.0):
+        self.ttl = ttl
+        self.miss_reload_after = miss_reload_after
+        self.broadcaster: "CatalogBroadcaster | None" = None
+        self._providers: List[ProviderRead] = []
+        self._by_id: Dict[uuid.UUID, ProviderRead] = {}
+        self._by_slug: Dict[str, ProviderRead] = {}
+        self._etag: str | None = None
+        self._loaded_at: float | None = None
+        # Bumped on every invalidation so a load racing a write is discarded
+        self._generation = 0
+
+    def _fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def _ensure(self, db: AsyncSession):
+        if self._fresh():
+            return
+        generation = self._generation
+        rows = await db.scalars(
+            select(models.Provider).order_by(
+                models.Provider.created_at, models.Provider.id
+            )
+        )
+        self._index([ProviderRead.model_validate(row) for row in rows])
+        # Invalidated mid-load: serve what we read, but don't keep it
+        if generation == self._generation:
+            self._loaded_at = time.monotonic()
+
+    def _stale_for_miss(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at >= self.miss_reload_after
+        )
+
+    def _index(self, providers: List[ProviderRead]):
+        self._providers = providers
+        self._by_id = {p.id: p for p in providers}
+        self._by_slug = {p.slug: p for p in providers}
+        digest = hashlib.sha1()
+        for p in providers:
+            digest.update(p.model_dump_json().encode())
+        self._etag = f'"{digest.hexdigest()}"'
+
+    async def all(self, db: AsyncSession) -> List[ProviderRead]:
+        await self._ensure(db)
+        return self._providers
+
+    async def get(self, db: AsyncSession, provider_id) -> ProviderRead | None:
+        try:
+            provider_id = uuid.UUID(str(provider_id))
+        except ValueError:
+            return None
+        await self._ensure(db)
+        if provider_id not in self._by_id and self._stale_for_miss():
+            self.invalidate()
+            await self._ensure(db)
+        return self._by_id.get(provider_id)
+
+    async def by_slug(self, db: AsyncSession, slug: str) -> ProviderRead | None:
+        await self._ensure(db)
+        if slug not in self._by_slug and self._stale_for_miss():
+            self.invalidate()
+            await self._ensure(db)
+        return self._by_slug.get(slug)
+
+    async def etag(self, db: AsyncSession) -> str:
+        """Strong validator for the catalog as a whole."""
+        await self._ensure(db)
+        return self._etag
+
+    def invalidate(self):
+        self._generation += 1
+        self._loaded_at = None
+
+    async def changed(self):
+        """A write went through here: drop our copy and tell the replicas."""
+        self.invalidate()
+        if self.broadcaster is not None:
+            await self.broadcaster.publish()
+
+
+class CatalogBroadcaster:
+    """
+    Fanout of catalog invalidations between storage replicas.
+
+    Each replica binds its own exclusive queue to the fanout exchange and
+    ignores the messages it sent itself.
+    """
+
+    def __init__(self, catalog: ProviderCatalog, amqp_url: str, exchange: str):
+        self.catalog = catalog
+        self.amqp_url = amqp_url
+        self.exchange_name = exchange
+        self.origin = uuid.uuid4().hex
+        self._conn: aio_pika.abc.AbstractRobustConnection | None = None
+        self._exchange: aio_pika.abc.AbstractExchange | None = None
+
+    async def start(self):
+        self._conn = await aio_pika.connect_robust(self.amqp_url)
+        ch = await self._conn.channel()
+        self._exchange = await ch.declare_exchange(
+            self.exchange_name, aio_pika.ExchangeType.FANOUT, durable=True
+        )
+        q = await ch.declare_queue(exclusive=True, auto_delete=True)
+        await q.bind(self._exchange)
+        await q.consume(self.on_message, no_ack=True)
+        self.catalog.broadcaster = self
+        logger.info(f"📡 Catalog invalidations on {self.exchange_name}")
+
+    async def stop(self):
+        self.catalog.broadcaster = None
+        if self._conn is not None:
+            await self._conn.close()
+        self._conn = self._exchange = None
+
+    async def publish(self):
+        if self._exchange is None:
+            return
+        try:
+            await self._exchange.publish(
+                aio_pika.Message(body=b"", app_id=self.origin), routing_key=""
+            )
+        except Exception as e:
+            # Other replicas still catch up after CATALOG_TTL
+            logger.warning(f"⚠️ Catalog invalidation not broadcast: {e}")
+
+    async def on_message(self, msg: aio_pika.abc.AbstractIncomingMessage):
+        if msg.app_id != self.origin:
+            self.catalog.invalidate()
+
+
+CATALOG = ProviderCatalog(ttl=settings.CATALOG_TTL)
+
+
+async def start_broadcast():
+    if settings.CATALOG_BROADCAST:
+        await CatalogBroadcaster(
+            CATALOG, settings.AMQP_URL, settings.CATALOG_EXCHANGE
+        ).start()
+
+
+async def stop_broadcast():
+    if CATALOG.broadcaster is not None:
+        await CATALOG.broadcaster.stop()
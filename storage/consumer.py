@@ -0,0 +1,312 @@
+"""
+Persists the `events` exchange into the `events` table.
+
+Run with `python -m storage.consumer`. Messages on `order.#`, and the
+submitted orders themselves, are buffered and written in batches (every
+`PERSIST_BATCH_SIZE` messages or `PERSIST_BATCH_WINDOW` seconds, whichever
+comes first) with one multi-row insert, advancing order and order/provider
+statuses in the same transaction. Messages are acked only once that
+transaction commits, so a crash or an unreachable database redelivers
+them; a message whose row the database refuses is rejected on its own.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Dict, List, Tuple
+
+import aio_pika
+from contracts import OrderProviderStatus, OrderStatus, OrderSubmit, codec
+from pydantic import ValidationError
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .bulk import MAX_BULK_EVENTS, ensure_orders, insert_events, upsert_orders
+from .catalog import CATALOG
+from .db import AsyncSessionLocal, dispose_engines
+from .settings import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("EventPersister")
+
+# Where the gateway submits orders (all with the "search" routing key)
+ORDERS_EXCHANGE = "orders"
+
+ORDER_STATUS_BY_EVENT = {
+    "order.started": OrderStatus.PROCESSING,
+    "order.complete": OrderStatus.DONE,
+    "order.failed": OrderStatus.FAILED,
+}
+
+PROVIDER_STATUS_BY_UPDATE = {
+    "partial": OrderProviderStatus.PROCESSING,
+    "pending": OrderProviderStatus.PROCESSING,
+    "ok": OrderProviderStatus.DONE,
+    "empty": OrderProviderStatus.DONE,
+    "error": OrderProviderStatus.FAILED,
+}
+
+TERMINAL = {"done", "failed"}
+
+
+def advance(current: str | None, new: str) -> str:
+    """Statuses only move forward: a finished one is never reopened."""
+    if current in TERMINAL and new not in TERMINAL:
+        return current
+    return new
+
+
+def parse_message(msg: aio_pika.abc.AbstractIncomingMessage) -> dict | None:
+    """Event row for a message, or None when it can't be stored."""
+    try:
+        evt = codec.loads(msg.body)
+    except ValueError:
+        return None
+    if not isinstance(evt, dict) or not evt.get("type"):
+        return None
+
+    order_id = evt.get("orderId")
+    parts = (msg.routing_key or "").split(".")
+    if not order_id and len(parts) > 1 and parts[0] == "order":
+        order_id = parts[1]
+    try:
+        order_id = uuid.UUID(str(order_id))
+    except ValueError:
+        return None
+
+    # The aggregator's eventId becomes the row id, for gateways to match on
+    try:
+        event_id = uuid.UUID(str(evt["eventId"]))
+    except (KeyError, ValueError):
+        event_id = uuid.uuid4()
+
+    envelope = ("type", "orderId", "eventId")
+    data = {k: v for k, v in evt.items() if k not in envelope}
+    return {"id": event_id, "order_id": order_id, "type": evt["type"], "data": data}
+
+
+def parse_order(msg: aio_pika.abc.AbstractIncomingMessage) -> dict | None:
+    """Order row for a submitted order, or None when it isn't a valid one."""
+    try:
+        payload = codec.loads(msg.body)
+        order_id = uuid.UUID(str(payload.pop("orderId")))
+        order = OrderSubmit.model_validate(payload)
+    except (ValueError, TypeError, KeyError, AttributeError, ValidationError):
+        # Still stored, bare, if the aggregator reports on it
+        return None
+    return {
+        "id": order_id,
+        "bbox": order.bbox,
+        "start_date": order.start_date,
+        "end_date": order.end_date,
+    }
+
+
+async def apply_statuses(db: AsyncSession, rows: List[dict]):
+    """Advance `Order.status` and `OrderProvider.status` from a batch."""
+    orders: Dict[uuid.UUID, str] = {}
+    providers: Dict[Tuple[uuid.UUID, str], Tuple[str, str | None]] = {}
+    for row in rows:
+        status = ORDER_STATUS_BY_EVENT.get(row["type"])
+        if status is not None:
+            orders[row["order_id"]] = advance(orders.get(row["order_id"]), status)
+            continue
+
+        data = row["data"]
+        status = PROVIDER_STATUS_BY_UPDATE.get(data.get("status"))
+        if row["type"] != "provider.update" or status is None:
+            continue
+        if not data.get("provider"):
+            continue
+        key = (row["order_id"], data["provider"].lower())
+        current, error = providers.get(key, (None, None))
+        providers[key] = (advance(current, status), data.get("error") or error)
+        # Any provider activity means the order is underway
+        orders[row["order_id"]] = advance(
+            orders.get(row["order_id"]), OrderStatus.PROCESSING
+        )
+
+    # One UPDATE per target status; finished orders stay finished
+    by_status: Dict[str, List[uuid.UUID]] = {}
+    for order_id, status in orders.items():
+        by_status.setdefault(status, []).append(order_id)
+    for status, order_ids in by_status.items():
+        stmt = (
+            update(models.Order)
+            .where(models.Order.id.in_(order_ids))
+            .values(status=status, updated_at=func.now())
+        )
+        if status not in TERMINAL:
+            stmt = stmt.where(models.Order.status.notin_(TERMINAL))
+        await db.execute(stmt)
+
+    if providers:
+        await _apply_provider_statuses(db, providers)
+
+
+async def _apply_provider_statuses(
+    db: AsyncSession, providers: Dict[Tuple[uuid.UUID, str], Tuple[str, str | None]]
+):
+    # Events name providers by their slug; unknown providers aren't tracked
+    provider_ids = {}
+    for slug in {slug for _, slug in providers}:
+        provider = await CATALOG.by_slug(db, slug)
+        if provider is not None:
+            provider_ids[slug] = provider.id
+    wanted = {
+        (order_id, provider_ids[slug]): value
+        for (order_id, slug), value in providers.items()
+        if slug in provider_ids
+    }
+    if not wanted:
+        return
+
+    existing = await db.scalars(
+        select(models.OrderProvider).where(
+            models.OrderProvider.order_id.in_({o for o, _ in wanted}),
+            models.OrderProvider.provider_id.in_({p for _, p in wanted}),
+        )
+    )
+    rows = {(op.order_id, op.provider_id): op for op in existing}
+    for (order_id, provider_id), (status, error) in wanted.items():
+        op = rows.get((order_id, provider_id))
+        if op is None:
+            op = models.OrderProvider(order_id=order_id, provider_id=provider_id)
+            db.add(op)
+        op.status = advance(op.status, status)
+        if error and op.status == OrderProviderStatus.FAILED:
+            op.last_error = error
+
+
+def is_transient(exc: Exception) -> bool:
+    """Whether a write failed on the database connection rather than the rows."""
+    if isinstance(exc, (OperationalError, InterfaceError, PoolTimeoutError, OSError)):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+async def persist(db: AsyncSession, rows: List[dict], orders: List[dict] = ()):
+    """Write a batch of orders, events and status changes; caller commits."""
+    await upsert_orders(db, list(orders))
+    await ensure_orders(db, (row["order_id"] for row in rows))
+    for i in range(0, len(rows), MAX_BULK_EVENTS):
+        await insert_events(db, rows[i : i + MAX_BULK_EVENTS], returning=False)
+    await apply_statuses(db, rows)
+
+
+class EventPersister:
+    """Buffers incoming messages and flushes them as one transaction."""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = 500,
+        batch_window: float = 0.5,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._buffer: List[aio_pika.abc.AbstractIncomingMessage] = []
+        self._lock = asyncio.Lock()
+
+    async def on_message(self, msg: aio_pika.abc.AbstractIncomingMessage):
+        self._buffer.append(msg)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+
+            items = []
+            for msg in batch:
+                is_order = msg.exchange == ORDERS_EXCHANGE
+                row = parse_order(msg) if is_order else parse_message(msg)
+                if row is None:
+                    logger.warning(
+                        f"⚠️ Dropping unreadable message on {msg.routing_key}"
+                    )
+                    await msg.reject()
+                    continue
+                items.append((msg, row, is_order))
+            if items:
+                await self._store(items)
+
+    async def _store(
+        self, items: List[Tuple[aio_pika.abc.AbstractIncomingMessage, dict, bool]]
+    ):
+        """
+        Write `(message, row, is_order)` items in one transaction.
+
+        When the database is unreachable the whole batch is requeued. Any
+        other failure is blamed on the rows: the batch is split in halves and
+        retried until the offending message is alone, and that one is
+        rejected (dead-lettered, if the queue has a dead-letter exchange).
+        """
+        rows = [row for _, row, is_order in items if not is_order]
+        orders = [row for _, row, is_order in items if is_order]
+        try:
+            async with self.session_factory() as db:
+                await persist(db, rows, orders)
+                await db.commit()
+        except Exception as e:
+            if is_transient(e):
+                logger.error(f"💥 Persisting {len(items)} messages failed: {e}")
+                for msg, _, _ in items:
+                    await msg.nack(requeue=True)
+            elif len(items) == 1:
+                msg = items[0][0]
+                logger.error(f"☠️ Rejecting message on {msg.routing_key}: {e}")
+                await msg.reject()
+            else:
+                logger.warning(f"⚠️ Batch of {len(items)} failed ({e}), splitting")
+                half = len(items) // 2
+                await self._store(items[:half])
+                await self._store(items[half:])
+            return
+
+        for msg, _, _ in items:
+            await msg.ack()
+        logger.info(f"💾 Persisted {len(orders)} orders, {len(rows)} events")
+
+    async def run(self, queue: aio_pika.abc.AbstractQueue):
+        await queue.consume(self.on_message)
+        while True:
+            await asyncio.sleep(self.batch_window)
+            await self.flush()
+
+
+async def main():
+    conn = await aio_pika.connect_robust(settings.AMQP_URL)
+    ch = await conn.channel()
+    # A full batch must fit in the unacked window
+    await ch.set_qos(prefetch_count=settings.PERSIST_BATCH_SIZE * 2)
+
+    ex = await ch.declare_exchange("events", aio_pika.ExchangeType.TOPIC, durable=True)
+    q = await ch.declare_queue(settings.PERSIST_QUEUE, durable=True)
+    await q.bind(ex, routing_key="order.#")
+    orders = await ch.declare_exchange(
+        ORDERS_EXCHANGE, aio_pika.ExchangeType.DIRECT, durable=True
+    )
+    await q.bind(orders, routing_key="search")
+
+    persister = EventPersister(
+        batch_size=settings.PERSIST_BATCH_SIZE,
+        batch_window=settings.PERSIST_BATCH_WINDOW,
+    )
+    logger.info("💾 Event persister started, waiting for events...")
+    try:
+        await persister.run(q)
+    finally:
+        await persister.flush()
+        await conn.close()
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,9 @@
-from typing import Iterator
+from typing import Any, AsyncIterator, Iterator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from .settings import settings
 
@@ -10,11 +12,75 @@ class Base(DeclarativeBase):
     pass
 
 
-_engine = create_engine(settings.DATABASE_URL, future=True)
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+_engine = create_engine(settings.DATABASE_URL, future=True, **_pool_options())
 SessionLocal = sessionmaker(
     bind=_engine, autoflush=False, autocommit=False, future=True
 )
 
+# psycopg 3 serves the same URL asynchronously
+_async_engine = create_async_engine(settings.DATABASE_URL, **_pool_options())
+AsyncSessionLocal = async_sessionmaker(
+    bind=_async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+class SyncSessionAdapter:
+    """
+    AsyncSession-shaped wrapper around a sync Session for DB_MODE=sync.
+
+    Routers are written against the async API; here every call that may
+    touch the database runs on the threadpool, as sync routes used to.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, obj: Any):
+        self.session.add(obj)
+
+    def add_all(self, objs):
+        self.session.add_all(objs)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.session.get, *args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await run_in_threadpool(self.session.execute, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await run_in_threadpool(self.session.scalars, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await run_in_threadpool(self.session.scalar, *args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        await run_in_threadpool(self.session.flush, *args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        await run_in_threadpool(self.session.refresh, *args, **kwargs)
+
+    async def delete(self, obj: Any):
+        await run_in_threadpool(self.session.delete, obj)
+
+    async def commit(self):
+        await run_in_threadpool(self.session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.session.close)
+
 
 def get_session() -> Iterator[Session]:
     db = SessionLocal()
@@ -24,5 +90,24 @@ def get_session() -> Iterator[Session]:
         db.close()
 
 
-def get_db() -> Iterator[Session]:
-    yield from get_session()
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    if settings.DB_MODE == "sync":
+        db = SyncSessionAdapter(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+
+    async for db in get_async_session():
+        yield db
+
+
+async def dispose_engines():
+    await _async_engine.dispose()
+    _engine.dispose()
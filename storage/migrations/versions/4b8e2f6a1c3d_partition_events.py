@@ -0,0 +1,101 @@
+"""partition events by month
+
+Revision ID: 4b8e2f6a1c3d
+Revises: c593d77094a7
+Create Date: 2025-10-06 10:12:41.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4b8e2f6a1c3d"
+down_revision: Union[str, None] = "c593d77094a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created up front past the current month; after that the
+# maintenance job (python -m storage.partitions) keeps them coming
+MONTHS_AHEAD = 2
+
+
+def upgrade():
+    op.execute("ALTER TABLE events RENAME TO events_legacy")
+    op.execute(
+        "ALTER TABLE events_legacy RENAME CONSTRAINT events_pkey TO events_legacy_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_events_order_id_created_at "
+        "RENAME TO ix_events_legacy_order_id_created_at"
+    )
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE events (
+            id uuid NOT NULL DEFAULT gen_random_uuid(),
+            order_id uuid NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            type text NOT NULL,
+            data jsonb DEFAULT '{}'::jsonb,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.create_index(
+        "ix_events_order_id_created_at", "events", ["order_id", "created_at"]
+    )
+    # Catches rows no monthly partition covers yet, so inserts never fail
+    op.execute("CREATE TABLE events_default PARTITION OF events DEFAULT")
+
+    # One partition per month from the oldest event to MONTHS_AHEAD from now
+    op.execute(f"""
+    DO $$
+    DECLARE
+      month date := date_trunc(
+        'month', coalesce((SELECT min(created_at) FROM events_legacy), now())
+      );
+      last date := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+    BEGIN
+      WHILE month <= last LOOP
+        EXECUTE format(
+          'CREATE TABLE %I PARTITION OF events FOR VALUES FROM (%L) TO (%L)',
+          'events_p' || to_char(month, 'YYYY_MM'),
+          month,
+          month + interval '1 month'
+        );
+        month := month + interval '1 month';
+      END LOOP;
+    END$$;
+    """)
+
+    op.execute("INSERT INTO events SELECT * FROM events_legacy")
+    op.execute("DROP TABLE events_legacy")
+
+
+def downgrade():
+    op.execute("ALTER TABLE events RENAME TO events_partitioned")
+    op.execute(
+        "ALTER TABLE events_partitioned "
+        "RENAME CONSTRAINT events_pkey TO events_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_events_order_id_created_at "
+        "RENAME TO ix_events_partitioned_order_id_created_at"
+    )
+    op.execute("""
+        CREATE TABLE events (
+            id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+            order_id uuid NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            type text NOT NULL,
+            data jsonb DEFAULT '{}'::jsonb,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+    op.create_index(
+        "ix_events_order_id_created_at", "events", ["order_id", "created_at"]
+    )
+    # Events already archived by the retention job stay in their exports
+    op.execute("INSERT INTO events SELECT * FROM events_partitioned")
+    # Drops every partition with it
+    op.execute("DROP TABLE events_partitioned")
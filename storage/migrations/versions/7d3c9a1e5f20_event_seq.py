@@ -0,0 +1,57 @@
+"""order events by arrival with a seq column
+
+Revision ID: 7d3c9a1e5f20
+Revises: 4b8e2f6a1c3d
+Create Date: 2025-10-20 09:41:27.530112
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3c9a1e5f20"
+down_revision: Union[str, None] = "4b8e2f6a1c3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Every row of a multi-row insert shares now(); seq keeps arrival order
+    op.execute("CREATE SEQUENCE events_seq_seq")
+    op.execute("ALTER TABLE events ADD COLUMN seq bigint")
+    # Existing events keep their (created_at, id) order
+    op.execute("""
+        UPDATE events e SET seq = o.n
+        FROM (
+            SELECT id, created_at, row_number() OVER (ORDER BY created_at, id) AS n
+            FROM events
+        ) o
+        WHERE e.id = o.id AND e.created_at = o.created_at
+    """)
+    op.execute(
+        "SELECT setval('events_seq_seq', coalesce(max(seq), 0) + 1, false) FROM events"
+    )
+    op.execute(
+        "ALTER TABLE events "
+        "ALTER COLUMN seq SET DEFAULT nextval('events_seq_seq'), "
+        "ALTER COLUMN seq SET NOT NULL"
+    )
+    op.execute("ALTER SEQUENCE events_seq_seq OWNED BY events.seq")
+
+    op.drop_index("ix_events_order_id_created_at", table_name="events")
+    op.create_index(
+        "ix_events_order_id_created_at_seq",
+        "events",
+        ["order_id", "created_at", "seq"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_events_order_id_created_at_seq", table_name="events")
+    op.create_index(
+        "ix_events_order_id_created_at", "events", ["order_id", "created_at"]
+    )
+    # Drops the owned sequence with it
+    op.execute("ALTER TABLE events DROP COLUMN seq")
@@ -3,7 +3,7 @@ from datetime import datetime
 
 import sqlalchemy as sa
 from contracts import OrderProviderStatus, OrderStatus
-from sqlalchemy import Boolean, ForeignKey, Index, Text, text
+from sqlalchemy import BigInteger, Boolean, ForeignKey, Index, Sequence, Text, text
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, NUMERIC, TIMESTAMP, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -76,7 +76,13 @@ class Order(Base):
 Index("ix_orders_status_created_at", Order.status, Order.created_at)
 
 
+# Arrival order of events; a batch shares one now() for created_at
+event_seq = Sequence("events_seq_seq", metadata=Base.metadata)
+
+
 class Event(Base):
+    # Range-partitioned by month on created_at in the database (migration
+    # 4b8e2f6a1c3d, primary key (id, created_at)); id alone is unique here
     __tablename__ = "events"
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -90,11 +96,14 @@ class Event(Base):
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
+    seq: Mapped[int] = mapped_column(
+        BigInteger, event_seq, nullable=False, server_default=event_seq.next_value()
+    )
 
     order = relationship("Order", back_populates="events")
 
 
-Index("ix_events_order_id_created_at", Event.order_id, Event.created_at)
+Index("ix_events_order_id_created_at_seq", Event.order_id, Event.created_at, Event.seq)
 
 
 class OrderProvider(Base):
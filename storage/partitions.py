@@ -0,0 +1,210 @@
+"""
+Monthly partitions of the `events` table and their retention.
+
+Run with `python -m storage.partitions` (the `storage-maintenance` service
+does so daily). Each run creates the partitions for the next
+`EVENTS_PARTITIONS_AHEAD` months, moving in any rows the default partition
+already caught for them, and, when `EVENTS_RETENTION_MONTHS` is set,
+detaches every older partition, exports it to a gzipped CSV under
+`EVENTS_ARCHIVE_DIR` and drops it. A run interrupted between those steps
+picks the detached table up again next time.
+
+All of this is a no-op until the partitioning migration has run.
+"""
+
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .settings import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("EventPartitions")
+
+PARTITION_RE = re.compile(r"^events_p(\d{4})_(\d{2})$")
+DEFAULT_PARTITION = "events_default"
+EVENT_COLUMNS = "id, order_id, type, data, created_at, seq"
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    year, index = divmod(month.year * 12 + month.month - 1 + n, 12)
+    return date(year, index + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"events_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    match = PARTITION_RE.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def expired(names: List[str], retention_months: int, today: date) -> List[str]:
+    """Monthly partitions entirely older than the retention window, oldest first."""
+    cutoff = add_months(month_start(today), -retention_months)
+    months = {name: partition_month(name) for name in names}
+    return sorted(n for n, month in months.items() if month and month < cutoff)
+
+
+def is_partitioned(db: Session) -> bool:
+    return bool(
+        db.scalar(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('events')"
+            )
+        )
+    )
+
+
+def attached_partitions(db: Session) -> List[str]:
+    rows = db.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass('events')"
+        )
+    )
+    return [name for name in rows if PARTITION_RE.match(name)]
+
+
+def detached_partitions(db: Session) -> List[str]:
+    """Monthly tables left behind by an interrupted retention run."""
+    rows = db.scalars(
+        text(
+            "SELECT c.relname FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND c.relkind = 'r' "
+            "AND NOT c.relispartition AND c.relname LIKE 'events\\_p%'"
+        )
+    )
+    return [name for name in rows if PARTITION_RE.match(name)]
+
+
+def default_holds(db: Session, month: date) -> bool:
+    """Whether the default partition caught rows of `month`."""
+    return bool(
+        db.scalar(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+                "WHERE created_at >= :lo AND created_at < :hi)"
+            ),
+            {"lo": month, "hi": add_months(month, 1)},
+        )
+    )
+
+
+def create_partition(db: Session, month: date) -> str:
+    """
+    Create the partition of `month`, moving its rows out of the default one.
+
+    Postgres refuses a new partition whose range the default partition
+    already holds rows of, so the default partition is detached, the rows
+    are moved across and it is attached again, all in one transaction
+    (which locks `events` for its duration).
+    """
+    name = partition_name(month)
+    bounds = f"FROM ('{month}') TO ('{add_months(month, 1)}')"
+    create = f"CREATE TABLE {name} PARTITION OF events FOR VALUES {bounds}"
+    if not default_holds(db, month):
+        db.execute(text(create))
+        db.commit()
+        return name
+
+    where = f"created_at >= '{month}' AND created_at < '{add_months(month, 1)}'"
+    db.execute(text(f"ALTER TABLE events DETACH PARTITION {DEFAULT_PARTITION}"))
+    db.execute(text(create))
+    db.execute(
+        text(
+            f"INSERT INTO {name} ({EVENT_COLUMNS}) "
+            f"SELECT {EVENT_COLUMNS} FROM {DEFAULT_PARTITION} WHERE {where}"
+        )
+    )
+    moved = db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {where}"))
+    db.execute(text(f"ALTER TABLE events ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    db.commit()
+    logger.info(f"🚚 Moved {moved.rowcount} events of {name} out of the default")
+    return name
+
+
+def ensure_partitions(db: Session, months_ahead: int, today: date) -> List[str]:
+    """Create the monthly partitions from this month to `months_ahead` on."""
+    existing = set(attached_partitions(db))
+    created = []
+    for n in range(months_ahead + 1):
+        month = add_months(month_start(today), n)
+        if partition_name(month) not in existing:
+            created.append(create_partition(db, month))
+    return created
+
+
+def export_partition(db: Session, name: str, archive_dir: Path) -> Path:
+    """COPY a (detached) partition into `<archive_dir>/<name>.csv.gz`."""
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    partial = path.with_suffix(".gz.part")
+
+    cursor = db.connection().connection.driver_connection.cursor()
+    query = (
+        f"COPY (SELECT {EVENT_COLUMNS} FROM {name} "
+        "ORDER BY created_at, seq) TO STDOUT (FORMAT csv, HEADER)"
+    )
+    with gzip.open(partial, "wb") as out, cursor.copy(query) as copy:
+        for chunk in copy:
+            out.write(chunk)
+    os.replace(partial, path)
+    return path
+
+
+def apply_retention(
+    db: Session, retention_months: int, archive_dir: Path, today: date
+) -> List[Path]:
+    for name in expired(attached_partitions(db), retention_months, today):
+        db.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+        db.commit()
+        logger.info(f"✂️ Detached {name}")
+
+    exported = []
+    for name in expired(detached_partitions(db), retention_months, today):
+        path = export_partition(db, name, archive_dir)
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        logger.info(f"📦 Archived {name} to {path}")
+        exported.append(path)
+    return exported
+
+
+def main():
+    today = datetime.now(timezone.utc).date()
+    with SessionLocal() as db:
+        if not is_partitioned(db):
+            logger.info("ℹ️ events isn't partitioned yet, nothing to do")
+            return
+        for name in ensure_partitions(db, settings.EVENTS_PARTITIONS_AHEAD, today):
+            logger.info(f"🆕 Created partition {name}")
+        if settings.EVENTS_RETENTION_MONTHS > 0:
+            apply_retention(
+                db,
+                settings.EVENTS_RETENTION_MONTHS,
+                Path(settings.EVENTS_ARCHIVE_DIR),
+                today,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,93 @@
-from contracts import EventCreate, EventRead
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Annotated, List
+
+from contracts import EventBulkCreate, EventCreate, EventRead
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models
+from ..bulk import MAX_BULK_EVENTS, insert_events, missing_orders
 from ..db import get_db
+from ..pagination import paginate
 
 router = APIRouter(prefix="/orders/{order_id}/events", tags=["events"])
+bulk_router = APIRouter(tags=["events"])
 
 
 @router.get("", response_model=list[EventRead])
-def list_events(
+async def list_events(
     order_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     limit: int = Query(100, ge=1, le=500),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Legacy; prefer cursor"),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the last page"),
 ):
-    if not db.get(models.Order, order_id):
+    order = await db.get(models.Order, order_id)
+    if not order:
         raise HTTPException(status_code=404, detail="order not found")
-    stmt = (
-        select(models.Event)
-        .where(models.Event.order_id == order_id)
-        .order_by(models.Event.created_at.desc())
-        .limit(limit)
-        .offset(offset)
+    # Walks ix_events_order_id_created_at_seq; seq (arrival order) breaks
+    # created_at ties within a batch. No event predates its order, which
+    # prunes the older monthly partitions
+    stmt = select(models.Event).where(
+        models.Event.order_id == order_id,
+        models.Event.created_at >= order.created_at,
+    )
+    return await paginate(
+        db,
+        stmt,
+        (models.Event.created_at, models.Event.seq),
+        response,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
     )
-    return list(db.scalars(stmt))
 
 
 @router.post("", response_model=EventRead, status_code=201)
-def create_event(order_id: str, payload: EventCreate, db: Session = Depends(get_db)):
-    if not db.get(models.Order, order_id):
+async def create_event(
+    order_id: str, payload: EventCreate, db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(models.Order, order_id):
         raise HTTPException(status_code=404, detail="order not found")
     obj = models.Event(order_id=order_id, **payload.model_dump())
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
     return obj
+
+
+@router.post(":bulk", response_model=list[EventRead], status_code=201)
+async def create_events_bulk(
+    order_id: str,
+    payload: Annotated[List[EventCreate], Body(max_length=MAX_BULK_EVENTS)],
+    db: AsyncSession = Depends(get_db),
+):
+    order = await db.get(models.Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="order not found")
+    # One statement, so seq (not created_at) keeps the submitted order
+    objs = await insert_events(
+        db, [{"order_id": order.id, **evt.model_dump()} for evt in payload]
+    )
+    await db.commit()
+    return objs
+
+
+@bulk_router.post("/events:bulk", response_model=list[EventRead], status_code=201)
+async def create_events_bulk_any_order(
+    payload: Annotated[List[EventBulkCreate], Body(max_length=MAX_BULK_EVENTS)],
+    db: AsyncSession = Depends(get_db),
+):
+    missing = await missing_orders(db, {evt.order_id for evt in payload})
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "orders not found",
+                "order_ids": sorted(map(str, missing)),
+            },
+        )
+    objs = await insert_events(db, [evt.model_dump() for evt in payload])
+    await db.commit()
+    return objs
@@ -4,24 +4,28 @@ from contracts import (
     OrderProviderStatus,
     OrderProviderUpdate,
 )
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models
+from ..catalog import CATALOG
 from ..db import get_db
+from ..pagination import paginate
 
 router = APIRouter(prefix="/order-providers", tags=["order_providers"])
 
 
 @router.get("", response_model=list[OrderProviderRead])
-def list_order_providers(
-    db: Session = Depends(get_db),
+async def list_order_providers(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     order_id: str | None = None,
     provider_id: str | None = None,
     status: OrderProviderStatus | None = None,
     limit: int = Query(100, ge=1, le=500),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Legacy; prefer cursor"),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the last page"),
 ):
     stmt = select(models.OrderProvider)
     conds = []
@@ -33,49 +37,59 @@ def list_order_providers(
         conds.append(models.OrderProvider.status == status)
     if conds:
         stmt = stmt.where(and_(*conds))
-    stmt = stmt.order_by(models.OrderProvider.id.desc()).limit(limit).offset(offset)
-    return list(db.scalars(stmt))
+    # No created_at on this table: keyset on the primary key alone
+    return await paginate(
+        db,
+        stmt,
+        (models.OrderProvider.id,),
+        response,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+    )
 
 
 @router.post("", response_model=OrderProviderRead, status_code=201)
-def create_order_provider(payload: OrderProviderCreate, db: Session = Depends(get_db)):
-    if not db.get(models.Order, payload.order_id):
+async def create_order_provider(
+    payload: OrderProviderCreate, db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(models.Order, payload.order_id):
         raise HTTPException(status_code=404, detail="order not found")
-    if not db.get(models.Provider, payload.provider_id):
+    if not await CATALOG.get(db, payload.provider_id):
         raise HTTPException(status_code=404, detail="provider not found")
     obj = models.OrderProvider(**payload.model_dump())
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
     return obj
 
 
 @router.get("/{id}", response_model=OrderProviderRead)
-def get_order_provider(id: str, db: Session = Depends(get_db)):
-    obj = db.get(models.OrderProvider, id)
+async def get_order_provider(id: str, db: AsyncSession = Depends(get_db)):
+    obj = await db.get(models.OrderProvider, id)
     if not obj:
         raise HTTPException(status_code=404, detail="order_provider not found")
     return obj
 
 
 @router.patch("/{id}", response_model=OrderProviderRead)
-def update_order_provider(
-    id: str, payload: OrderProviderUpdate, db: Session = Depends(get_db)
+async def update_order_provider(
+    id: str, payload: OrderProviderUpdate, db: AsyncSession = Depends(get_db)
 ):
-    obj = db.get(models.OrderProvider, id)
+    obj = await db.get(models.OrderProvider, id)
     if not obj:
         raise HTTPException(status_code=404, detail="order_provider not found")
     for k, v in payload.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
     return obj
 
 
 @router.delete("/{id}", status_code=204)
-def delete_order_provider(id: str, db: Session = Depends(get_db)):
-    obj = db.get(models.OrderProvider, id)
+async def delete_order_provider(id: str, db: AsyncSession = Depends(get_db)):
+    obj = await db.get(models.OrderProvider, id)
     if not obj:
         return
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
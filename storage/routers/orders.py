@@ -1,24 +1,33 @@
+import uuid
+from collections import defaultdict
 from datetime import datetime
+from typing import List
 
-from contracts import OrderCreate, OrderRead, OrderStatus, OrderUpdate
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
+from contracts import OrderCreate, OrderRead, OrderStatus, OrderSummary, OrderUpdate
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
 
 from .. import models
 from ..db import get_db
+from ..pagination import paginate
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+SUMMARY_BATCH_MAX = 100
+
 
 @router.get("", response_model=list[OrderRead])
-def list_orders(
-    db: Session = Depends(get_db),
+async def list_orders(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     status: OrderStatus | None = None,
     start_from: datetime | None = None,
     end_to: datetime | None = None,
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Legacy; prefer cursor"),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the last page"),
 ):
     stmt = select(models.Order)
     conds = []
@@ -30,43 +39,132 @@ def list_orders(
         conds.append(models.Order.end_date <= end_to)
     if conds:
         stmt = stmt.where(and_(*conds))
-    stmt = stmt.order_by(models.Order.created_at.desc()).limit(limit).offset(offset)
-    return list(db.scalars(stmt))
+    # (status, created_at) is indexed; id breaks created_at ties
+    return await paginate(
+        db,
+        stmt,
+        (models.Order.created_at, models.Order.id),
+        response,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+    )
 
 
 @router.post("", response_model=OrderRead, status_code=201)
-def create_order(payload: OrderCreate, db: Session = Depends(get_db)):
+async def create_order(payload: OrderCreate, db: AsyncSession = Depends(get_db)):
     obj = models.Order(**payload.model_dump())
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
     return obj
 
 
+async def load_summaries(
+    db: AsyncSession, order_ids: List[uuid.UUID], events: int
+) -> List[OrderSummary]:
+    """
+    Summaries of the given orders, in that order, skipping unknown ids.
+
+    Two queries whatever the number of orders: the orders joined with
+    their providers, and the latest `events` of each of them.
+    """
+    orders = await db.scalars(
+        select(models.Order)
+        .where(models.Order.id.in_(order_ids))
+        .options(
+            joinedload(models.Order.order_providers).joinedload(
+                models.OrderProvider.provider
+            )
+        )
+    )
+    by_id = {order.id: order for order in orders.unique()}
+    if not by_id:
+        return []
+
+    latest = defaultdict(list)
+    if events:
+        # Newest `events` per order in one pass over the order/created_at index
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=models.Event.order_id,
+                order_by=(models.Event.created_at.desc(), models.Event.seq.desc()),
+            )
+            .label("rank")
+        )
+        ranked = (
+            select(models.Event, rank)
+            .where(models.Event.order_id.in_(by_id))
+            .subquery()
+        )
+        event = aliased(models.Event, ranked)
+        rows = await db.scalars(
+            select(event)
+            .where(ranked.c.rank <= events)
+            .order_by(ranked.c.order_id, ranked.c.rank)
+        )
+        for row in rows:
+            latest[row.order_id].append(row)
+
+    return [
+        OrderSummary(
+            order=OrderRead.model_validate(order),
+            providers=order.order_providers,
+            events=latest[order.id],
+        )
+        for order_id in dict.fromkeys(order_ids)
+        if (order := by_id.get(order_id)) is not None
+    ]
+
+
+@router.get(":summary", response_model=list[OrderSummary])
+async def get_order_summaries(
+    ids: List[uuid.UUID] = Query(..., max_length=SUMMARY_BATCH_MAX),
+    events: int = Query(20, ge=0, le=200, description="Latest events per order"),
+    db: AsyncSession = Depends(get_db),
+):
+    return await load_summaries(db, ids, events)
+
+
+@router.get("/{order_id}/summary", response_model=OrderSummary)
+async def get_order_summary(
+    order_id: uuid.UUID,
+    events: int = Query(20, ge=0, le=200, description="Latest events"),
+    db: AsyncSession = Depends(get_db),
+):
+    summaries = await load_summaries(db, [order_id], events)
+    if not summaries:
+        raise HTTPException(status_code=404, detail="order not found")
+    return summaries[0]
+
+
 @router.get("/{order_id}", response_model=OrderRead)
-def get_order(order_id: str, db: Session = Depends(get_db)):
-    obj = db.get(models.Order, order_id)
+async def get_order(order_id: str, db: AsyncSession = Depends(get_db)):
+    obj = await db.get(models.Order, order_id)
     if not obj:
         raise HTTPException(status_code=404, detail="order not found")
     return obj
 
 
 @router.patch("/{order_id}", response_model=OrderRead)
-def update_order(order_id: str, payload: OrderUpdate, db: Session = Depends(get_db)):
-    obj = db.get(models.Order, order_id)
+async def update_order(
+    order_id: str, payload: OrderUpdate, db: AsyncSession = Depends(get_db)
+):
+    obj = await db.get(models.Order, order_id)
     if not obj:
         raise HTTPException(status_code=404, detail="order not found")
     for k, v in payload.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
     return obj
 
 
 @router.delete("/{order_id}", status_code=204)
-def delete_order(order_id: str, db: Session = Depends(get_db)):
-    obj = db.get(models.Order, order_id)
+async def delete_order(order_id: str, db: AsyncSession = Depends(get_db)):
+    obj = await db.get(models.Order, order_id)
     if not obj:
         return
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
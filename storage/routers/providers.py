@@ -1,65 +1,79 @@
 from contracts import ProviderCreate, ProviderRead, ProviderUpdate
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models
+from ..catalog import CATALOG
 from ..db import get_db
 
 router = APIRouter(prefix="/providers", tags=["providers"])
 
 
 @router.get("", response_model=list[ProviderRead])
-def list_providers(
-    db: Session = Depends(get_db),
+async def list_providers(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    if_none_match: str | None = Header(None),
 ):
-    stmt = select(models.Provider).limit(limit).offset(offset)
-    return list(db.scalars(stmt))
+    # Every page is unchanged as long as the catalog is
+    etag = await CATALOG.etag(db)
+    if if_none_match and etag in {t.strip() for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    providers = await CATALOG.all(db)
+    return providers[offset : offset + limit]
 
 
 @router.post("", response_model=ProviderRead, status_code=201)
-def create_provider(payload: ProviderCreate, db: Session = Depends(get_db)):
-    exists = db.scalar(
-        select(models.Provider).where(models.Provider.slug == payload.slug)
-    )
-    if exists:
+async def create_provider(payload: ProviderCreate, db: AsyncSession = Depends(get_db)):
+    if await CATALOG.by_slug(db, payload.slug):
         raise HTTPException(status_code=409, detail="slug already exists")
     obj = models.Provider(**payload.model_dump())
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # The catalog may predate a provider created on another replica
+        await db.rollback()
+        CATALOG.invalidate()
+        raise HTTPException(status_code=409, detail="slug already exists")
+    await db.refresh(obj)
+    await CATALOG.changed()
     return obj
 
 
 @router.get("/{provider_id}", response_model=ProviderRead)
-def get_provider(provider_id: str, db: Session = Depends(get_db)):
-    obj = db.get(models.Provider, provider_id)
+async def get_provider(provider_id: str, db: AsyncSession = Depends(get_db)):
+    obj = await CATALOG.get(db, provider_id)
     if not obj:
         raise HTTPException(status_code=404, detail="provider not found")
     return obj
 
 
 @router.patch("/{provider_id}", response_model=ProviderRead)
-def update_provider(
-    provider_id: str, payload: ProviderUpdate, db: Session = Depends(get_db)
+async def update_provider(
+    provider_id: str, payload: ProviderUpdate, db: AsyncSession = Depends(get_db)
 ):
-    obj = db.get(models.Provider, provider_id)
+    obj = await db.get(models.Provider, provider_id)
     if not obj:
         raise HTTPException(status_code=404, detail="provider not found")
     for k, v in payload.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
+    await CATALOG.changed()
     return obj
 
 
 @router.delete("/{provider_id}", status_code=204)
-def delete_provider(provider_id: str, db: Session = Depends(get_db)):
-    obj = db.get(models.Provider, provider_id)
+async def delete_provider(provider_id: str, db: AsyncSession = Depends(get_db)):
+    obj = await db.get(models.Provider, provider_id)
     if not obj:
         raise HTTPException(status_code=404, detail="provider not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    await CATALOG.changed()
     return obj
@@ -1,24 +1,45 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from storage import db as db_module
 from storage.app import create_app
+from storage.catalog import CATALOG
 from storage.db import Base
+from storage.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog():
+    """The provider catalog cache is process-wide; start every test cold."""
+    CATALOG.invalidate()
+    yield
+    CATALOG.invalidate()
 
 
 @pytest.fixture
 def mock_session():
-    return MagicMock()
+    """AsyncSession stand-in: awaitable queries, sync `add`."""
+    session = AsyncMock()
+    session.add = MagicMock()
+    return session
+
+
+@pytest.fixture(params=["async", "sync"])
+def db_mode(request, monkeypatch):
+    """Run each integration test against both DB_MODE session backends."""
+    monkeypatch.setattr(settings, "DB_MODE", request.param)
+    return request.param
 
 
 @pytest.fixture
-def client(_integration_db):
+def client(_integration_db, db_mode):
     """
     Synchronous in-process FastAPI client for integration tests.
     Uses real database connections.
@@ -74,21 +95,39 @@ def _integration_db(_pg_container):
         bind=engine, autoflush=False, autocommit=False, future=True
     )
 
+    async_engine = create_async_engine(url)
+    TestAsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
     # Create schema
     Base.metadata.create_all(engine)
 
     # Rebind
     original_engine = getattr(db_module, "_engine", None)
     original_session_local = getattr(db_module, "SessionLocal", None)
+    original_async_engine = getattr(db_module, "_async_engine", None)
+    original_async_session_local = getattr(db_module, "AsyncSessionLocal", None)
     db_module._engine = engine
     db_module.SessionLocal = TestSessionLocal
+    db_module._async_engine = async_engine
+    db_module.AsyncSessionLocal = TestAsyncSessionLocal
 
     try:
-        yield {"engine": engine, "SessionLocal": TestSessionLocal}
+        yield {
+            "engine": engine,
+            "SessionLocal": TestSessionLocal,
+            "async_engine": async_engine,
+            "AsyncSessionLocal": TestAsyncSessionLocal,
+        }
     finally:
         # Restore and cleanup
         if original_engine is not None:
             db_module._engine = original_engine
         if original_session_local is not None:
             db_module.SessionLocal = original_session_local
+        if original_async_engine is not None:
+            db_module._async_engine = original_async_engine
+        if original_async_session_local is not None:
+            db_module.AsyncSessionLocal = original_async_session_local
         Base.metadata.drop_all(engine)
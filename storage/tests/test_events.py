@@ -37,3 +37,65 @@ def test_events_crud_under_order(client):
     finally:
         # Cleanup: delete order (cascade should remove events)
         client.delete(f"/orders/{order_id}")
+
+
+def test_events_bulk_insert(client):
+    now = datetime.now(timezone.utc)
+    order_ids = []
+    for _ in range(2):
+        r = client.post(
+            "/orders",
+            json={
+                "bbox": [-75.0, 10.0, -74.9, 10.1],
+                "start_date": now.isoformat(),
+                "end_date": (now + timedelta(hours=1)).isoformat(),
+            },
+        )
+        assert r.status_code == 201, r.text
+        order_ids.append(r.json()["id"])
+
+    try:
+        first, second = order_ids
+        r = client.post(
+            f"/orders/{first}/events:bulk",
+            json=[{"type": "update", "data": {"n": i}} for i in range(3)],
+        )
+        assert r.status_code == 201, r.text
+        assert [e["data"]["n"] for e in r.json()] == [0, 1, 2]
+        assert all(e["order_id"] == first for e in r.json())
+
+        r = client.post(
+            "/events:bulk",
+            json=[
+                {"order_id": first, "type": "order.complete"},
+                {"order_id": second, "type": "order.started"},
+            ],
+        )
+        assert r.status_code == 201, r.text
+        assert [e["order_id"] for e in r.json()] == order_ids
+
+        # Newest first; a batch shares created_at, seq keeps submission order
+        r = client.get(f"/orders/{first}/events")
+        assert [e["type"] for e in r.json()] == [
+            "order.complete",
+            "update",
+            "update",
+            "update",
+        ]
+        assert [e["data"]["n"] for e in r.json()[1:]] == [2, 1, 0]
+
+        # All or nothing: one unknown order rejects the whole batch
+        missing = "00000000-0000-0000-0000-000000000000"
+        r = client.post(
+            "/events:bulk",
+            json=[
+                {"order_id": second, "type": "update"},
+                {"order_id": missing, "type": "update"},
+            ],
+        )
+        assert r.status_code == 404
+        assert r.json()["detail"]["order_ids"] == [missing]
+        assert len(client.get(f"/orders/{second}/events").json()) == 1
+    finally:
+        for order_id in order_ids:
+            client.delete(f"/orders/{order_id}")
@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 
 
@@ -38,3 +39,48 @@ def test_orders_crud(client):
     # Ensure gone
     r = client.get(f"/orders/{order_id}")
     assert r.status_code == 404, r.text
+
+
+def test_order_summary(client):
+    now = datetime.now(timezone.utc)
+    order_payload = {
+        "bbox": [-75.0, 10.0, -74.9, 10.1],
+        "start_date": now.isoformat(),
+        "end_date": (now + timedelta(hours=1)).isoformat(),
+    }
+    order_ids = [client.post("/orders", json=order_payload).json()["id"] for _ in "ab"]
+    slug = f"prov-{uuid.uuid4().hex[:8]}"
+    provider = client.post("/providers", json={"slug": slug, "name": "Umbra"}).json()
+
+    try:
+        first, second = order_ids
+        r = client.post(
+            "/order-providers",
+            json={"order_id": first, "provider_id": provider["id"]},
+        )
+        assert r.status_code == 201, r.text
+        # One transaction each, so every event has its own created_at
+        for i in range(5):
+            r = client.post(
+                f"/orders/{first}/events", json={"type": "update", "data": {"n": i}}
+            )
+            assert r.status_code == 201, r.text
+
+        r = client.get(f"/orders/{first}/summary", params={"events": 3})
+        assert r.status_code == 200, r.text
+        summary = r.json()
+        assert summary["order"]["id"] == first
+        assert [p["provider"]["slug"] for p in summary["providers"]] == [slug]
+        assert [e["data"]["n"] for e in summary["events"]] == [4, 3, 2]
+
+        missing = str(uuid.uuid4())
+        r = client.get("/orders:summary", params={"ids": [second, missing, first]})
+        assert r.status_code == 200, r.text
+        assert [s["order"]["id"] for s in r.json()] == [second, first]
+        assert r.json()[0]["providers"] == r.json()[0]["events"] == []
+
+        assert client.get(f"/orders/{missing}/summary").status_code == 404
+    finally:
+        for order_id in order_ids:
+            client.delete(f"/orders/{order_id}")
+        client.delete(f"/providers/{provider['id']}")
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+
+def test_events_keyset_pages_cover_every_event_once(client):
+    now = datetime.now(timezone.utc)
+    r = client.post(
+        "/orders",
+        json={
+            "bbox": [-75.0, 10.0, -74.9, 10.1],
+            "start_date": now.isoformat(),
+            "end_date": (now + timedelta(hours=1)).isoformat(),
+        },
+    )
+    assert r.status_code == 201, r.text
+    order_id = r.json()["id"]
+
+    try:
+        created = set()
+        for i in range(5):
+            r = client.post(
+                f"/orders/{order_id}/events", json={"type": "update", "data": {"i": i}}
+            )
+            assert r.status_code == 201, r.text
+            created.add(r.json()["id"])
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            r = client.get(f"/orders/{order_id}/events", params=params)
+            assert r.status_code == 200, r.text
+            seen += [e["id"] for e in r.json()]
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert len(seen) == len(created) and set(seen) == created
+    finally:
+        client.delete(f"/orders/{order_id}")
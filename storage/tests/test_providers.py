@@ -36,3 +36,25 @@ def test_providers_crud(client):
     # 404 afterwards
     r = client.get(f"/providers/{provider_id}")
     assert r.status_code == 404, r.text
+
+
+def test_providers_list_etag(client):
+    r = client.get("/providers")
+    assert r.status_code == 200, r.text
+    etag = r.headers["ETag"]
+    assert client.get("/providers", headers={"If-None-Match": etag}).status_code == 304
+
+    slug = f"prov-{uuid.uuid4().hex[:8]}"
+    r = client.post("/providers", json={"slug": slug, "name": "Capella"})
+    assert r.status_code == 201, r.text
+    try:
+        # Writes invalidate the catalog, so the old validator no longer matches
+        r = client.get("/providers", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["ETag"] != etag
+        assert (
+            client.post("/providers", json={"slug": slug, "name": "X2"}).status_code
+            == 409
+        )
+    finally:
+        client.delete(f"/providers/{r.json()[-1]['id']}")
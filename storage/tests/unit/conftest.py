@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
@@ -6,11 +6,23 @@ from httpx import ASGITransport, AsyncClient
 
 from storage import db as db_module
 from storage.app import create_app
+from storage.catalog import CATALOG
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog():
+    """The provider catalog cache is process-wide; start every test cold."""
+    CATALOG.invalidate()
+    yield
+    CATALOG.invalidate()
 
 
 @pytest.fixture
 def mock_session():
-    return MagicMock()
+    """AsyncSession stand-in: awaitable queries, sync `add`."""
+    session = AsyncMock()
+    session.add = MagicMock()
+    return session
 
 
 @pytest_asyncio.fixture
@@ -1,5 +1,9 @@
+import uuid
+
 import pytest
 
+from storage.bulk import MAX_BULK_EVENTS
+
 
 @pytest.mark.unit
 @pytest.mark.asyncio
@@ -8,3 +12,43 @@ async def test_list_events_404_when_order_missing_http(async_client, mock_sessio
     r = await async_client.get("/orders/abc/events")
     assert r.status_code == 404
     assert r.json()["detail"] == "order not found"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bulk_events_404_lists_missing_orders_http(async_client, mock_session):
+    known, unknown = uuid.uuid4(), uuid.uuid4()
+    mock_session.scalars.return_value = [known]
+    r = await async_client.post(
+        "/events:bulk",
+        json=[
+            {"order_id": str(known), "type": "created"},
+            {"order_id": str(unknown), "type": "created"},
+        ],
+    )
+    assert r.status_code == 404
+    assert r.json()["detail"]["order_ids"] == [str(unknown)]
+    # One existence query for every distinct order, nothing written
+    assert mock_session.scalars.await_count == 1
+    mock_session.commit.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bulk_events_rejects_oversized_batch_http(async_client):
+    order_id = uuid.uuid4()
+    payload = [{"type": "update"}] * (MAX_BULK_EVENTS + 1)
+    r = await async_client.post(f"/orders/{order_id}/events:bulk", json=payload)
+    assert r.status_code == 422
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bulk_events_404_for_unknown_order_like_siblings_http(
+    async_client, mock_session
+):
+    mock_session.get.return_value = None
+    r = await async_client.post("/orders/abc/events:bulk", json=[{"type": "update"}])
+    assert r.status_code == 404
+    assert r.json()["detail"] == "order not found"
+    mock_session.commit.assert_not_awaited()
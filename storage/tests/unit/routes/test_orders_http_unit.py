@@ -0,0 +1,24 @@
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_order_summary_404_when_order_missing_http(async_client, mock_session):
+    orders = MagicMock()
+    orders.unique.return_value = []
+    mock_session.scalars.return_value = orders
+    r = await async_client.get(f"/orders/{uuid.uuid4()}/summary")
+    assert r.status_code == 404
+    # No events query for orders that don't exist
+    assert mock_session.scalars.await_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_order_summaries_cap_batch_size_http(async_client):
+    ids = [str(uuid.uuid4()) for _ in range(101)]
+    r = await async_client.get("/orders:summary", params={"ids": ids})
+    assert r.status_code == 422
@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from storage.catalog import ProviderCatalog
+
+
+def provider(slug: str):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        slug=slug,
+        name=slug.title(),
+        sensor_types=["SAR"],
+        active=True,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_catalog_loads_once_and_indexes(mock_session):
+    umbra, capella = provider("umbra"), provider("capella")
+    mock_session.scalars.return_value = [umbra, capella]
+    catalog = ProviderCatalog()
+
+    assert (await catalog.by_slug(mock_session, "capella")).id == capella.id
+    assert (await catalog.get(mock_session, str(umbra.id))).slug == "umbra"
+    assert await catalog.get(mock_session, "not-a-uuid") is None
+    assert len(await catalog.all(mock_session)) == 2
+    assert mock_session.scalars.await_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_changed_reloads_and_moves_etag(mock_session):
+    mock_session.scalars.return_value = [provider("umbra")]
+    catalog = ProviderCatalog()
+    catalog.broadcaster = AsyncMock()
+    before = await catalog.etag(mock_session)
+
+    mock_session.scalars.return_value = [provider("umbra"), provider("iceye")]
+    assert await catalog.etag(mock_session) == before
+    await catalog.changed()
+    assert await catalog.etag(mock_session) != before
+    catalog.broadcaster.publish.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_list_providers_honours_if_none_match(async_client, mock_session):
+    mock_session.scalars.return_value = [provider("umbra")]
+    r = await async_client.get("/providers")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+
+    r = await async_client.get("/providers", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+    assert mock_session.scalars.await_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_slug_miss_reloads_a_stale_catalog(mock_session):
+    mock_session.scalars.return_value = [provider("umbra")]
+    catalog = ProviderCatalog(miss_reload_after=0)
+    assert await catalog.by_slug(mock_session, "iceye") is None
+
+    # Created on another replica without a broadcast
+    iceye = provider("iceye")
+    mock_session.scalars.return_value = [provider("umbra"), iceye]
+    assert (await catalog.by_slug(mock_session, "iceye")).id == iceye.id
+
+    fresh = ProviderCatalog()
+    mock_session.scalars.reset_mock()
+    assert await fresh.by_slug(mock_session, "capella") is None
+    assert await fresh.by_slug(mock_session, "capella") is None
+    assert mock_session.scalars.await_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_create_provider_conflict_is_409(async_client, mock_session):
+    mock_session.scalars.return_value = []
+    mock_session.commit.side_effect = IntegrityError("INSERT", {}, Exception())
+
+    r = await async_client.post(
+        "/providers", json={"name": "Umbra", "slug": "umbra", "sensor_types": ["SAR"]}
+    )
+
+    assert r.status_code == 409
+    mock_session.rollback.assert_awaited_once()
@@ -0,0 +1,182 @@
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DataError, OperationalError
+
+from storage import consumer, models
+from storage.consumer import EventPersister, advance, parse_message, parse_order
+
+
+def message(evt, routing_key=None, exchange="events"):
+    body = evt if isinstance(evt, bytes) else json.dumps(evt).encode()
+    return SimpleNamespace(
+        body=body,
+        exchange=exchange,
+        routing_key=routing_key or f"order.{evt.get('orderId')}.x",
+        ack=AsyncMock(),
+        nack=AsyncMock(),
+        reject=AsyncMock(),
+    )
+
+
+def session_factory(session):
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+    return factory
+
+
+@pytest.mark.unit
+def test_parse_message_strips_envelope_and_falls_back_to_routing_key():
+    order_id = uuid.uuid4()
+    row = parse_message(
+        message(
+            {"type": "provider.update", "provider": "Umbra", "status": "ok"},
+            routing_key=f"order.{order_id}.provider.Umbra.ok",
+        )
+    )
+    assert row == {
+        "id": row["id"],
+        "order_id": order_id,
+        "type": "provider.update",
+        "data": {"provider": "Umbra", "status": "ok"},
+    }
+    event_id = uuid.uuid4()
+    stamped = parse_message(
+        message({"type": "x", "orderId": str(order_id), "eventId": str(event_id)})
+    )
+    assert stamped["id"] == event_id
+    assert stamped["data"] == {}
+    assert parse_message(message(b"not json", routing_key="order.x")) is None
+    assert parse_message(message({"type": "x", "orderId": "nope"})) is None
+
+
+@pytest.mark.unit
+def test_parse_order_reads_submitted_request():
+    order_id = uuid.uuid4()
+    submitted = {
+        "orderId": str(order_id),
+        "type": "search",
+        "bbox": [-75.0, 10.0, -74.9, 10.1],
+        "start_date": "2024-01-01T00:00:00",
+        "end_date": "2024-01-02T00:00:00Z",
+    }
+    row = parse_order(message(submitted, routing_key="search", exchange="orders"))
+    assert row["id"] == order_id
+    assert row["bbox"] == submitted["bbox"]
+    assert row["start_date"].tzinfo is not None
+
+    del submitted["bbox"]
+    assert parse_order(message(submitted, "search", "orders")) is None
+
+
+@pytest.mark.unit
+def test_statuses_never_reopen():
+    assert advance(None, "processing") == "processing"
+    assert advance("processing", "done") == "done"
+    assert advance("done", "processing") == "done"
+    assert advance("done", "failed") == "failed"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_flush_acks_only_after_commit(monkeypatch):
+    persist = AsyncMock()
+    monkeypatch.setattr(consumer, "persist", persist)
+    session = AsyncMock()
+    persister = EventPersister(session_factory(session), batch_size=2)
+
+    order_id = str(uuid.uuid4())
+    good = message({"type": "order.started", "orderId": order_id})
+    bad = message(b"{", routing_key="order.x")
+    await persister.on_message(good)
+    good.ack.assert_not_awaited()
+    await persister.on_message(bad)
+
+    _, rows, orders = persist.await_args.args
+    assert [r["type"] for r in rows] == ["order.started"]
+    assert orders == []
+    session.commit.assert_awaited_once()
+    good.ack.assert_awaited_once()
+    bad.reject.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_commit_requeues_batch(monkeypatch):
+    monkeypatch.setattr(consumer, "persist", AsyncMock())
+    session = AsyncMock()
+    session.commit.side_effect = OperationalError("COMMIT", {}, OSError("db down"))
+    persister = EventPersister(session_factory(session), batch_size=10)
+
+    msgs = [message({"type": "order.started", "orderId": str(uuid.uuid4())})]
+    await persister.on_message(msgs[0])
+    await persister.flush()
+
+    msgs[0].nack.assert_awaited_once_with(requeue=True)
+    msgs[0].ack.assert_not_awaited()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bad_row_is_rejected_and_the_rest_of_the_batch_committed(monkeypatch):
+    poison = "order.poison"
+
+    async def persist(db, rows, orders):
+        if any(row["type"] == poison for row in rows):
+            raise DataError("INSERT", {}, ValueError("invalid input"))
+        written.extend(row["type"] for row in rows)
+
+    written = []
+    monkeypatch.setattr(consumer, "persist", persist)
+    persister = EventPersister(session_factory(AsyncMock()), batch_size=5)
+
+    types = ["order.started", "provider.update", poison, "provider.update", "x"]
+    msgs = [message({"type": t, "orderId": str(uuid.uuid4())}) for t in types]
+    for msg in msgs:
+        await persister.on_message(msg)
+
+    bad = msgs.pop(2)
+    bad.reject.assert_awaited_once()
+    bad.ack.assert_not_awaited()
+    for msg in msgs:
+        msg.ack.assert_awaited_once()
+        msg.nack.assert_not_awaited()
+    assert sorted(written) == sorted(t for t in types if t != poison)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_apply_statuses_batches_updates_per_status(mock_session):
+    started, finished = uuid.uuid4(), uuid.uuid4()
+    mock_session.scalars.return_value = []
+    rows = [
+        {"order_id": started, "type": "order.started", "data": {}},
+        {"order_id": finished, "type": "order.started", "data": {}},
+        {
+            "order_id": finished,
+            "type": "provider.update",
+            "data": {"provider": "Umbra", "status": "ok"},
+        },
+        {"order_id": finished, "type": "order.complete", "data": {}},
+    ]
+    await consumer.apply_statuses(mock_session, rows)
+
+    statements = [call.args[0] for call in mock_session.execute.await_args_list]
+    updates = [s for s in statements if s.is_dml]
+    assert len(updates) == len(statements) == 2  # processing + done
+    # Provider slugs resolved through the catalog, which loaded once
+    assert mock_session.scalars.await_count == 1
+
+
+@pytest.mark.unit
+def test_batched_events_are_numbered_in_arrival_order():
+    # created_at is one now() per transaction; seq is what orders a batch
+    order_id = uuid.uuid4()
+    rows = [{"order_id": order_id, "type": t, "data": {}} for t in ("a", "b", "c")]
+    sql = str(insert(models.Event).values(rows).compile(dialect=postgresql.dialect()))
+    assert sql.count("nextval('events_seq_seq')") == 3
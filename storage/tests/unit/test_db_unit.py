@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from storage import db as db_module
+from storage.settings import settings
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sync_mode_wraps_session_for_async_routers(monkeypatch):
+    session = MagicMock()
+    session.get.return_value = "order"
+    monkeypatch.setattr(settings, "DB_MODE", "sync")
+    monkeypatch.setattr(db_module, "SessionLocal", lambda: session)
+
+    gen = db_module.get_db()
+    db = await gen.__anext__()
+    assert isinstance(db, db_module.SyncSessionAdapter)
+    assert await db.get("Order", "abc") == "order"
+    await db.commit()
+
+    with pytest.raises(StopAsyncIteration):
+        await gen.__anext__()
+    session.commit.assert_called_once()
+    session.close.assert_called_once()
@@ -0,0 +1,69 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from storage import models
+from storage.pagination import decode_cursor, encode_cursor, paginate
+
+COLUMNS = (models.Event.created_at, models.Event.id)
+
+
+def event(i: int):
+    return SimpleNamespace(
+        created_at=datetime(2024, 1, 1, i, tzinfo=timezone.utc), id=uuid.uuid4()
+    )
+
+
+@pytest.mark.unit
+def test_cursor_round_trips_typed_values():
+    row = event(3)
+    assert decode_cursor(encode_cursor(row, COLUMNS), COLUMNS) == [
+        row.created_at,
+        row.id,
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("cursor", ["not-base64!", "WyJ4Il0", "e30"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, COLUMNS)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_paginate_seeks_past_cursor_and_returns_next(mock_session):
+    rows = [event(5), event(4), event(3)]
+    mock_session.scalars.return_value = rows
+    response = Response()
+
+    cursor = encode_cursor(event(6), COLUMNS)
+    page = await paginate(
+        mock_session, select(models.Event), COLUMNS, response, limit=2, cursor=cursor
+    )
+
+    assert page == rows[:2]
+    assert decode_cursor(response.headers["X-Next-Cursor"], COLUMNS)[0] == (
+        rows[1].created_at
+    )
+    sql = str(
+        mock_session.scalars.call_args.args[0].compile(dialect=postgresql.dialect())
+    )
+    assert "(events.created_at, events.id) < " in sql
+    assert "OFFSET" not in sql
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_last_page_has_no_next_cursor(mock_session):
+    mock_session.scalars.return_value = [event(1)]
+    response = Response()
+
+    await paginate(mock_session, select(models.Event), COLUMNS, response, limit=2)
+    assert "X-Next-Cursor" not in response.headers
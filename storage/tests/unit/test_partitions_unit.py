@@ -0,0 +1,86 @@
+import gzip
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+
+from storage import partitions
+from storage.partitions import add_months, expired, partition_month, partition_name
+
+
+@pytest.mark.unit
+def test_month_arithmetic_and_names():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_name(date(2025, 2, 1)) == "events_p2025_02"
+    assert partition_month("events_p2025_02") == date(2025, 2, 1)
+    assert partition_month("events_default") is None
+
+
+@pytest.mark.unit
+def test_expired_keeps_retention_window():
+    names = ["events_p2024_12", "events_p2024_10", "events_p2025_01", "events_default"]
+    # Keep 2 full months before March: January onwards stays
+    assert expired(names, 2, date(2025, 3, 15)) == [
+        "events_p2024_10",
+        "events_p2024_12",
+    ]
+
+
+@pytest.mark.unit
+def test_ensure_partitions_creates_missing_months(monkeypatch):
+    monkeypatch.setattr(
+        partitions, "attached_partitions", lambda db: ["events_p2025_01"]
+    )
+    db = MagicMock()
+    db.scalar.return_value = False
+
+    created = partitions.ensure_partitions(db, 2, date(2025, 1, 20))
+
+    assert created == ["events_p2025_02", "events_p2025_03"]
+    sql = [str(call.args[0]) for call in db.execute.call_args_list]
+    assert "FOR VALUES FROM ('2025-03-01') TO ('2025-04-01')" in sql[-1]
+
+
+@pytest.mark.unit
+def test_rows_caught_by_the_default_partition_are_moved(monkeypatch):
+    monkeypatch.setattr(partitions, "attached_partitions", lambda db: [])
+    db = MagicMock()
+    db.scalar.return_value = True
+
+    created = partitions.ensure_partitions(db, 0, date(2025, 1, 20))
+
+    assert created == ["events_p2025_01"]
+    sql = [str(call.args[0]) for call in db.execute.call_args_list]
+    assert sql[0] == "ALTER TABLE events DETACH PARTITION events_default"
+    assert sql[1].startswith("CREATE TABLE events_p2025_01 PARTITION OF events")
+    assert sql[2].startswith("INSERT INTO events_p2025_01")
+    assert "created_at >= '2025-01-01' AND created_at < '2025-02-01'" in sql[2]
+    assert sql[3].startswith("DELETE FROM events_default")
+    assert sql[4] == "ALTER TABLE events ATTACH PARTITION events_default DEFAULT"
+    db.commit.assert_called_once()
+
+
+@pytest.mark.unit
+def test_retention_detaches_exports_and_drops(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        partitions,
+        "attached_partitions",
+        lambda db: ["events_p2024_01", "events_p2025_01"],
+    )
+    monkeypatch.setattr(
+        partitions, "detached_partitions", lambda db: ["events_p2024_01"]
+    )
+    db = MagicMock()
+    copy = db.connection().connection.driver_connection.cursor().copy
+    copy.return_value.__enter__.return_value = [b"id,order_id\n", b"1,2\n"]
+
+    paths = partitions.apply_retention(db, 6, tmp_path, date(2025, 1, 20))
+
+    assert paths == [tmp_path / "events_p2024_01.csv.gz"]
+    assert gzip.decompress(paths[0].read_bytes()) == b"id,order_id\n1,2\n"
+    sql = [str(call.args[0]) for call in db.execute.call_args_list]
+    assert sql == [
+        "ALTER TABLE events DETACH PARTITION events_p2024_01",
+        "DROP TABLE events_p2024_01",
+    ]